@@ -0,0 +1,59 @@
+"""
+CLI exec channel benchmark.
+
+Compares the interactive scrapli shell (PTY, prompt matching, output scraping) with
+the non-interactive exec channel of CLIDriver.exec_command on a real device.
+
+Usage:
+    python -m benchmarks.cli_exec host [vendor] [command] [iterations]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable
+
+from napi.driver import CLIDriver
+
+
+async def measure(run: Callable[[], Awaitable[str]], iterations: int) -> tuple[float, list[float]]:
+    started = time.perf_counter()
+    output = await run()
+    first = time.perf_counter() - started
+
+    seconds = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        assert await run() == output
+        seconds.append(time.perf_counter() - started)
+
+    return first, seconds
+
+
+async def main() -> None:
+    host = sys.argv[1]
+    vendor = sys.argv[2] if len(sys.argv) > 2 else "nvidia"
+    command = sys.argv[3] if len(sys.argv) > 3 else "bridge -j vlan show"
+    iterations = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+
+    async with CLIDriver(host, vendor) as driver:
+
+        async def shell() -> str:
+            await driver._shell()
+            return (await driver._connection.send_command(command)).result
+
+        async def exec_() -> str:
+            return (await driver.exec_command(command)).stdout
+
+        print(f"{command!r} on {host}, {iterations} iterations")
+        for name, run in {"scrapli": shell, "exec": exec_}.items():
+            first, seconds = await measure(run, iterations)
+            print(
+                f"  {name:<8} first {first * 1000:8.2f} ms"
+                f"  median {statistics.median(seconds) * 1000:8.2f} ms"
+                f"  p95 {statistics.quantiles(seconds, n=20)[-1] * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+NETCONF XML codecs benchmark.
+
+Compares the former payload path (deepcopy of a dict template + pretty xmltodict.unparse,
+xmltodict.parse of the whole reply) with the pluggable codecs on realistic payloads:
+InterfaceTree edit-config and FDB (vlanFdbDynamic) get reply.
+
+Usage:
+    python -m benchmarks.netconf_codec [interfaces] [fdb entries]
+"""
+import sys
+import timeit
+from copy import deepcopy
+from typing import Any, Callable
+
+import xmltodict
+
+from napi.driver.abstract import LinkType
+from napi.driver.netconf import rpcs
+from napi.driver.netconf.ce import InterfaceTree, L2Interface
+from napi.driver.netconf.codec import LxmlCodec, XmltodictCodec, codec_map
+from napi.lib import VlanSet
+
+LEGACY_EDIT_CONFIG = {
+    "rpc": {
+        "@message-id": "1",
+        "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
+        "edit-config": None,
+    }
+}
+
+
+def interface_tree(size: int) -> dict[str, Any]:
+    return InterfaceTree(
+        interfaces=[
+            L2Interface(
+                name=f"100GE1/0/{i}",
+                mode=LinkType.TRUNK,
+                pvid=100 + i,
+                trunk_allowed_vlans=VlanSet(range(100, 400)),
+            )
+            for i in range(size)
+        ]
+    ).as_dict()
+
+
+def fdb_reply(size: int) -> bytes:
+    entries = "".join(
+        "<vlanFdbDynamic>"
+        f"<vlanId>{100 + i % 50}</vlanId>"
+        f"<macAddress>529a-{i >> 16:04x}-{i & 0xFFFF:04x}</macAddress>"
+        f"<outIfName>100GE1/0/{i % 48}</outIfName>"
+        "</vlanFdbDynamic>"
+        for i in range(size)
+    )
+
+    return (
+        '<rpc-reply message-id="1" xmlns="urn:ietf:params:xml:ns:netconf:base:1.0"><data>'
+        '<mac xmlns="http://www.huawei.com/netconf/vrp/huawei-mac"><vlanFdbDynamics>'
+        f"{entries}"
+        "</vlanFdbDynamics></mac></data></rpc-reply>"
+    ).encode()
+
+
+def legacy_encode(config: dict[str, Any]) -> bytes:
+    payload = deepcopy(LEGACY_EDIT_CONFIG)
+    payload["rpc"]["edit-config"] = {
+        "target": {"running": None},
+        "config": {**config},
+    }
+
+    return (xmltodict.unparse(payload, full_document=False, pretty=True) + "]]>]]>").encode()
+
+
+def codec_encode(codec: XmltodictCodec | LxmlCodec) -> Callable[[dict[str, Any]], bytes]:
+    def encode(config: dict[str, Any]) -> bytes:
+        return rpcs.rpc % (b"1", rpcs.edit_config % (b"running", codec.encode(config)))
+
+    return encode
+
+
+def legacy_decode(message: bytes) -> dict[str, Any]:
+    return xmltodict.parse(message.decode(), dict_constructor=dict)
+
+
+def best(func: Callable[[Any], Any], arg: Any, number: int) -> float:
+    return min(timeit.repeat(lambda: func(arg), number=number, repeat=5)) / number
+
+
+def main() -> None:
+    interfaces = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+    tree = interface_tree(interfaces)
+    reply = fdb_reply(entries)
+
+    encoders: dict[str, Callable[[dict[str, Any]], bytes]] = {"legacy": legacy_encode}
+    decoders: dict[str, Callable[[bytes], dict[str, Any]]] = {"legacy": legacy_decode}
+    for name, codec_class in codec_map.items():
+        try:
+            codec = codec_class()
+        except ImportError as e:
+            print(f"skipping {name} codec: {e}")
+            continue
+
+        encoders[name] = codec_encode(codec)
+        decoders[name] = codec.decode
+
+    print(f"InterfaceTree edit-config, {interfaces} trunk interfaces")
+    baseline = None
+    for name, encode in encoders.items():
+        seconds = best(encode, tree, 20)
+        baseline = baseline or seconds
+        print(
+            f"  {name:<10} {seconds * 1000:8.2f} ms  {len(encode(tree)):>8} bytes"
+            f"  x{baseline / seconds:.1f}"
+        )
+
+    print(f"FDB get reply, {entries} entries ({len(reply)} bytes)")
+    baseline = None
+    for name, decode in decoders.items():
+        seconds = best(decode, reply, 1)
+        baseline = baseline or seconds
+        print(f"  {name:<10} {seconds * 1000:8.2f} ms  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from napi.auth import Bearer, User, get_user_from_request
+from napi.driver.cli.exceptions import CLI_HTTP_CODE_MAP
 from napi.driver.netconf.exceptions import netconf_http_code_map
+from napi.driver.scheduler import Overloaded, Priority, scheduler_http_code_map
 from napi.inventory import InventoryException, inventory_handler, inventory_http_code_map
 from napi.settings import settings
 
@@ -15,7 +17,9 @@ from .logger import logger
 
 CODES = {
     **macgrabber_http_code_map,
+    **CLI_HTTP_CODE_MAP,
     **netconf_http_code_map,
+    **scheduler_http_code_map,
 }
 
 
@@ -26,7 +30,9 @@ async def get(data: models.GetDeviceData, request: Request):
     switch_name = data.switch.replace(" ", "")
     vlan = data.vlan
 
-    async with inventory_handler("netbox") as inventory:
+    bypass_cache = "no-cache" in request.headers.get("Cache-Control", "")
+
+    async with inventory_handler(settings.inventory, bypass_cache=bypass_cache) as inventory:
         try:
             device = await inventory.get_device(
                 switch_name, domains=settings.domains, roles=["tor"]
@@ -65,8 +71,15 @@ async def get(data: models.GetDeviceData, request: Request):
         return JSONResponse(status_code=result["code"], content=result)
 
     try:
-        async with device_driver(device=device) as d:
-            macs = await d.get_macs(vlan)
+        # Whole table dumps are bulk jobs, they must not delay interactive requests
+        priority = (
+            Priority.BULK
+            if vlan is None and data.interface is None and data.mac is None
+            else Priority.INTERACTIVE
+        )
+
+        async with device_driver(device=device, priority=priority) as d:
+            macs = await d.get_macs(vlan, interface=data.interface, mac=data.mac)
     except Exception as e:
         code = CODES.get(e.__class__.__name__, 520)
 
@@ -85,7 +98,10 @@ async def get(data: models.GetDeviceData, request: Request):
             else "unknownError: please contact your favorite networking dude",
         }
 
-        return JSONResponse(status_code=result["code"], content=result)
+        # Let the client know when the overloaded worker is worth retrying
+        headers = {"Retry-After": str(e.retry_after)} if isinstance(e, Overloaded) else None
+
+        return JSONResponse(status_code=result["code"], content=result, headers=headers)
 
     logger.debug("{} successfully got {} macs".format(request.client.host, switch_name))
 
@@ -62,7 +62,8 @@ get_responses = {
         'model': Error
     },
     503: {
-        'description': 'Failed to connect to Netbox or switch',
+        'description': 'Failed to connect to Netbox or switch'
+        ' or too many switch operations in progress (see Retry-After)',
         'model': Error
     },
     520: {
@@ -1,5 +1,6 @@
 from typing import Protocol, Self, Type
 
+from napi.driver.scheduler import Priority
 from napi.inventory import Device
 
 from .ce import CEDriver
@@ -7,7 +8,7 @@ from .cumulus import CumulusDriver
 
 
 class SupportsGetMacs(Protocol):
-    def __init__(self, device: Device) -> None:
+    def __init__(self, device: Device, priority: Priority = Priority.INTERACTIVE) -> None:
         ...
 
     async def __aenter__(self) -> Self:
@@ -16,7 +17,12 @@ class SupportsGetMacs(Protocol):
     async def __aexit__(self, *_) -> None:
         ...
 
-    async def get_macs(self, vlan_id: str | None = None) -> list[dict[str, str]]:
+    async def get_macs(
+        self,
+        vlan_id: str | None = None,
+        interface: str | None = None,
+        mac: str | None = None,
+    ) -> list[dict[str, str]]:
         ...
 
 
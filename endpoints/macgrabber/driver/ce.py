@@ -1,69 +1,99 @@
+import asyncio
+from typing import Any
+
 from napi.driver import NetconfDriver
+from napi.driver.scheduler import Priority
 from napi.inventory import Device
-from napi.lib import _mac_dash_to_column
+from napi.lib import _mac_dash_to_column, _mac_digits, _mac_digits_to_dash
+from napi.settings import settings
 
-from .exceptions import ConfigurationError
+MAC_XMLNS = "http://www.huawei.com/netconf/vrp/huawei-mac"
+VLAN_XMLNS = "http://www.huawei.com/netconf/vrp/huawei-vlan"
 
 
 class CEDriver(NetconfDriver):
-    def __init__(self, device: Device) -> None:
-        super().__init__(device.ip or device.fqdn)
+    def __init__(self, device: Device, priority: Priority = Priority.INTERACTIVE) -> None:
+        super().__init__(device.ip or device.fqdn, vendor=device.vendor, priority=priority)
         self.device = device
 
-    async def get_macs(self, vlan_id: str | None = None) -> list[dict[str, str]]:
+    async def get_macs(
+        self,
+        vlan_id: str | None = None,
+        interface: str | None = None,
+        mac: str | None = None,
+    ) -> list[dict[str, str]]:
+        """
+        Get dynamic MAC addresses. VLAN, interface and full MAC filters are applied by the device.
+        Without VLAN filter the FDB is fetched with macgrabber_partitions concurrent RPCs,
+        each for its own part of the device VLANs
+
+        Args:
+            vlan_id: VLAN to get MAC addresses of
+            interface: interface to get MAC addresses of
+            mac: MAC address or its prefix in any notation, e.g. "aa:bb:cc" or "aabb-cc"
+
+        Returns:
+            list[dict[str, str]]: MAC addresses
+
+        Raises:
+            N/A
+        """
+        digits = _mac_digits(mac) if mac else ""
+
+        # Empty elements select, elements with values match the entries
+        entry = {
+            "vlanId": vlan_id,
+            "macAddress": _mac_digits_to_dash(digits) if len(digits) == 12 else None,
+            "outIfName": interface,
+        }
+
+        partitions = [[entry]]
+        if vlan_id is None and settings.macgrabber_partitions > 1:
+            vlans = await self._get_vlans()
+            if vlans:
+                count = min(settings.macgrabber_partitions, len(vlans))
+                partitions = [
+                    [{**entry, "vlanId": str(vlan)} for vlan in vlans[i::count]]
+                    for i in range(count)
+                ]
+
+        results = await asyncio.gather(*(self._get_fdb(entries, digits) for entries in partitions))
+
+        return [mac_entry for result in results for mac_entry in result]
+
+    async def _get_vlans(self) -> list[int]:
         data = {
-            "mac": {
-                "@xmlns": "http://www.huawei.com/netconf/vrp/huawei-mac",
-                "vlanFdbDynamics": {
-                    "vlanFdbDynamic": {
-                        "vlanId": vlan_id,
-                        "macAddress": None,
-                        "outIfName": None,
+            "vlan": {
+                "@xmlns": VLAN_XMLNS,
+                "vlans": {
+                    "vlan": {
+                        "vlanId": None,
                     }
                 },
             }
         }
 
-        rpc_reply = await self.get(filter_=data)
-
-        mac_tree = rpc_reply["rpc-reply"]["data"]
+        return [int(vlan) async for vlan in self.get_iter(filter_=data, tag="vlanId") if vlan]
 
-        mac_tree = {
+    async def _get_fdb(self, entries: list[dict[str, Any]], digits: str) -> list[dict[str, str]]:
+        # Sibling entries of the subtree filter are OR-ed, so one RPC covers many VLANs
+        data = {
             "mac": {
+                "@xmlns": MAC_XMLNS,
                 "vlanFdbDynamics": {
-                    "vlanFdbDynamic": [
-                        {
-                            "vlanId": "104",
-                            "macAddress": "529a-0097-e41b",
-                            "outIfName": "100GE1/0/1:1",
-                        },
-                        {
-                            "vlanId": "104",
-                            "macAddress": "529a-0097-e41c",
-                            "outIfName": "100GE1/0/1:2",
-                        },
-                        {
-                            "vlanId": "106",
-                            "macAddress": "629a-0097-e41c",
-                            "outIfName": "100GE1/0/1:5",
-                        },
-                    ],
+                    "vlanFdbDynamic": entries,
                 },
-            },
+            }
         }
 
-        if mac_tree is None:
-            raise ConfigurationError(f"no mac-address data on {self.device.fqdn}")
-
-        vlan_db_dynamic = mac_tree["mac"]["vlanFdbDynamics"]["vlanFdbDynamic"]
-        if not isinstance(vlan_db_dynamic, list):
-            vlan_db_dynamic = [vlan_db_dynamic]
-
+        # FDB might be huge, so it is parsed entry by entry as the reply arrives.
+        # MAC prefix can not be matched by the device and is filtered here
         return [
             {
                 "vlan": entry["vlanId"],
                 "mac": _mac_dash_to_column(entry["macAddress"]),
                 "interface": entry["outIfName"],
             }
-            for entry in vlan_db_dynamic
+            async for entry in self.get_iter(filter_=data, tag="vlanFdbDynamic")
+            if _mac_digits(entry["macAddress"]).startswith(digits)
         ]
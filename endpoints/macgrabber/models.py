@@ -1,5 +1,9 @@
+import re
+
 from pydantic import BaseModel, validator
 
+INTERFACE_NAME = re.compile(r"^[A-Za-z0-9_./:-]+$")
+
 
 def is_digit(name):
     if not name.isdigit():
@@ -7,8 +11,25 @@ def is_digit(name):
     return name
 
 
+def is_interface_name(name):
+    if not INTERFACE_NAME.match(name):
+        raise ValueError("interface must be an interface name, e.g. swp1 or 10GE1/0/1")
+    return name
+
+
+def is_mac_prefix(mac):
+    digits = "".join(char for char in mac.lower() if char not in ":-.")
+    if not digits or len(digits) > 12 or digits.strip("0123456789abcdef"):
+        raise ValueError("mac must be a MAC address or its prefix, e.g. aa:bb:cc")
+    return mac
+
+
 class GetDeviceData(BaseModel):
     switch: str
     vlan: str | None = None
+    interface: str | None = None
+    mac: str | None = None
 
     _validate_vlan = validator("vlan", allow_reuse=True)(is_digit)
+    _validate_interface = validator("interface", allow_reuse=True)(is_interface_name)
+    _validate_mac = validator("mac", allow_reuse=True)(is_mac_prefix)
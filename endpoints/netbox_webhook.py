@@ -0,0 +1,59 @@
+from enum import StrEnum
+from typing import Any
+
+from fastapi import Depends
+from fastapi.routing import APIRoute, APIRouter
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from napi.auth import Bearer
+from napi.inventory import publish_event
+from napi.logger import core_logger as logger
+
+
+class Status(StrEnum):
+    ok = "ok"
+
+
+class Success(BaseModel):
+    code: int = 200
+    status: Status = Status.ok
+
+
+class WebhookData(BaseModel):
+    event: str
+    model: str
+    data: dict[str, Any]
+
+
+async def receive(data: WebhookData, request: Request) -> JSONResponse:
+    logger.debug(f"Got Netbox webhook from {request.client.host}: {data.event} {data.model}")
+
+    # The event is applied here and by the other workers from the shared journal
+    await publish_event(data.model, data.event, data.data)
+
+    result = {
+        "code": 200,
+        "status": "ok",
+    }
+    return JSONResponse(status_code=200, content=result)
+
+
+netbox_webhook_router = APIRouter(
+    routes=[
+        APIRoute(
+            "/netbox_webhook",
+            receive,
+            methods=["POST"],
+            tags=["Netbox webhook"],
+            dependencies=[Depends(Bearer("netbox_webhook"))],
+            summary="Receive Netbox change events",
+            description="Device/interface/VLAN changes are applied to the inventory snapshot "
+            "and the inventory cache of every worker",
+            response_description="Event is applied",
+            response_class=JSONResponse,
+            response_model=Success,
+        ),
+    ],
+)
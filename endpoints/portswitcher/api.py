@@ -4,7 +4,9 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 from napi.auth import Bearer, User, get_user_from_request
+from napi.driver.cli.exceptions import CLI_HTTP_CODE_MAP
 from napi.driver.netconf.exceptions import netconf_http_code_map
+from napi.driver.scheduler import Overloaded, scheduler_http_code_map
 from napi.inventory import (
     Device,
     Interface,
@@ -21,14 +23,20 @@ from .logger import logger
 
 CODES = {
     **portswitcher_http_code_map,
+    **CLI_HTTP_CODE_MAP,
     **netconf_http_code_map,
+    **scheduler_http_code_map,
 }
 
 
 async def _grab_inventory(
-    switch_name: str, interface_name: str, user: User, request: Request
+    switch_name: str,
+    interface_name: str,
+    user: User,
+    request: Request,
+    bypass_cache: bool = False,
 ) -> tuple[Device, Interface]:
-    async with inventory_handler("netbox") as inventory:
+    async with inventory_handler(settings.inventory, bypass_cache=bypass_cache) as inventory:
         try:
             device = await inventory.get_device(
                 switch_name, domains=settings.domains, roles=["tor"]
@@ -137,7 +145,10 @@ async def check(data: models.GetDeviceData, request: Request) -> JSONResponse:
     interface_name = data.interface.replace(" ", "")
 
     # Grabbing inventory
-    inventory_response = await _grab_inventory(switch_name, interface_name, user, request)
+    bypass_cache = "no-cache" in request.headers.get("Cache-Control", "")
+    inventory_response = await _grab_inventory(
+        switch_name, interface_name, user, request, bypass_cache=bypass_cache
+    )
     if isinstance(inventory_response, JSONResponse):
         return inventory_response
 
@@ -182,7 +193,10 @@ async def check(data: models.GetDeviceData, request: Request) -> JSONResponse:
             else "unknownError: please contact your favorite networking dude",
         }
 
-        return JSONResponse(status_code=result["code"], content=result)
+        # Let the client know when the overloaded worker is worth retrying
+        headers = {"Retry-After": str(e.retry_after)} if isinstance(e, Overloaded) else None
+
+        return JSONResponse(status_code=result["code"], content=result, headers=headers)
 
     logger.info(
         f"{user.name} ({request.client.host}) "
@@ -216,7 +230,10 @@ async def switch(data: models.PostDeviceData, request: Request) -> JSONResponse:
     interface_name = data.interface.replace(" ", "")
     state = data.state
 
-    inventory_response = await _grab_inventory(switch_name, interface_name, user, request)
+    # Always configure the device with fresh inventory data
+    inventory_response = await _grab_inventory(
+        switch_name, interface_name, user, request, bypass_cache=True
+    )
     if isinstance(inventory_response, JSONResponse):
         return inventory_response
 
@@ -260,7 +277,10 @@ async def switch(data: models.PostDeviceData, request: Request) -> JSONResponse:
             else "UnknownError: please contact your favorite netinfra dude",
         }
 
-        return JSONResponse(status_code=result["code"], content=result)
+        # Let the client know when the overloaded worker is worth retrying
+        headers = {"Retry-After": str(e.retry_after)} if isinstance(e, Overloaded) else None
+
+        return JSONResponse(status_code=result["code"], content=result, headers=headers)
 
     logger.info(
         f"{user.name} ({request.client.host}) "
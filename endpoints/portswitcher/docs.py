@@ -58,6 +58,10 @@ get_responses = {
             }
         },
     },
+    503: {
+        "description": "Too many switch operations in progress, retry after Retry-After seconds",
+        "model": Error,
+    },
     507: {
         "description": "Switch commit error",
         "model": Error,
@@ -1,5 +1,6 @@
 from napi.driver import NetconfDriver
 from napi.driver.netconf.ce import InterfaceTree, L2Interface, LinkType
+from napi.driver.netconf.commit import commit_coalescer
 from napi.inventory import Device, Interface
 
 from .exceptions import ConfigurationError
@@ -28,7 +29,7 @@ class CEDriver(NetconfDriver):
         Raises:
             N/A
         """
-        super().__init__(device.ip or device.fqdn)
+        super().__init__(device.ip or device.fqdn, vendor=device.vendor)
 
         self.device = device
         self.interface = interface
@@ -49,7 +50,9 @@ class CEDriver(NetconfDriver):
 
     async def set_state(self, desired_state: str) -> None:
         """
-        Configure the device interface to the desired state
+        Configure the device interface to the desired state.
+
+        Concurrent writes to the device are coalesced into one candidate commit
 
         Args:
             desired_state: desired stare - "prod" or "setup"
@@ -61,7 +64,7 @@ class CEDriver(NetconfDriver):
             N/A
         """
         config = InterfaceTree(interfaces=[self.config_map[desired_state]])
-        await self.edit_config(config=config)
+        await commit_coalescer.edit_config(self, config)
 
     async def get_state(self) -> str:
         """
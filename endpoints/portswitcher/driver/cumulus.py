@@ -1,12 +1,17 @@
 import json
+import shlex
 from typing import Any
 
 from napi.driver import CLIDriver
-from napi.driver.cli.cumulus import L2Interface, LinkType
+from napi.driver.cli.cumulus import L2Interface, LinkType, batch_errors
+from napi.driver.cli.exceptions import CommandError
+from napi.driver.scheduler import Operation
 from napi.inventory import Device, Interface
 
 from .exceptions import ConfigurationError
 
+NO_SUCH_DEVICE = ("No such device", "Cannot find device")
+
 
 class CumulusDriver(CLIDriver):
     """
@@ -61,11 +66,18 @@ class CumulusDriver(CLIDriver):
             dict[str, Any]: any JSON response converted to native python object
 
         Raises:
-            ValueError: the device response is an empty string
+            ValueError: the device has no such interface or the response is an empty string
+            CommandError: the command failed for any other reason
         """
-        command = f"bridge -j vlan show dev {self.interface.name}"
+        command = f"bridge -j vlan show dev {shlex.quote(self.interface.name)}"
+
+        try:
+            intf_state_json = await self.send_command(command)
+        except CommandError as e:
+            if any(message in e.stderr for message in NO_SUCH_DEVICE):
+                raise ValueError("no interface data") from None
+            raise
 
-        intf_state_json = await self.send_command(command)
         if intf_state_json == "":
             raise ValueError("no interface data")
 
@@ -75,7 +87,8 @@ class CumulusDriver(CLIDriver):
 
     async def set_state(self, desired_state: str) -> None:
         """
-        Configure the device interface to the desired state
+        Configure the device interface to the desired state with one "bridge -batch" command.
+        Only the VLAN changes are applied, the device is not touched if nothing changes
 
         Args:
             desired_state: desired stare - "prod" or "setup"
@@ -84,8 +97,15 @@ class CumulusDriver(CLIDriver):
             None
 
         Raises:
-            N/A
+            ConfigurationError: the interface has no VLAN for the state in the inventory,
+                the device has no such interface or rejected some batch lines
         """
+        if self.config_map[desired_state].pvid is None:
+            raise ConfigurationError(
+                f"no {desired_state} VLAN for {self.interface.name} "
+                f"of {self.device.fqdn} in inventory"
+            )
+
         try:
             actual_interface_state = await self._get_interface_vlans()
         except ValueError:
@@ -93,15 +113,38 @@ class CumulusDriver(CLIDriver):
                 f"no interface {self.interface.name} on the box {self.device.fqdn}"
             )
 
-        response = await self.send_commands(
-            cmds=self.config_map[desired_state].to_cmd(clear=actual_interface_state)
+        lines = self.config_map[desired_state].plan(actual_interface_state)
+        if not lines:
+            # The interface is in the desired state already
+            return
+
+        # All lines are applied with one command, -force keeps going after a failed line
+        # to report every error
+        result = await self.exec_command(
+            "sudo bridge -force -batch -",
+            input="\n".join(lines) + "\n",
+            operation=Operation.WRITE,
         )
+        if result.exit_status == 0:
+            return
 
-        if "No such device" in response:
+        errors = batch_errors(lines, result.stderr)
+        if any(message in error.message for error in errors for message in NO_SUCH_DEVICE):
             raise ConfigurationError(
                 f"no interface {self.interface.name} on the box {self.device.fqdn}"
             )
 
+        if not errors:
+            raise ConfigurationError(
+                f"failed to configure {self.interface.name} on the box {self.device.fqdn}: "
+                f"{result.stderr.strip() or f'exit status {result.exit_status}'}"
+            )
+
+        raise ConfigurationError(
+            f"failed to configure {self.interface.name} on the box {self.device.fqdn}: "
+            + ", ".join(f'line {error.line} "{error.command}": {error.message}' for error in errors)
+        )
+
     async def get_state(self) -> str:
         """
         Get the device real interface state from the network device
@@ -138,15 +181,6 @@ class CumulusDriver(CLIDriver):
         )
 
     # NVUE version
-    # async def set_state(self, desired_state: str) -> None:
-    #     response = await self.send_commands(cmds=self.config_map[desired_state])
-    #
-    #     if "INTERNAL SERVER ERROR" in response:
-    #         raise ConfigurationError("NVUE error")
-    #
-    #     if "Invalid config" in response:
-    #         raise ConfigurationError("attempt to apply an invalid config")
-
     # async def get_state(self) -> str:
     #     command = f"net show interface {self.interface.name} json"
     #     intf_state_json = await self.send_command(command)
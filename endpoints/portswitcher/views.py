@@ -81,8 +81,8 @@ async def switch(request: Request) -> _TemplateResponse:
     interface_name = toggling.interface.replace(" ", "")
     state = toggling.state
 
-    # Grabbing inventory
-    async with inventory_handler("netbox") as inventory:
+    # Grabbing inventory. Always configure the device with fresh inventory data
+    async with inventory_handler(settings.inventory, bypass_cache=True) as inventory:
         try:
             device = await inventory.get_device(
                 switch_name, roles=["tor"], domains=settings.domains
@@ -0,0 +1,50 @@
+from typing import Any
+
+from fastapi.routing import APIRoute, APIRouter
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from napi.driver.netconf.commit import commit_coalescer
+from napi.driver.pool import pools_stats
+from napi.driver.scheduler import scheduler
+from napi.driver.ssh import ssh_connections
+from napi.inventory import inventory_stats
+
+
+class Stats(BaseModel):
+    code: int = 200
+    status: str = "ok"
+    result: dict[str, Any]
+
+
+async def stats(request: Request) -> JSONResponse:
+    result = {
+        "code": 200,
+        "status": "ok",
+        "result": {
+            "inventory": inventory_stats(),
+            "drivers": pools_stats(),
+            "netconf_commits": commit_coalescer.stats(),
+            "scheduler": scheduler.stats(),
+            "ssh": ssh_connections.stats(),
+        },
+    }
+    return JSONResponse(status_code=200, content=result)
+
+
+stats_router = APIRouter(
+    routes=[
+        APIRoute(
+            "/stats",
+            stats,
+            methods=["GET"],
+            tags=["Stats"],
+            summary="Get worker internal statistics",
+            description="Connection and session pools, scheduler usage of the worker which served the request",
+            response_description="Worker statistics",
+            response_class=JSONResponse,
+            response_model=Stats,
+        ),
+    ],
+)
@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from enum import StrEnum, auto
 
+from napi.lib import VlanSet
+
 
 class AutoName(StrEnum):
     def _generate_next_value_(name, *_):
@@ -17,4 +19,4 @@ class BaseL2Interface:
     name: str
     mode: LinkType | None = LinkType.ACCESS
     pvid: int | None = 1
-    trunk_allowed_vlans: list[int] = field(default_factory=lambda: [1])
+    trunk_allowed_vlans: VlanSet = field(default_factory=lambda: VlanSet([1]))
@@ -1,34 +1,119 @@
+import re
+from dataclasses import dataclass
 from typing import Any, Self
 
 from napi.driver.abstract import BaseL2Interface, LinkType
-# from napi.lib import _flatten
+from napi.lib import VlanSet
 
+# "bridge -batch" reports a failed line after its error messages
+BATCH_COMMAND_FAILED = re.compile(r"^Command failed (?P<file>.+):(?P<line>\d+)$")
 
-class L2Interface(BaseL2Interface):
-    def to_cmd(self, clear: dict[str, Any] | None = None) -> list[str]:
-        cmds = []
-
-        if clear is not None:
-            cmds.extend(
-                [
-                    f"sudo bridge vlan delete dev {self.name} vid {vlan['vlan']}"
-                    for vlan in clear["vlans"]
-                ]
+
+@dataclass
+class BatchError:
+    line: int
+    command: str
+    message: str
+
+
+def batch_errors(lines: list[str], stderr: str) -> list[BatchError]:
+    """
+    Match "bridge -batch" error messages with the failed lines
+
+    Args:
+        lines: batch lines sent to the command
+        stderr: the command stderr
+
+    Returns:
+        list[BatchError]: failed lines with their error messages
+
+    Raises:
+        N/A
+    """
+    errors = []
+    messages: list[str] = []
+
+    for output_line in stderr.splitlines():
+        match = BATCH_COMMAND_FAILED.match(output_line.strip())
+        if match is None:
+            if output_line.strip():
+                messages.append(output_line.strip())
+            continue
+
+        number = int(match["line"])
+        errors.append(
+            BatchError(
+                line=number,
+                command=lines[number - 1] if 0 < number <= len(lines) else "",
+                message="; ".join(messages) or "unknown error",
             )
+        )
+        messages = []
+
+    return errors
+
+
+def _vids(vlan_info: dict[str, Any]) -> tuple[int, int]:
+    # "bridge -j vlan show" reports consecutive VLANs with the same flags as one range
+    return vlan_info["vlan"], vlan_info.get("vlanEnd", vlan_info["vlan"])
+
+
+def _vid(start: int, end: int) -> str:
+    return f"{start}-{end}" if start != end else f"{start}"
 
-        if self.mode is LinkType.ACCESS:
-            cmds.append(f"sudo bridge vlan add dev {self.name} vid {self.pvid} pvid untagged")
 
+class L2Interface(BaseL2Interface):
+    def plan(self, current: dict[str, Any]) -> list[str]:
+        """
+        Build minimal "bridge -batch" lines to get the interface from the current state
+        to this one. Only missing VLANs are added and only extra VLANs are deleted,
+        consecutive VLANs with one range command
+
+        Args:
+            current: "bridge -j vlan show" data of the interface
+
+        Returns:
+            list[str]: bridge commands without "bridge" prefix, empty if nothing changes
+
+        Raises:
+            N/A
+        """
+        vlans = VlanSet.from_ranges(_vids(vlan_info) for vlan_info in current["vlans"])
+        untagged = VlanSet.from_ranges(
+            _vids(vlan_info)
+            for vlan_info in current["vlans"]
+            if "Egress Untagged" in vlan_info.get("flags", [])
+        )
+        pvid = next(
+            (
+                vlan_info["vlan"]
+                for vlan_info in current["vlans"]
+                if "PVID" in vlan_info.get("flags", [])
+            ),
+            None,
+        )
+
+        desired = VlanSet([self.pvid])
         if self.mode is LinkType.TRUNK:
-            cmds.extend(
-                [
-                    f"sudo bridge vlan add dev {self.name} vid {vlan}"
-                    for vlan in self.trunk_allowed_vlans
-                ]
-            )
-            cmds.append(f"sudo bridge vlan add dev {self.name} vid {self.pvid} pvid untagged")
+            desired |= self.trunk_allowed_vlans
 
-        return cmds
+        # VLANs which stay but lose PVID/untagged flags are re-added as tagged
+        retag = ((untagged | ([pvid] if pvid is not None else [])) & desired) - [self.pvid]
+
+        # New PVID goes first and stale VLANs last, so the port is never left without them
+        lines = []
+        if pvid != self.pvid or self.pvid not in untagged:
+            lines.append(f"vlan add dev {self.name} vid {self.pvid} pvid untagged")
+
+        lines.extend(
+            f"vlan add dev {self.name} vid {_vid(*vids)}"
+            for vids in ((desired - vlans - [self.pvid]) | retag).ranges()
+        )
+        lines.extend(
+            f"vlan delete dev {self.name} vid {_vid(*vids)}" for vids in (vlans - desired).ranges()
+        )
+
+        return lines
 
     @classmethod
     def from_data(cls, name: str, interface_info: dict[str, Any]) -> Self:
@@ -39,64 +124,15 @@ class L2Interface(BaseL2Interface):
         else:
             pvid = None
 
+        vlans = VlanSet.from_ranges(_vids(vlan_info) for vlan_info in interface_info["vlans"])
+
         interface = cls(
             name=name,
-            mode=LinkType.ACCESS
-            if len(interface_info["vlans"]) == 1 and pvid is not None
-            else LinkType.TRUNK,
+            mode=LinkType.ACCESS if len(vlans) == 1 and pvid is not None else LinkType.TRUNK,
             pvid=pvid,
         )
 
         if interface.mode is LinkType.TRUNK:
-            interface.trunk_allowed_vlans = [
-                vlan_info["vlan"] for vlan_info in interface_info["vlans"]
-            ]
+            interface.trunk_allowed_vlans = vlans
 
         return interface
-
-    # NVUE version
-    # def to_cmd(self) -> list[str]:
-    #     cmds = []
-    #     if self.mode is LinkType.ACCESS:
-    #         cmds.extend(
-    #             [
-    #                 f"nv unset interface {self.name} bridge domain br_default access",
-    #                 f"nv unset interface {self.name} bridge domain br_default untagged",
-    #                 f"nv unset interface {self.name} bridge domain br_default vlan",
-    #                 f"nv set interface {self.name} bridge domain br_default access {self.pvid}",
-    #             ]
-    #         )
-    #
-    #     if self.mode is LinkType.TRUNK:
-    #         cmds.extend(
-    #             [
-    #                 f"nv unset interface {self.name} bridge domain br_default access",
-    #                 f"nv unset interface {self.name} bridge domain br_default untagged",
-    #                 f"nv unset interface {self.name} bridge domain br_default vlan",
-    #                 f"nv set interface {self.name} bridge domain br_default untagged {self.pvid}",
-    #                 f"nv set interface {self.name} bridge domain br_default vlan {','.join([str(v) for v in self.trunk_allowed_vlans])}",
-    #             ]
-    #         )
-    #
-    #     cmds.append(
-    #         "nv config apply",
-    #     )
-    #
-    #     return cmds
-    #
-    # @classmethod
-    # def from_data(cls, name: str, interface_info: dict[str, Any]) -> Self:
-    #     interface = cls(
-    #         name=name,
-    #         mode=LinkType.ACCESS
-    #         if interface_info["mode"].split("/")[0].lower() == "access"
-    #         else LinkType.TRUNK,
-    #         pvid=interface_info["iface_obj"]["native_vlan"],
-    #     )
-    #
-    #     if interface.mode is LinkType.TRUNK:
-    #         interface.trunk_allowed_vlans = [
-    #             int(vlan) for vlan in _flatten(interface_info["iface_obj"]["vlan_list"])
-    #         ]
-    #
-    #     return interface
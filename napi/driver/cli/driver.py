@@ -1,17 +1,60 @@
 import asyncio
+import re
+from contextlib import suppress
 from dataclasses import dataclass
-from functools import partial
 from typing import Any, Self
 
+import asyncssh
 from scrapli import AsyncScrapli
 from scrapli.driver import AsyncGenericDriver
 from scrapli.exceptions import ScrapliAuthenticationFailed, ScrapliConnectionError, ScrapliTimeout
 
-from napi.driver.lib import transform
+from napi.driver.pool import PoolLimitExceeded, SessionPool
+from napi.driver.scheduler import Operation, Priority, scheduler
+from napi.driver.ssh import ssh_connections
+from napi.logger import core_logger as logger
+from napi.settings import settings
 
 from . import constants, exceptions
 
-cmdify = partial(transform, attr="to_cmd")
+# Vendors with a plain shell on exec channels
+EXEC_VENDORS = {"nvidia"}
+
+# Commands which print JSON, e.g. "bridge -j vlan show" or "net show bridge macs json"
+JSON_COMMAND = re.compile(r"(^|\s)(-j|-json|--json|json)(\s|$)")
+
+SSH_OPTIONS = {
+    "known_hosts": None,
+    "client_keys": [constants.ssh_key],
+}
+
+
+@dataclass
+class ExecResult:
+    """
+    Result of a command run on an exec channel
+    """
+
+    stdout: str
+    stderr: str
+    exit_status: int | None
+
+
+async def _close_connection(connection: AsyncScrapli | AsyncGenericDriver) -> None:
+    await connection.close()
+
+
+def _alive(connection: AsyncScrapli | AsyncGenericDriver) -> bool:
+    return connection.isalive()
+
+
+session_pool: SessionPool[AsyncScrapli | AsyncGenericDriver] = SessionPool(
+    "cli",
+    close=_close_connection,
+    alive=_alive,
+    max_sessions=settings.cli_max_sessions,
+    idle_timeout=settings.cli_idle_timeout,
+)
 
 
 @dataclass
@@ -19,14 +62,25 @@ class CLIDriver:
     """
     CLIDriver is the base async driver class to inherit API drivers from.
 
-    It provides basic methods send_command and  send_commands to execute one or many commands in the devices shell.
+    It provides basic methods send_command and exec_command to execute commands on the device.
     It is best for API driver to inherit from CLIDriver and use its methods as part of technical implementation
     of API business logic.
 
+    SSH connections are not closed on exit but returned to the worker-wide session pool
+    and reused by the next driver instance for the same host and vendor. The shell is opened
+    lazily by the first command which needs it.
+
+    exec_command runs a command on a non-interactive exec channel of the shared SSH connection
+    without PTY and prompt handling. send_command uses it automatically for JSON commands
+    of vendors with a plain shell.
+
+    Every command takes a read or write slot of the worker-wide scheduler first.
+
     Args:
         host: host ip/name to connect to
         vendor: the network device manufacturer
         timeout: SSH connection timeout
+        priority: scheduler queue lane of the driver operations
 
     Returns:
         None
@@ -38,10 +92,16 @@ class CLIDriver:
     host: str
     vendor: str
     timeout: int = 15
+    priority: Priority = Priority.INTERACTIVE
+
+    def __post_init__(self) -> None:
+        self._connection: AsyncScrapli | AsyncGenericDriver | None = None
+        self._in_command = False
 
     async def __aenter__(self) -> Self:
         """
-        Enter method for context manager. Opens SSH connection.
+        Enter method for context manager. SSH connection is checked out from the pool
+        by the first command which needs the shell.
 
         Args:
             N/A
@@ -52,12 +112,13 @@ class CLIDriver:
         Raises:
             N/A
         """
-        await self.connect()
         return self
 
     async def __aexit__(self, *_) -> None:
         """
-        Exit method to cleanup for context manager. Closes SSH connection.
+        Exit method to cleanup for context manager. Returns SSH connection to the pool.
+        The connection is closed instead if a command was interrupted and the shell
+        did not get back to the prompt.
 
         Args:
             exception_type: exception type being raised
@@ -70,11 +131,18 @@ class CLIDriver:
         Raises:
             N/A
         """
-        await self.disconnect()
+        if self._in_command:
+            await self.disconnect()
+        elif self._connection is not None:
+            await session_pool.release((self.host, self.vendor), self._connection)
+            self._connection = None
 
     async def connect(self) -> None:
         """
-        Open SSH connection
+        Check out SSH connection from the pool or open a new one if there is no idle connection.
+
+        A pooled connection is health checked by re-synchronizing the shell prompt.
+        If it fails, idle connections to the host are dropped and a new one is opened
 
         Args:
             N/A
@@ -83,26 +151,70 @@ class CLIDriver:
             None
 
         Raises:
+            SessionLimitExceeded: cli_max_sessions to the host are busy for timeout
             Timeout: timeout is exceeded
             ConnectionError: failed to establish connection
             AuthError: failed to authenticate on network device
         """
-        self._connection = self._setup_connection()
+        key = (self.host, self.vendor)
+
+        self._connection, reused = await self._acquire(key)
+        if not reused:
+            return
+
+        try:
+            await asyncio.wait_for(self._connection.get_prompt(), timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"pooled SSH session to {self.host} is lost ({e!r}), reconnecting")
+            await self.disconnect()
+            await session_pool.purge(key)
+
+            self._connection, _ = await self._acquire(key)
 
+    async def _acquire(
+        self, key: tuple[str, str]
+    ) -> tuple[AsyncScrapli | AsyncGenericDriver, bool]:
         try:
-            await self._connection.open()
-        except ScrapliTimeout:
+            return await session_pool.acquire(key, self._open_connection, timeout=self.timeout)
+        except PoolLimitExceeded as e:
+            logger.warning(repr(e))
+            raise exceptions.SessionLimitExceeded(f"All SSH sessions to {self.host} are busy") from None
+
+    async def _open_connection(self) -> AsyncScrapli | AsyncGenericDriver:
+        """
+        Open SSH connection and wait for the shell prompt
+
+        Args:
+            N/A
+
+        Returns:
+            AsyncScrapli | AsyncGenericDriver: open scrapli driver
+
+        Raises:
+            Timeout: timeout is exceeded
+            ConnectionError: failed to establish connection
+            AuthError: failed to authenticate on network device
+        """
+        connection = self._setup_connection()
+
+        try:
+            await connection.open()
+            # The shell is ready as soon as it shows the prompt
+            await asyncio.wait_for(connection.get_prompt(), timeout=self.timeout)
+        except (ScrapliTimeout, asyncio.TimeoutError):
+            with suppress(Exception):
+                await _close_connection(connection)
             raise exceptions.Timeout(f"Connection to {self.host} timed out")
         except ScrapliConnectionError as e:
             raise ConnectionError(f"{str(e)}")
         except ScrapliAuthenticationFailed:
             raise exceptions.AuthError(f"Failed to authenticate on {self.host}")
 
-        await asyncio.sleep(0.3)
+        return connection
 
     async def disconnect(self) -> None:
         """
-        Close SSH connection
+        Close SSH connection instead of returning it to the pool
 
         Args:
             N/A
@@ -113,7 +225,9 @@ class CLIDriver:
         Raises:
             N/A
         """
-        await self._connection.close()
+        if self._connection is not None:
+            await session_pool.discard((self.host, self.vendor), self._connection)
+            self._connection = None
 
     async def send_command(self, command: str) -> str:
         """
@@ -126,25 +240,74 @@ class CLIDriver:
             str: response from the device
 
         Raises:
-            N/A
+            CommandError: the command run on an exec channel exited with non-zero status
         """
-        return (await self._connection.send_command(command)).result
-
-    @cmdify(param="cmds")
-    async def send_commands(self, cmds: list[str]) -> str:
+        if self.vendor in EXEC_VENDORS and JSON_COMMAND.search(command):
+            # JSON output needs no prompt handling and output scraping
+            result = await self.exec_command(command)
+            if result.exit_status != 0:
+                raise exceptions.CommandError(
+                    f"{command!r} on {self.host} failed: "
+                    f"{result.stderr.strip() or f'exit status {result.exit_status}'}",
+                    stderr=result.stderr,
+                    exit_status=result.exit_status,
+                )
+
+            return result.stdout
+
+        async with scheduler.slot(self.host, self.vendor, Operation.READ, self.priority):
+            await self._shell()
+
+            self._in_command = True
+            result = (await self._connection.send_command(command)).result
+            self._in_command = False
+
+        return result
+
+    async def _shell(self) -> None:
+        if self._connection is None:
+            await self.connect()
+
+    async def exec_command(
+        self, command: str, input: str | None = None, operation: Operation = Operation.READ
+    ) -> ExecResult:
         """
-        Execute a listr of command in the device shell
+        Run one command on a non-interactive exec channel of the shared SSH connection.
+        There is no PTY, so stdout and stderr are exactly what the command printed
 
         Args:
-            cmds: a list of commands to execute
+            command: actual command
+            input: data to send to the command stdin
+            operation: scheduler slot type, READ or WRITE
 
         Returns:
-            str: response from the device
+            ExecResult: stdout, stderr and exit status of the command
 
         Raises:
-            N/A
+            Timeout: timeout is exceeded
+            ConnectionError: failed to establish connection or open the channel
+            AuthError: failed to authenticate on network device
         """
-        return (await self._connection.send_commands(cmds)).result
+        async with scheduler.slot(self.host, self.vendor, operation, self.priority):
+            try:
+                async with ssh_connections.channel(
+                    self.host, constants.username, self.timeout, SSH_OPTIONS
+                ) as connection:
+                    result = await connection.run(
+                        command, input=input, check=False, timeout=self.timeout
+                    )
+            except (asyncio.TimeoutError, asyncssh.TimeoutError):
+                raise exceptions.Timeout(f"Command on {self.host} timed out") from None
+            except asyncssh.PermissionDenied:
+                raise exceptions.AuthError(f"Failed to authenticate on {self.host}") from None
+            except (asyncssh.Error, OSError) as e:
+                raise exceptions.ConnectionError(f"Exec on {self.host} failed: {e}") from None
+
+        return ExecResult(
+            stdout=result.stdout or "",
+            stderr=result.stderr or "",
+            exit_status=result.exit_status,
+        )
 
     def _setup_connection(self) -> AsyncScrapli | AsyncGenericDriver:
         """
@@ -10,6 +10,10 @@ class ConnectionError(ScrapliDriverException):
     '''Exception for SSH connection failure'''
 
 
+class SessionLimitExceeded(ConnectionError):
+    '''SSH session limit exceeded'''
+
+
 class AuthError(ScrapliDriverException):
     '''Exception for SSH auth failure'''
 
@@ -18,9 +22,20 @@ class UnsupportedVendor(ScrapliDriverException):
     '''Unsupported vendor for Scrapli connection'''
 
 
+class CommandError(ScrapliDriverException):
+    '''Command exited with non-zero status'''
+
+    def __init__(self, message: str, stderr: str = '', exit_status: int | None = None) -> None:
+        super().__init__(message)
+        self.stderr = stderr
+        self.exit_status = exit_status
+
+
 CLI_HTTP_CODE_MAP = {
     'Timeout': 522,
     'ConnectionError': 523,
     'AuthError': 511,
     'UnsupportedVendor': 405,
+    'SessionLimitExceeded': 509,
+    'CommandError': 502,
 }
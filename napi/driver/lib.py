@@ -1,15 +1,31 @@
+import inspect
+from contextlib import aclosing
 from functools import wraps
 
 
 def transform(*, param: str, attr: str):
     def decorator(func):
-        @wraps(func)
-        async def inner(*args, **kwargs):
+        def convert(kwargs):
             try:
                 kwargs[param] = getattr(kwargs[param], attr)()
             except (KeyError, AttributeError, TypeError):
                 pass
 
+        if inspect.isasyncgenfunction(func):
+
+            @wraps(func)
+            async def inner_gen(*args, **kwargs):
+                convert(kwargs)
+                # Closes the wrapped generator when the caller stops early
+                async with aclosing(func(*args, **kwargs)) as gen:
+                    async for item in gen:
+                        yield item
+
+            return inner_gen
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            convert(kwargs)
             return await func(*args, **kwargs)
 
         return inner
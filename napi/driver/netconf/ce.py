@@ -3,7 +3,7 @@ from enum import StrEnum, auto
 from typing import Any, Self
 
 from napi.driver.abstract import BaseL2Interface, LinkType
-from napi.lib import _flatten
+from napi.lib import VlanSet
 
 
 class AutoName(StrEnum):
@@ -44,7 +44,7 @@ class L2Interface(BaseL2Interface):
             }
 
         if self.mode is LinkType.TRUNK:
-            r["l2Attribute"]["trunkVlans"] = ",".join(str(v) for v in self.trunk_allowed_vlans)
+            r["l2Attribute"]["trunkVlans"] = str(self.trunk_allowed_vlans)
 
         return r
 
@@ -57,9 +57,7 @@ class L2Interface(BaseL2Interface):
         )
 
         if interface.mode is LinkType.TRUNK:
-            interface.trunk_allowed_vlans = [
-                int(vlan) for vlan in _flatten(data["l2Attribute"]["trunkVlans"])
-            ]
+            interface.trunk_allowed_vlans = VlanSet.parse(data["l2Attribute"]["trunkVlans"])
 
         return interface
 
@@ -84,6 +82,29 @@ class InterfaceTree:
     def add_interface(self, interface: L2Interface) -> None:
         self.interfaces.append(interface)
 
+    def merge(self, other: Self) -> Self:
+        """
+        Merge two trees into a new one. Interfaces of the other tree replace the same interfaces
+        of this tree
+
+        Args:
+            other: tree to merge into this one
+
+        Returns:
+            Self: merged tree
+
+        Raises:
+            N/A
+        """
+        names = {interface.name for interface in other.interfaces}
+
+        return self.__class__(
+            interfaces=[
+                *(interface for interface in self.interfaces if interface.name not in names),
+                *other.interfaces,
+            ]
+        )
+
 
 @dataclass
 class Peer:
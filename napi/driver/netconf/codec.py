@@ -0,0 +1,185 @@
+from typing import Any, Protocol, Type
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import xmltodict
+
+try:
+    from lxml import etree
+except ImportError:  # optional dependency: pip install napi[lxml]
+    etree = None
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+ATTRIBUTE_ENTITIES = {'"': "&quot;"}
+
+
+class Codec(Protocol):
+    """
+    Codec converts native python objects to NETCONF XML payloads and back.
+
+    Objects follow xmltodict conventions: "@name" keys are attributes, "#text" key is
+    the element text, lists are repeated elements and None is an empty element.
+    """
+
+    def encode(self, data: dict[str, Any]) -> bytes:
+        ...
+
+    def decode(self, message: bytes) -> dict[str, Any]:
+        ...
+
+    def pull_parser(self) -> Any:
+        ...
+
+
+def _str(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    return str(value)
+
+
+def _unparse(name: str, value: Any, out: list[str]) -> None:
+    if isinstance(value, list):
+        for item in value:
+            _unparse(name, item, out)
+        return
+
+    if value is None:
+        out.append(f"<{name}/>")
+        return
+
+    if not isinstance(value, dict):
+        out.append(f"<{name}>{escape(_str(value))}</{name}>")
+        return
+
+    out.append(f"<{name}")
+    for key, item in value.items():
+        if key[0] == "@":
+            out.append(f' {key[1:]}="{escape(_str(item), ATTRIBUTE_ENTITIES)}"')
+    out.append(">")
+
+    for key, item in value.items():
+        if key == "#text":
+            out.append(escape(_str(item)))
+        elif key[0] != "@":
+            _unparse(key, item, out)
+
+    out.append(f"</{name}>")
+
+
+def unparse(data: dict[str, Any]) -> bytes:
+    """
+    Serialize python object to compact XML the same way xmltodict.unparse does
+
+    Args:
+        data: python object following xmltodict conventions
+
+    Returns:
+        bytes: XML fragment
+
+    Raises:
+        N/A
+    """
+    out: list[str] = []
+    for name, value in data.items():
+        _unparse(name, value, out)
+
+    return "".join(out).encode()
+
+
+class XmltodictCodec:
+    """
+    XmltodictCodec is the default pure python codec powered by xmltodict
+    """
+
+    def encode(self, data: dict[str, Any]) -> bytes:
+        return xmltodict.unparse(data, full_document=False).encode()
+
+    def decode(self, message: bytes) -> dict[str, Any]:
+        return xmltodict.parse(message, dict_constructor=dict)
+
+    def pull_parser(self) -> ElementTree.XMLPullParser:
+        return ElementTree.XMLPullParser(events=("start", "end"))
+
+
+def _qname(name: str, nsmap: dict[str | None, str]) -> str:
+    if name[0] != "{":
+        return name
+
+    uri, _, local = name[1:].partition("}")
+    if uri == XML_NAMESPACE:
+        return f"xml:{local}"
+
+    for prefix, namespace in nsmap.items():
+        if namespace == uri and prefix is not None:
+            return f"{prefix}:{local}"
+
+    return local
+
+
+def _element_to_dict(element: Any, parent_nsmap: dict[str | None, str]) -> Any:
+    result: dict[str, Any] = {}
+
+    nsmap = element.nsmap
+    for prefix, uri in nsmap.items():
+        if parent_nsmap.get(prefix) != uri:
+            result["@xmlns" if prefix is None else f"@xmlns:{prefix}"] = uri
+
+    for name, value in element.attrib.items():
+        result[f"@{_qname(name, nsmap)}"] = value
+
+    for child in element:
+        if not isinstance(child.tag, str):
+            # Comments and processing instructions
+            continue
+
+        name = _qname(child.tag, nsmap) if child.prefix else child.tag.rpartition("}")[2]
+        value = _element_to_dict(child, nsmap)
+
+        if name not in result:
+            result[name] = value
+        elif isinstance(result[name], list):
+            result[name].append(value)
+        else:
+            result[name] = [result[name], value]
+
+    text = element.text.strip() if element.text else ""
+    if not result:
+        return text or None
+
+    if text:
+        result["#text"] = text
+
+    return result
+
+
+class LxmlCodec:
+    """
+    LxmlCodec parses replies with lxml (libxml2) and serializes RPCs with a compact direct writer.
+
+    The decoded objects are the same as xmltodict ones, so the codecs are interchangeable.
+    """
+
+    def __init__(self) -> None:
+        if etree is None:
+            raise ImportError("lxml codec requires lxml package: pip install napi[lxml]")
+
+        self._parser = etree.XMLParser(remove_blank_text=True, huge_tree=True)
+
+    def encode(self, data: dict[str, Any]) -> bytes:
+        return unparse(data)
+
+    def decode(self, message: bytes) -> dict[str, Any]:
+        root = etree.fromstring(message, self._parser)
+        name = _qname(root.tag, root.nsmap) if root.prefix else root.tag.rpartition("}")[2]
+
+        return {name: _element_to_dict(root, {})}
+
+    def pull_parser(self) -> Any:
+        return etree.XMLPullParser(events=("start", "end"), huge_tree=True)
+
+
+codec_map: dict[str, Type[Codec]] = {
+    "xmltodict": XmltodictCodec,
+    "lxml": LxmlCodec,
+}
@@ -0,0 +1,236 @@
+import asyncio
+from dataclasses import dataclass, field
+from functools import reduce
+from typing import Any
+
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+from . import exceptions
+from .ce import InterfaceTree
+from .driver import CANDIDATE, NetconfDriver
+
+
+@dataclass
+class _Edit:
+    driver: NetconfDriver
+    config: InterfaceTree
+    result: asyncio.Future
+    error: Exception | None = None
+    # The caller was cancelled and does not wait for the result
+    abandoned: bool = False
+
+
+def _retrieve(result: asyncio.Future) -> None:
+    if not result.cancelled():
+        result.exception()
+
+
+@dataclass
+class _Batch:
+    edits: list[_Edit] = field(default_factory=list)
+    interfaces: set[str] = field(default_factory=set)
+    closed: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class CommitCoalescer:
+    """
+    CommitCoalescer merges InterfaceTree edits of one device which arrive within a short window
+    into one edit-config to the candidate datastore followed by a single commit.
+
+    Huawei CE rejects overlapping commits with CommitError, so N concurrent writes become one.
+    Batches of a device are applied one by one. An edit of an interface already in the collecting
+    batch goes to the next batch, so every caller gets the result of its own edit.
+
+    A batch is applied on the coalescer own checkout: the session of a waiting caller is moved
+    to it and given back before the results are set, a new session is checked out if no caller
+    is waiting with a session.
+
+    If the merged edit fails, the changes are discarded and every edit is applied on its own.
+    Devices without the candidate capability get their edits applied to running one by one.
+
+    Args:
+        window: seconds to collect edits of a device before applying them
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+
+        self._batches: dict[str, _Batch] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # Number of batches of a host being collected or applied, its lock is dropped at 0
+        self._pending: dict[str, int] = {}
+        # The event loop keeps only weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+
+        self.edits = 0
+        self.commits = 0
+        self.isolated = 0
+
+    async def edit_config(self, driver: NetconfDriver, config: InterfaceTree) -> None:
+        """
+        Apply the config to the device within a coalesced candidate commit
+
+        Args:
+            driver: connected driver of the device
+            config: interfaces config to apply
+
+        Returns:
+            None
+
+        Raises:
+            RPCError: the device rejected the config
+            CommitError: the device is busy committing configurations of other users
+            Exception: any driver exception
+        """
+        interfaces = {interface.name for interface in config.interfaces}
+
+        while True:
+            batch = self._batches.get(driver.host)
+            if batch is None:
+                batch = self._batches[driver.host] = _Batch()
+                self._pending[driver.host] = self._pending.get(driver.host, 0) + 1
+                task = asyncio.create_task(self._flush(driver.host, batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            if batch.interfaces.isdisjoint(interfaces):
+                break
+
+            await batch.closed.wait()
+
+        edit = _Edit(driver, config, asyncio.get_running_loop().create_future())
+        batch.edits.append(edit)
+        batch.interfaces |= interfaces
+        self.edits += 1
+
+        # The batch is applied by its own task, so a cancelled caller does not fail the others
+        try:
+            await asyncio.shield(edit.result)
+        except asyncio.CancelledError:
+            edit.abandoned = True
+            # Nobody awaits the result any more, its error must not be reported as never retrieved
+            edit.result.add_done_callback(_retrieve)
+            raise
+
+    async def _flush(self, host: str, batch: _Batch) -> None:
+        try:
+            try:
+                await asyncio.sleep(self.window)
+            finally:
+                if self._batches.get(host) is batch:
+                    del self._batches[host]
+                batch.closed.set()
+
+            async with self._locks.setdefault(host, asyncio.Lock()):
+                await self._apply(batch)
+        except Exception as e:
+            self._fail(batch, e)
+        except BaseException:
+            self._fail(batch, exceptions.ConnectionError(f"commit to {host} was interrupted"))
+            raise
+        else:
+            for edit in batch.edits:
+                if edit.error is None:
+                    edit.result.set_result(None)
+                else:
+                    edit.result.set_exception(edit.error)
+        finally:
+            self._pending[host] -= 1
+            if not self._pending[host]:
+                del self._pending[host]
+                self._locks.pop(host, None)
+
+    def _fail(self, batch: _Batch, error: Exception) -> None:
+        for edit in batch.edits:
+            if not edit.result.done():
+                edit.result.set_exception(error)
+
+    async def _apply(self, batch: _Batch) -> None:
+        first = batch.edits[0].driver
+        driver = NetconfDriver(
+            host=first.host,
+            timeout=first.timeout,
+            reply_timeout=first.reply_timeout,
+            capabilities=first.capabilities,
+            codec=first.codec,
+            vendor=first.vendor,
+            priority=first.priority,
+        )
+
+        lender = next(
+            (edit for edit in batch.edits if not edit.abandoned and edit.driver.connected), None
+        )
+        if lender is not None:
+            driver.take_session(lender.driver)
+        else:
+            await driver.connect()
+
+        try:
+            await self._apply_batch(driver, batch)
+        finally:
+            # The results are set after the session is back, so the caller returns it to the pool
+            if lender is not None and not lender.abandoned and driver.connected:
+                lender.driver.take_session(driver)
+            await driver.__aexit__(None, None, None)
+
+    async def _apply_batch(self, driver: NetconfDriver, batch: _Batch) -> None:
+        if CANDIDATE not in driver.server_capabilities:
+            for edit in batch.edits:
+                await self._apply_one(driver, edit, target="running")
+            return
+
+        config = reduce(InterfaceTree.merge, (edit.config for edit in batch.edits))
+        try:
+            await driver.edit_config(target="candidate", config=config)
+            await driver.commit()
+        except exceptions.CommitError:
+            # The device is busy, separate commits would fail the same way
+            await self._discard_changes(driver)
+            raise
+        except exceptions.RPCError as e:
+            await self._discard_changes(driver)
+            if len(batch.edits) == 1:
+                raise
+
+            logger.debug(f"coalesced commit to {driver.host} failed, applying edits one by one: {e}")
+            self.isolated += 1
+            for edit in batch.edits:
+                await self._apply_one(driver, edit, target="candidate")
+            return
+
+        self.commits += 1
+
+    async def _apply_one(self, driver: NetconfDriver, edit: _Edit, target: str) -> None:
+        try:
+            await driver.edit_config(target=target, config=edit.config)
+            if target == "candidate":
+                await driver.commit()
+                self.commits += 1
+        except exceptions.RPCError as e:
+            if target == "candidate":
+                await self._discard_changes(driver)
+            edit.error = e
+
+    async def _discard_changes(self, driver: NetconfDriver) -> None:
+        try:
+            await driver.discard_changes()
+        except exceptions.RPCError as e:
+            logger.error(f"failed to discard candidate changes on {driver.host}: {e}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "window": self.window,
+            "edits": self.edits,
+            "commits": self.commits,
+            "isolated": self.isolated,
+        }
+
+
+commit_coalescer = CommitCoalescer(window=settings.netconf_commit_window)
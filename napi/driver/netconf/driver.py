@@ -1,21 +1,376 @@
 import asyncio
-from copy import deepcopy
+import itertools
+import re
+from contextlib import AbstractAsyncContextManager, aclosing
 from dataclasses import dataclass, field
 from functools import partial
-from typing import Any, Self
+from typing import Any, AsyncIterator, Self
+from xml.sax.saxutils import escape
 
 import asyncssh
-import xmltodict
 
 from napi.driver.lib import transform
+from napi.driver.pool import PoolLimitExceeded, SessionPool
+from napi.driver.scheduler import Operation, Priority, scheduler
+from napi.driver.ssh import ssh_connections
 from napi.logger import core_logger as logger
+from napi.settings import settings
 
 from . import constants, exceptions, rpcs
+from .codec import Codec, codec_map
 
 asyncssh.set_debug_level(1)
 
 asdictify = partial(transform, attr="as_dict")
 
+# Errors of a session which was closed by the device or lost in between API requests
+SESSION_ERRORS = (asyncssh.Error, asyncio.IncompleteReadError, BrokenPipeError, ConnectionResetError)
+
+
+# rpc-reply message-id is looked up in the rpc-reply start tag only, the tag must fit in the head
+RPC_REPLY_TAG = re.compile(rb"<(?:[\w.-]+:)?rpc-reply\b[^>]*>")
+MESSAGE_ID = re.compile(rb"""\s(?:[\w.-]+:)?message-id\s*=\s*(["'])(.*?)\1""", re.DOTALL)
+MESSAGE_ID_HEAD = 65536
+
+BASE_1_0 = "urn:ietf:params:netconf:base:1.0"
+BASE_1_1 = "urn:ietf:params:netconf:base:1.1"
+CANDIDATE = "urn:ietf:params:netconf:capability:candidate:1.0"
+END_OF_MESSAGE = b"]]>]]>"
+END_OF_CHUNKS = b"\n##\n"
+READ_SIZE = 65536
+
+SSH_OPTIONS = {
+    "known_hosts": None,
+    "client_keys": constants.ssh_keys,
+    "kex_algs": ["ecdh-sha2-nistp256"],
+    "server_host_key_algs": ["ssh-rsa"],
+    "encryption_algs": ["aes128-ctr"],
+    "mac_algs": ["hmac-sha2-256"],
+    "compression_algs": ["none"],
+}
+
+
+def _rpc_error(text: str) -> exceptions.RPCError:
+    if "The system is busy in committing configurations of other users" in text:
+        return exceptions.CommitError(text)
+
+    return exceptions.RPCError(text)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _element_to_dict(element: Any) -> Any:
+    """
+    Convert XML element to native python object the same way xmltodict does (without attributes)
+
+    Args:
+        element: XML element
+
+    Returns:
+        Any: element text or dict of its children. Repeated children are collected to a list
+
+    Raises:
+        N/A
+    """
+    if len(element) == 0:
+        return element.text.strip() if element.text and element.text.strip() else None
+
+    result: dict[str, Any] = {}
+    for child in element:
+        if not isinstance(child.tag, str):
+            # Comments and processing instructions
+            continue
+
+        name = _local_name(child.tag)
+        value = _element_to_dict(child)
+
+        if name not in result:
+            result[name] = value
+        elif isinstance(result[name], list):
+            result[name].append(value)
+        else:
+            result[name] = [result[name], value]
+
+    return result
+
+
+@dataclass
+class NetconfSession:
+    """
+    NetconfSession is an open NETCONF session (netconf subsystem channel of the shared
+    SSH connection to the host) which outlives NetconfDriver instances in the session pool.
+
+    Every RPC gets a unique message-id. The background reader routes each rpc-reply to
+    the RPC waiting for it by message-id, so many RPCs might be in flight on one session.
+
+    Messages are framed with base:1.1 chunks if both peers advertise it, otherwise with
+    base:1.0 end-of-message marker.
+    """
+
+    connection: asyncssh.SSHClientConnection
+    writer: asyncssh.SSHWriter
+    reader: asyncssh.SSHReader
+    capabilities: list[str] = field(default_factory=list)
+    session_id: str | None = None
+    chunked: bool = False
+
+    def __post_init__(self) -> None:
+        self._message_ids = itertools.count(1)
+        self._pending: dict[str, asyncio.Queue[bytes | Exception | None]] = {}
+        self._demux_task: asyncio.Task | None = None
+        self._buffer = bytearray()
+
+    def alive(self) -> bool:
+        return (
+            not self.connection.is_closed()
+            and not self.writer.channel.is_closing()
+            and (self._demux_task is None or not self._demux_task.done())
+        )
+
+    def start(self) -> None:
+        """
+        Start the replies reader. Must be called after hello exchange
+
+        Args:
+            N/A
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        self._demux_task = asyncio.create_task(self._demux())
+
+    def write(self, message: bytes) -> None:
+        """
+        Send NETCONF message with the negotiated framing
+
+        Args:
+            message: XML message
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        logger.debug(f"_write {message!r}")
+
+        if self.chunked:
+            self.writer.write(b"\n#%d\n%b%b" % (len(message), message, END_OF_CHUNKS))
+        else:
+            self.writer.write(message + END_OF_MESSAGE)
+
+    async def _fill(self) -> None:
+        data = await self.reader.read(READ_SIZE)
+        if not data:
+            raise asyncio.IncompleteReadError(bytes(self._buffer), None)
+
+        self._buffer += data
+
+    async def _take(self, size: int) -> bytes:
+        if not self._buffer:
+            await self._fill()
+
+        part = bytes(self._buffer[:size])
+        del self._buffer[:size]
+
+        return part
+
+    async def _parts(self) -> AsyncIterator[bytes]:
+        """
+        Read the next NETCONF message with the negotiated framing part by part as it arrives.
+
+        Chunked messages are read by the chunk sizes, so only the short chunk headers are scanned.
+        Messages with end-of-message marker are scanned for it in the newly read bytes only
+
+        Args:
+            N/A
+
+        Returns:
+            AsyncIterator[bytes]: message parts
+
+        Raises:
+            ProtocolError: invalid chunk header
+            IncompleteReadError: the session is closed
+        """
+        if not self.chunked:
+            while (end := self._buffer.find(END_OF_MESSAGE)) < 0:
+                # Keep the tail since the marker might be split between reads
+                tail = len(END_OF_MESSAGE) - 1
+                if len(self._buffer) > tail:
+                    yield await self._take(len(self._buffer) - tail)
+
+                await self._fill()
+
+            if end:
+                yield await self._take(end)
+
+            del self._buffer[: len(END_OF_MESSAGE)]
+            return
+
+        while True:
+            while (end := self._buffer.find(b"\n", 2)) < 0:
+                await self._fill()
+
+            header = bytes(self._buffer[: end + 1])
+            del self._buffer[: end + 1]
+
+            if header == END_OF_CHUNKS:
+                return
+
+            if not header.startswith(b"\n#") or not header[2:-1].isdigit():
+                raise asyncssh.ProtocolError(f"invalid NETCONF chunk header {header!r}")
+
+            size = int(header[2:-1])
+            while size:
+                part = await self._take(min(size, READ_SIZE))
+                size -= len(part)
+                yield part
+
+    async def read(self) -> bytes:
+        """
+        Read the next NETCONF message as a whole
+
+        Args:
+            N/A
+
+        Returns:
+            bytes: XML message
+
+        Raises:
+            ProtocolError: invalid chunk header
+            IncompleteReadError: the session is closed
+        """
+        message = b"".join([part async for part in self._parts()])
+        logger.debug(f"_read {message!r}")
+
+        return message
+
+    def _fail_pending(self, error: Exception) -> None:
+        for queue in self._pending.values():
+            queue.put_nowait(error)
+
+        self._pending.clear()
+
+    async def _demux(self) -> None:
+        try:
+            while True:
+                head: bytes | None = b""
+                message_id: str | None = None
+
+                async for part in self._parts():
+                    if message_id is not None:
+                        if (queue := self._pending.get(message_id)) is not None:
+                            queue.put_nowait(part)
+                        continue
+
+                    if head is None:
+                        # Nobody waits for the reply, e.g. its RPC was cancelled
+                        continue
+
+                    head += part
+                    tag = RPC_REPLY_TAG.search(head)
+                    if tag is None and len(head) < MESSAGE_ID_HEAD:
+                        continue
+
+                    match = MESSAGE_ID.search(tag.group()) if tag is not None else None
+                    if match is None or (queue := self._pending.get(match.group(2).decode())) is None:
+                        logger.debug(f"dropped NETCONF reply with unknown message-id: {head[:200]!r}")
+                        head = None
+                        continue
+
+                    message_id = match.group(2).decode()
+                    queue.put_nowait(head)
+
+                if message_id is not None and (queue := self._pending.pop(message_id, None)) is not None:
+                    queue.put_nowait(None)
+                elif head:
+                    logger.debug(f"dropped NETCONF message without message-id: {head[:200]!r}")
+        except asyncio.CancelledError:
+            self._fail_pending(ConnectionResetError("NETCONF session is closed"))
+            raise
+        except Exception as e:
+            self._fail_pending(e)
+
+    async def request_parts(self, operation: bytes, timeout: float) -> AsyncIterator[bytes]:
+        """
+        Send NETCONF RPC with a new message-id and get its reply part by part as it arrives
+
+        Args:
+            operation: serialized RPC operation, e.g. <get>...</get>
+            timeout: seconds to wait for every next part of the reply
+
+        Returns:
+            AsyncIterator[bytes]: raw rpc-reply parts
+
+        Raises:
+            asyncio.TimeoutError: the reply or its next part did not arrive for timeout
+            Exception: the session is lost
+        """
+        message_id = str(next(self._message_ids))
+
+        queue: asyncio.Queue[bytes | Exception | None] = asyncio.Queue()
+        self._pending[message_id] = queue
+
+        try:
+            self.write(rpcs.rpc % (message_id.encode(), operation))
+
+            while (part := await asyncio.wait_for(queue.get(), timeout)) is not None:
+                if isinstance(part, Exception):
+                    raise part
+
+                logger.debug(f"_read {part!r}")
+                yield part
+        finally:
+            self._pending.pop(message_id, None)
+
+    async def request(self, operation: bytes, timeout: float) -> bytes:
+        """
+        Send NETCONF RPC with a new message-id and wait for its whole reply
+
+        Args:
+            operation: serialized RPC operation, e.g. <get>...</get>
+            timeout: seconds to wait for the whole reply
+
+        Returns:
+            bytes: raw rpc-reply
+
+        Raises:
+            asyncio.TimeoutError: the reply did not arrive for timeout
+            Exception: the session is lost
+        """
+
+        async def read() -> bytes:
+            async with aclosing(self.request_parts(operation, timeout)) as parts:
+                return b"".join([part async for part in parts])
+
+        return await asyncio.wait_for(read(), timeout)
+
+    async def close(self) -> None:
+        if self.alive():
+            self.write(rpcs.rpc % (str(next(self._message_ids)).encode(), rpcs.close))
+
+        if self._demux_task is not None:
+            self._demux_task.cancel()
+
+        # Only the channel is closed, the connection is shared with other sessions
+        self.writer.close()
+
+
+default_codec: Codec = codec_map[settings.netconf_codec]()
+
+session_pool: SessionPool[NetconfSession] = SessionPool(
+    "netconf",
+    close=NetconfSession.close,
+    alive=NetconfSession.alive,
+    max_sessions=settings.netconf_max_sessions,
+    idle_timeout=settings.netconf_idle_timeout,
+)
+
 
 @dataclass
 class NetconfDriver:
@@ -26,10 +381,20 @@ class NetconfDriver:
     driver to inherit from NetconfDriver and use its methods as part of technical implementation
     of API business logic.
 
+    NETCONF sessions are not closed on exit but returned to the worker-wide session pool
+    and reused by the next driver instance for the same host.
+
+    Every RPC takes a read or write slot of the worker-wide scheduler first.
+
     Args:
         host: host ip/name to connect to
         timeout: SSH connection timeout
+        reply_timeout: seconds to wait for an RPC reply or its next part, netconf_reply_timeout
+            setting by default
         capabilities: NETCONF capabilities
+        codec: XML codec, netconf_codec setting by default
+        vendor: the network device manufacturer for per-vendor scheduler limits
+        priority: scheduler queue lane of the driver operations
 
     Returns:
         None
@@ -40,11 +405,20 @@ class NetconfDriver:
 
     host: str
     timeout: int = 5
+    reply_timeout: float = field(default_factory=lambda: settings.netconf_reply_timeout)
     capabilities: list[str] = field(default_factory=lambda: rpcs.capabilities)
+    codec: Codec = field(default_factory=lambda: default_codec)
+    vendor: str = ""
+    priority: Priority = Priority.INTERACTIVE
+
+    def __post_init__(self) -> None:
+        self._session: NetconfSession | None = None
+        self._reused = False
+        self._reconnect_lock = asyncio.Lock()
 
     async def __aenter__(self) -> Self:
         """
-        Enter method for context manager. Opens NETCONF connection.
+        Enter method for context manager. Checks out NETCONF session from the pool.
 
         Args:
             N/A
@@ -60,7 +434,8 @@ class NetconfDriver:
 
     async def __aexit__(self, *_) -> None:
         """
-        Exit method to cleanup for context manager. Closes NETCONF connection.
+        Exit method to cleanup for context manager. Returns NETCONF session to the pool.
+        The session is closed instead if it is lost.
 
         Args:
             exception_type: exception type being raised
@@ -73,11 +448,18 @@ class NetconfDriver:
         Raises:
             N/A
         """
-        self.disconnect()
+        if self._session is None:
+            return
+
+        if not self._session.alive():
+            await self.disconnect()
+        else:
+            await session_pool.release(self.host, self._session)
+            self._session = None
 
     async def connect(self) -> None:
         """
-        Open NETCONF connection. Automatically sends hello RPC after the connection is open
+        Check out NETCONF session from the pool or open a new one if there is no idle session
 
         Args:
             N/A
@@ -85,6 +467,34 @@ class NetconfDriver:
         Returns:
             None
 
+        Raises:
+            NetconfSessionLimitExceeded: netconf_max_sessions to the host are busy for timeout
+            Timeout: timeout is exceeded
+            ConnectionError: failed to establish connection
+            AuthError: failed to authenticate on network device
+            Exception: any unexpected error
+        """
+        try:
+            self._session, self._reused = await session_pool.acquire(
+                self.host, self._open_session, timeout=self.timeout
+            )
+        except PoolLimitExceeded as e:
+            logger.warning(repr(e))
+            raise exceptions.NetconfSessionLimitExceeded(
+                f"All NETCONF sessions to {self.host} are busy"
+            ) from None
+
+    async def _open_session(self) -> NetconfSession:
+        """
+        Open NETCONF session as a channel of the shared SSH connection to the host.
+        Automatically sends hello RPC after the channel is open
+
+        Args:
+            N/A
+
+        Returns:
+            NetconfSession: open NETCONF session
+
         Raises:
             Timeout: timeout is exceeded
             ConnectionError: failed to establish connection
@@ -92,19 +502,14 @@ class NetconfDriver:
             Exception: any unexpected error
         """
         try:
-            self._connection = await asyncio.wait_for(
-                asyncssh.connect(
-                    self.host,
-                    known_hosts=None,
-                    username=constants.username,
-                    client_keys=constants.ssh_keys,
-                    kex_algs=["ecdh-sha2-nistp256"],
-                    server_host_key_algs=["ssh-rsa"],
-                    encryption_algs=["aes128-ctr"],
-                    mac_algs=["hmac-sha2-256"],
-                    compression_algs=["none"],
-                ),
-                timeout=self.timeout,
+            # Raw bytes channel on the shared connection, so chunked framing sizes are byte accurate
+            connection, writer, reader = await ssh_connections.open_session(
+                self.host,
+                constants.username,
+                self.timeout,
+                SSH_OPTIONS,
+                subsystem="netconf",
+                encoding=None,
             )
         except asyncio.exceptions.TimeoutError as e:
             logger.critical(repr(e), exc_info=True)
@@ -121,22 +526,30 @@ class NetconfDriver:
         except asyncssh.misc.PermissionDenied as e:
             logger.critical(repr(e), exc_info=True)
             raise exceptions.AuthError(f"Failed to authenticate on {self.host}") from None
+        except asyncssh.misc.ChannelOpenError:
+            raise exceptions.ConnectionError(f"Connection to {self.host} refused by host") from None
         except Exception as e:
             logger.critical(repr(e), exc_info=True)
             raise
 
+        self._session = NetconfSession(connection=connection, writer=writer, reader=reader)
+
         try:
-            self._writer, self._reader, _ = await self._connection.open_session(subsystem="netconf")
-        except asyncssh.misc.ChannelOpenError:
-            raise exceptions.ConnectionError(f"Connection to {self.host} refused by host") from None
+            self._negotiate(await self._read())
+            self._hello()
+        except BaseException:
+            self._session = None
+            writer.close()
+            raise
+
+        self._session.chunked = BASE_1_1 in self._session.capabilities and BASE_1_1 in self.capabilities
+        self._session.start()
 
-        await self._read()
-        self._hello()
-        await asyncio.sleep(0.01)
+        return self._session
 
-    def disconnect(self) -> None:
+    async def disconnect(self) -> None:
         """
-        Close NETCONF connection
+        Close NETCONF session instead of returning it to the pool
 
         Args:
             N/A
@@ -147,8 +560,66 @@ class NetconfDriver:
         Raises:
             N/A
         """
-        self._write(rpcs.close)
-        self._connection.close()
+        session, self._session = self._session, None
+        if session is not None:
+            await session_pool.discard(self.host, session)
+
+    def take_session(self, driver: "NetconfDriver") -> None:
+        """
+        Move the checked out NETCONF session of another driver of the host to this driver.
+        The other driver is not connected then and does not return the session to the pool
+
+        Args:
+            driver: driver holding the session
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        self._session, self._reused = driver._session, driver._reused
+        driver._session = None
+
+    @property
+    def connected(self) -> bool:
+        """
+        The driver holds a NETCONF session
+        """
+        return self._session is not None
+
+    @property
+    def server_capabilities(self) -> list[str]:
+        """
+        NETCONF capabilities advertised by the device in its hello
+        """
+        return self._session.capabilities if self._session is not None else []
+
+    def _negotiate(self, hello: dict[str, Any]) -> None:
+        """
+        Store the device capabilities and session id from its hello
+
+        Args:
+            hello: the device hello message
+
+        Returns:
+            None
+
+        Raises:
+            ConnectionError: the device did not send hello
+        """
+        if "hello" not in hello:
+            raise exceptions.ConnectionError(f"{self.host} did not send NETCONF hello")
+
+        capabilities = (hello["hello"].get("capabilities") or {}).get("capability") or []
+        if not isinstance(capabilities, list):
+            capabilities = [capabilities]
+
+        self._session.capabilities = [capability.strip() for capability in capabilities]
+        self._session.session_id = hello["hello"].get("session-id")
+
+        if BASE_1_0 not in self._session.capabilities and BASE_1_1 not in self._session.capabilities:
+            raise exceptions.ConnectionError(f"{self.host} does not support NETCONF base capability")
 
     def _hello(self) -> None:
         """
@@ -163,13 +634,16 @@ class NetconfDriver:
         Raises:
             N/A
         """
-        payload: dict[str, Any] = deepcopy(rpcs.hello)
-        payload["hello"]["capabilities"]["capability"] = self.capabilities
-        self._write(payload)
+        self._session.write(
+            rpcs.hello
+            % b"".join(rpcs.capability % escape(capability).encode() for capability in self.capabilities)
+        )
 
     async def _read(self) -> dict[str, Any]:
         """
-        Read NETCONF RPC reply from channel. Reads from channel until "]]>]]>" sequence is found
+        Read NETCONF message from channel. Reads from channel until "]]>]]>" sequence is found.
+        Used for hello exchange only (always base:1.0 framed), RPC replies are read by
+        the session demultiplexer
 
         Args:
             N/A
@@ -183,10 +657,25 @@ class NetconfDriver:
             RPCError: the device responded with an RPC error
                 Probably due to invalid RPC sent
         """
-        rpc_reply = await self._reader.readuntil("]]>]]>")
-        logger.debug(f"_read {rpc_reply}")
+        return self._parse(await self._session.read())
+
+    def _parse(self, rpc_reply: bytes) -> dict[str, Any]:
+        """
+        Parse NETCONF message
+
+        Args:
+            rpc_reply: raw XML message
 
-        rpc_reply_data = xmltodict.parse(rpc_reply[:-6], dict_constructor=dict)
+        Returns:
+            dict[str, Any]: any XML response converted to native python object
+
+        Raises:
+            CommitError: the device is not able to save configuration due to another
+                save job is running
+            RPCError: the device responded with an RPC error
+                Probably due to invalid RPC sent
+        """
+        rpc_reply_data = self.codec.decode(rpc_reply)
         reply = rpc_reply_data["rpc-reply"] if "rpc-reply" in rpc_reply_data else None
         if reply is not None and "rpc-error" in reply:
             if isinstance(reply["rpc-error"], list):
@@ -195,34 +684,169 @@ class NetconfDriver:
                 message = reply["rpc-error"]["error-message"]
 
             if isinstance(message, dict) and "#text" in message:
-                text = message["#text"]
-
-                if "The system is busy in committing configurations of other users" in text:
-                    raise exceptions.CommitError(text)
-
-                raise exceptions.RPCError(text)
+                raise _rpc_error(message["#text"])
 
             raise exceptions.RPCError(reply["rpc-error"]["error-message"])
 
         return rpc_reply_data
 
-    def _write(self, data: dict[str, Any]) -> None:
+    def _filter(self, filter_: dict[str, Any] | None) -> bytes:
+        return rpcs.filter_ % self.codec.encode(filter_) if filter_ is not None else b""
+
+    async def _reconnect(self, session: NetconfSession, error: Exception, attempt: int) -> None:
         """
-        Send NETCONF RPC to channel. Converts python object to XML and sends it as an RPC XML payload
+        Replace the lost session with a new one if it was got from the pool and
+        the RPC is not retried yet
 
         Args:
-            data: arbitrary data to convert to XML
+            session: the lost session
+            error: the session error
+            attempt: RPC attempt number starting from 0
 
         Returns:
             None
 
         Raises:
-            N/A
+            ConnectionError: the session is lost and might not be replaced
         """
-        xml_data = xmltodict.unparse(data, full_document=False, pretty=True) + "]]>]]>"
-        logger.debug(f"_write {xml_data}")
+        if attempt or not self._reused:
+            await self.disconnect()
+            logger.critical(repr(error), exc_info=True)
+            raise exceptions.ConnectionError(f"Lost connection to {self.host}") from None
+
+        # Concurrent RPCs of the lost session reconnect only once
+        async with self._reconnect_lock:
+            if self._session is session:
+                logger.warning(
+                    f"pooled NETCONF session to {self.host} is lost ({error!r}), reconnecting"
+                )
+                await self.disconnect()
+                await session_pool.purge(self.host)
+                await self.connect()
+
+    async def _rpc_parts(self, operation: bytes) -> AsyncIterator[bytes]:
+        """
+        Send NETCONF RPC and get its reply part by part as it arrives. Many RPCs might be sent
+        concurrently. If the session got from the pool turns out to be closed by the device,
+        idle sessions to the host are dropped and the RPC is retried once on a new session
 
-        self._writer.write(xml_data)
+        Args:
+            operation: serialized RPC operation
+
+        Returns:
+            AsyncIterator[bytes]: raw rpc-reply parts
+
+        Raises:
+            Timeout: the device did not send the reply or its next part for reply_timeout
+            ConnectionError: the session is lost
+        """
+        for attempt in range(2):
+            session = self._session
+            if session is None:
+                break
+
+            parts = session.request_parts(operation, self.reply_timeout)
+            try:
+                part = await anext(parts, None)
+            except asyncio.TimeoutError:
+                raise exceptions.Timeout(
+                    f"{self.host} did not reply in {self.reply_timeout}s"
+                ) from None
+            except SESSION_ERRORS as e:
+                await self._reconnect(session, e, attempt)
+                continue
+
+            try:
+                while part is not None:
+                    yield part
+                    part = await anext(parts, None)
+            except asyncio.TimeoutError:
+                raise exceptions.Timeout(
+                    f"{self.host} did not reply in {self.reply_timeout}s"
+                ) from None
+            except SESSION_ERRORS as e:
+                await self.disconnect()
+                logger.critical(repr(e), exc_info=True)
+                raise exceptions.ConnectionError(f"Lost connection to {self.host}") from None
+            finally:
+                await parts.aclose()
+
+            return
+
+        raise exceptions.ConnectionError(f"Lost connection to {self.host}")
+
+    async def _rpc(self, operation: bytes) -> dict[str, Any]:
+        """
+        Send NETCONF RPC and wait for its whole reply
+
+        Args:
+            operation: serialized RPC operation
+
+        Returns:
+            dict[str, Any]: any XML response converted to native python object
+
+        Raises:
+            ConnectionError: the session is lost
+        """
+        return self._parse(b"".join([part async for part in self._rpc_parts(operation)]))
+
+    async def _rpc_iter(self, operation: bytes, tag: str) -> AsyncIterator[dict[str, Any]]:
+        """
+        Send NETCONF RPC and parse its reply incrementally as it arrives.
+        Every element with the tag is yielded as soon as it is parsed and dropped from the tree,
+        so the whole reply is never kept in memory
+
+        Args:
+            operation: serialized RPC operation
+            tag: local name (without namespace) of the elements to yield
+
+        Returns:
+            AsyncIterator[dict[str, Any]]: the elements converted to native python objects
+
+        Raises:
+            CommitError: the device is not able to save configuration due to another
+                save job is running
+            RPCError: the device responded with an RPC error
+            ConnectionError: the session is lost
+        """
+        parser = self.codec.pull_parser()
+        parents: list[Any] = []
+
+        # The reply generator is closed right away if the iteration stops early,
+        # so its pending reply queue does not outlive the RPC
+        async with aclosing(self._rpc_parts(operation)) as parts:
+            async for part in parts:
+                parser.feed(part)
+
+                for event, element in parser.read_events():
+                    if event == "start":
+                        parents.append(element)
+                        continue
+
+                    parents.pop()
+                    name = _local_name(element.tag)
+
+                    if name == "rpc-error":
+                        message = next(
+                            (
+                                child.text
+                                for child in element
+                                if _local_name(child.tag) == "error-message"
+                            ),
+                            None,
+                        )
+                        raise _rpc_error((message or "").strip())
+
+                    if name == tag:
+                        yield _element_to_dict(element)
+
+                        if parents:
+                            parents[-1].remove(element)
+
+        parser.close()
+
+    def _slot(self, operation: Operation) -> AbstractAsyncContextManager[None]:
+        return scheduler.slot(self.host, self.vendor, operation, self.priority)
 
     @asdictify(param="filter_")
     async def get(self, *, filter_: dict[str, Any] | None = None) -> dict[str, Any]:
@@ -238,16 +862,33 @@ class NetconfDriver:
         Raises:
             N/A
         """
-        payload: dict[str, Any] = deepcopy(rpcs.get)
+        async with self._slot(Operation.READ):
+            return await self._rpc(rpcs.get % self._filter(filter_))
 
-        if filter_ is not None:
-            payload["rpc"]["get"]["filter"] = {
-                "@type": "subtree",
-                **filter_,
-            }
+    @asdictify(param="filter_")
+    async def get_iter(
+        self, *, tag: str, filter_: dict[str, Any] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        High level NETCONF get method for big replies. The reply is parsed incrementally and
+        the elements with the tag are yielded as they arrive
 
-        self._write(payload)
-        return await self._read()
+        Args:
+            tag: local name (without namespace) of the elements to yield, e.g. "vlanFdbDynamic"
+            filter_: arbitrary data to convert to XML
+
+        Returns:
+            AsyncIterator[dict[str, Any]]: the elements converted to native python objects
+
+        Raises:
+            N/A
+        """
+        async with (
+            self._slot(Operation.READ),
+            aclosing(self._rpc_iter(rpcs.get % self._filter(filter_), tag)) as elements,
+        ):
+            async for element in elements:
+                yield element
 
     @asdictify(param="filter_")
     async def get_config(
@@ -265,16 +906,8 @@ class NetconfDriver:
         Raises:
             N/A
         """
-        payload: dict[str, Any] = deepcopy(rpcs.get_config)
-        payload["rpc"]["get-config"]["source"] = {source: None}
-        if filter_ is not None:
-            payload["rpc"]["get-config"]["filter"] = {
-                "@type": "subtree",
-                **filter_,
-            }
-
-        self._write(payload)
-        return await self._read()
+        async with self._slot(Operation.READ):
+            return await self._rpc(rpcs.get_config % (source.encode(), self._filter(filter_)))
 
     @asdictify(param="config")
     async def edit_config(self, *, target="running", config: dict[str, Any]) -> dict[str, Any]:
@@ -291,11 +924,38 @@ class NetconfDriver:
         Raises:
             N/A
         """
-        payload: dict[str, Any] = deepcopy(rpcs.edit_config)
-        payload["rpc"]["edit-config"] = {
-            "target": {target: None},
-            "config": {**config},
-        }
+        async with self._slot(Operation.WRITE):
+            return await self._rpc(rpcs.edit_config % (target.encode(), self.codec.encode(config)))
+
+    async def commit(self) -> dict[str, Any]:
+        """
+        High level NETCONF commit method. Commits the candidate configuration database to running
+
+        Args:
+            N/A
+
+        Returns:
+            dict[str, Any]: any XML response converted to native python object
+
+        Raises:
+            N/A
+        """
+        async with self._slot(Operation.WRITE):
+            return await self._rpc(rpcs.commit)
+
+    async def discard_changes(self) -> dict[str, Any]:
+        """
+        High level NETCONF discard_changes method. Reverts the candidate configuration database
+        to running
 
-        self._write(payload)
-        return await self._read()
+        Args:
+            N/A
+
+        Returns:
+            dict[str, Any]: any XML response converted to native python object
+
+        Raises:
+            N/A
+        """
+        async with self._slot(Operation.WRITE):
+            return await self._rpc(rpcs.discard_changes)
@@ -1,52 +1,26 @@
 capabilities = [
     "urn:ietf:params:netconf:base:1.0",
+    "urn:ietf:params:netconf:base:1.1",
 ]
 
-hello = {
-    "hello": {
-        "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
-        "capabilities": {
-            "capability": None,
-        },
-    }
-}
-
-close = {
-    "rpc": {
-        "@message-id": "1",
-        "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
-        "close-session": None,
-    }
-}
-
-get = {
-    "rpc": {
-        "@message-id": "1",
-        "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
-        "get": {},
-    }
-}
-
-get_config = {
-    "rpc": {
-        "@message-id": "1",
-        "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
-        "get-config": {},
-    }
-}
-
-edit_config = {
-    "rpc": {
-        "@message-id": "1",
-        "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
-        "edit-config": None,
-    }
-}
-
-commit = {
-    "rpc": {
-        "@message-id": "1",
-        "@xmlns": "urn:ietf:params:xml:ns:netconf:base:1.0",
-        "commit": None,
-    }
-}
+# Pre-serialized envelopes. Only message-id and the operation body are filled in per RPC
+
+hello = b'<hello xmlns="urn:ietf:params:xml:ns:netconf:base:1.0"><capabilities>%b</capabilities></hello>'
+
+capability = b"<capability>%b</capability>"
+
+rpc = b'<rpc message-id="%b" xmlns="urn:ietf:params:xml:ns:netconf:base:1.0">%b</rpc>'
+
+close = b"<close-session/>"
+
+get = b"<get>%b</get>"
+
+get_config = b"<get-config><source><%b/></source>%b</get-config>"
+
+edit_config = b"<edit-config><target><%b/></target><config>%b</config></edit-config>"
+
+commit = b"<commit/>"
+
+discard_changes = b"<discard-changes/>"
+
+filter_ = b'<filter type="subtree">%b</filter>'
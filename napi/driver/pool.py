@@ -0,0 +1,283 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from napi.logger import core_logger as logger
+
+S = TypeVar("S")
+
+
+class PoolLimitExceeded(Exception):
+    """No session became available in time"""
+
+
+@dataclass
+class _Idle(Generic[S]):
+    session: S
+    since: float
+
+
+class SessionPool(Generic[S]):
+    """
+    SessionPool keeps open device sessions of the worker to reuse them between API requests.
+
+    Sessions are pooled per key (e.g. host). A session is checked out with acquire and must be
+    returned with release if it is still usable or discard otherwise.
+
+    Args:
+        name: pool name for logs and stats
+        close: coroutine function to close a session
+        alive: function to check if an idle session might be reused
+        max_sessions: maximum number of open sessions per key
+        idle_timeout: seconds an idle session is kept open
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    def __init__(
+        self,
+        name: str,
+        close: Callable[[S], Awaitable[None]],
+        alive: Callable[[S], bool],
+        max_sessions: int,
+        idle_timeout: float,
+    ) -> None:
+        self.name = name
+        self._close = close
+        self._alive = alive
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+
+        self._idle: dict[Hashable, list[_Idle[S]]] = {}
+        self._open_count: dict[Hashable, int] = {}
+        self._released: dict[Hashable, asyncio.Condition] = {}
+        self._reaper: asyncio.Task | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        pools.append(self)
+
+    def _condition(self, key: Hashable) -> asyncio.Condition:
+        return self._released.setdefault(key, asyncio.Condition())
+
+    async def _evict(self, key: Hashable, session: S, reason: str) -> None:
+        self._open_count[key] -= 1
+        self.evictions += 1
+        logger.debug(f"{self.name} pool evicts {reason} session to {key}")
+
+        try:
+            await self._close(session)
+        except Exception as e:
+            logger.debug(f"{self.name} pool failed to close session to {key}: {e!r}")
+
+    async def acquire(
+        self, key: Hashable, open_: Callable[[], Awaitable[S]], timeout: float
+    ) -> tuple[S, bool]:
+        """
+        Check out an idle session or open a new one
+
+        Args:
+            key: pool key
+            open_: coroutine function to open a new session
+            timeout: seconds to wait for a session if the key has max_sessions open already
+
+        Returns:
+            tuple[S, bool]: session and True if it is reused from the pool
+
+        Raises:
+            PoolLimitExceeded: no session became available in time
+            Exception: any exception of open_
+        """
+        condition = self._condition(key)
+        deadline = time.monotonic() + timeout
+
+        async with condition:
+            while True:
+                idle = self._idle.get(key, [])
+                while idle:
+                    entry = idle.pop()
+                    if time.monotonic() - entry.since > self.idle_timeout:
+                        await self._evict(key, entry.session, "expired")
+                    elif not self._alive(entry.session):
+                        await self._evict(key, entry.session, "dead")
+                    else:
+                        self.hits += 1
+                        return entry.session, True
+
+                if self._open_count.get(key, 0) < self.max_sessions:
+                    self._open_count[key] = self._open_count.get(key, 0) + 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=max(remaining, 0))
+                except asyncio.TimeoutError:
+                    raise PoolLimitExceeded(
+                        f"{self.name} sessions limit ({self.max_sessions}) to {key} exceeded"
+                    ) from None
+
+        self.misses += 1
+        try:
+            return await open_(), False
+        except BaseException:
+            await self._free(key)
+            raise
+
+    async def _free(self, key: Hashable) -> None:
+        condition = self._condition(key)
+
+        async with condition:
+            self._open_count[key] -= 1
+            condition.notify()
+
+    async def release(self, key: Hashable, session: S) -> None:
+        """
+        Return a usable session to the pool
+
+        Args:
+            key: pool key
+            session: session got from acquire
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        condition = self._condition(key)
+
+        async with condition:
+            self._idle.setdefault(key, []).append(_Idle(session, time.monotonic()))
+            condition.notify()
+
+    async def discard(self, key: Hashable, session: S) -> None:
+        """
+        Close a broken session got from acquire
+
+        Args:
+            key: pool key
+            session: session got from acquire
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        self.evictions += 1
+
+        try:
+            await self._close(session)
+        except Exception as e:
+            logger.debug(f"{self.name} pool failed to close session to {key}: {e!r}")
+
+        await self._free(key)
+
+    async def purge(self, key: Hashable) -> None:
+        """
+        Close all idle sessions of the key, e.g. if the device dropped them
+
+        Args:
+            key: pool key
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        async with self._condition(key):
+            idle = self._idle.get(key, [])
+            while idle:
+                await self._evict(key, idle.pop().session, "purged")
+
+    async def reap(self) -> None:
+        """
+        Close idle sessions which exceeded idle_timeout
+
+        Args:
+            N/A
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        now = time.monotonic()
+
+        for key, idle in list(self._idle.items()):
+            async with self._condition(key):
+                expired = [entry for entry in idle if now - entry.since > self.idle_timeout]
+                idle[:] = [entry for entry in idle if now - entry.since <= self.idle_timeout]
+
+                for entry in expired:
+                    await self._evict(key, entry.session, "expired")
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"{self.name} pool failed to reap idle sessions: {e!r}")
+
+    def start(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def close(self) -> None:
+        """
+        Stop idle sessions reaper and close all idle sessions
+
+        Args:
+            N/A
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+        for key, idle in list(self._idle.items()):
+            while idle:
+                await self._evict(key, idle.pop().session, "closing")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_sessions": self.max_sessions,
+            "open": sum(self._open_count.values()),
+            "idle": sum(len(idle) for idle in self._idle.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+pools: list[SessionPool] = []
+
+
+def start_pools() -> None:
+    for pool in pools:
+        pool.start()
+
+
+async def close_pools() -> None:
+    for pool in pools:
+        await pool.close()
+
+
+def pools_stats() -> dict[str, dict[str, Any]]:
+    return {pool.name: pool.stats() for pool in pools}
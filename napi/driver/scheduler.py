@@ -0,0 +1,239 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum, StrEnum
+from typing import Any, AsyncIterator
+
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+
+class Overloaded(Exception):
+    """Too many device operations are in flight or queued"""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+scheduler_http_code_map: dict[str, int] = {
+    "Overloaded": 503,
+}
+
+
+class Priority(IntEnum):
+    """Lanes of the scheduler queue. Lower value is served first"""
+
+    INTERACTIVE = 0
+    BULK = 1
+
+
+class Operation(StrEnum):
+    READ = "read"
+    WRITE = "write"
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    keys: tuple[tuple[str, str, Operation], ...] = field(compare=False)
+    granted: asyncio.Future = field(compare=False)
+
+
+@dataclass
+class _LaneStats:
+    operations: int = 0
+    queue_time: float = 0.0
+    max_queue_time: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.operations += 1
+        self.queue_time += seconds
+        self.max_queue_time = max(self.max_queue_time, seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "operations": self.operations,
+            "avg_queue_time": self.queue_time / self.operations if self.operations else 0.0,
+            "max_queue_time": self.max_queue_time,
+        }
+
+
+class Scheduler:
+    """
+    Scheduler limits concurrent operations of the worker on network devices.
+
+    Every driver operation takes a read or write slot of its device and of its vendor.
+    Operations waiting for a slot are served by priority lane and first come first served
+    within a lane. An operation which does not fit into the global cap of queued and running
+    operations is rejected with Overloaded right away.
+
+    Args:
+        max_operations: maximum number of running and queued operations
+        device_limits: maximum concurrent operations per device by operation type
+        vendor_limits: maximum concurrent operations per vendor by operation type
+        queue_timeout: seconds an operation waits for a slot
+        retry_after: seconds an overloaded client is asked to wait before retrying
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    def __init__(
+        self,
+        max_operations: int,
+        device_limits: dict[Operation, int],
+        vendor_limits: dict[Operation, int],
+        queue_timeout: float,
+        retry_after: int,
+    ) -> None:
+        self.max_operations = max_operations
+        self.limits = {"device": device_limits, "vendor": vendor_limits}
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._running: dict[tuple[str, str, Operation], int] = {}
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._admitted = 0
+
+        self.rejected = 0
+        self.timeouts = 0
+        self.lanes = {priority: _LaneStats() for priority in Priority}
+
+    def _fits(self, keys: tuple[tuple[str, str, Operation], ...]) -> bool:
+        return all(self._running.get(key, 0) < self.limits[key[0]][key[2]] for key in keys)
+
+    def _take(self, keys: tuple[tuple[str, str, Operation], ...]) -> None:
+        for key in keys:
+            self._running[key] = self._running.get(key, 0) + 1
+
+    def _dispatch(self) -> None:
+        # Waiters are checked in lane and arrival order. A waiter blocked by its device
+        # does not block waiters of other devices
+        waiters = sorted(self._waiters)
+        self._waiters.clear()
+
+        for waiter in waiters:
+            if waiter.granted.done():
+                continue
+
+            if self._fits(waiter.keys):
+                self._take(waiter.keys)
+                waiter.granted.set_result(None)
+            else:
+                heapq.heappush(self._waiters, waiter)
+
+    def _release(self, keys: tuple[tuple[str, str, Operation], ...]) -> None:
+        for key in keys:
+            self._running[key] -= 1
+            if not self._running[key]:
+                del self._running[key]
+
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        host: str,
+        vendor: str,
+        operation: Operation,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> AsyncIterator[None]:
+        """
+        Wait for a free slot of the device and vendor and hold it for the operation
+
+        Args:
+            host: device the operation is run on
+            vendor: device vendor
+            operation: read or write
+            priority: queue lane
+
+        Returns:
+            AsyncIterator[None]: context manager holding the slot
+
+        Raises:
+            Overloaded: global cap is reached or no slot became free for queue_timeout
+        """
+        if self._admitted >= self.max_operations:
+            self.rejected += 1
+            raise Overloaded(
+                f"too many device operations in progress ({self.max_operations})",
+                self.retry_after,
+            )
+
+        keys = (("device", host, operation), ("vendor", vendor, operation))
+        self._admitted += 1
+        started = time.monotonic()
+
+        try:
+            if self._fits(keys) and not self._waiters:
+                self._take(keys)
+            else:
+                waiter = _Waiter(
+                    priority, next(self._seq), keys, asyncio.get_running_loop().create_future()
+                )
+                heapq.heappush(self._waiters, waiter)
+                self._dispatch()
+
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.granted), self.queue_timeout)
+                except BaseException as e:
+                    if waiter.granted.done() and not waiter.granted.cancelled():
+                        # The slot was granted while the waiter was given up
+                        self._release(keys)
+                    else:
+                        waiter.granted.cancel()
+
+                    if not isinstance(e, asyncio.TimeoutError):
+                        raise
+
+                    self.timeouts += 1
+                    logger.warning(f"{operation} operation on {host} waited for a slot too long")
+                    raise Overloaded(
+                        f"{host} is busy: no {operation} slot for {self.queue_timeout}s",
+                        self.retry_after,
+                    ) from None
+
+            self.lanes[priority].add(time.monotonic() - started)
+
+            try:
+                yield
+            finally:
+                self._release(keys)
+        finally:
+            self._admitted -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_operations": self.max_operations,
+            "running": sum(
+                count for (scope, *_), count in self._running.items() if scope == "device"
+            ),
+            "queued": sum(not waiter.granted.done() for waiter in self._waiters),
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "lanes": {priority.name.lower(): lane.as_dict() for priority, lane in self.lanes.items()},
+        }
+
+
+scheduler = Scheduler(
+    max_operations=settings.scheduler_max_operations,
+    device_limits={
+        Operation.READ: settings.scheduler_device_reads,
+        Operation.WRITE: settings.scheduler_device_writes,
+    },
+    vendor_limits={
+        Operation.READ: settings.scheduler_vendor_reads,
+        Operation.WRITE: settings.scheduler_vendor_writes,
+    },
+    queue_timeout=settings.scheduler_queue_timeout,
+    retry_after=settings.scheduler_retry_after,
+)
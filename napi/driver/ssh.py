@@ -0,0 +1,276 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+import asyncssh
+
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+# host, username and the frozen asyncssh.connect options
+_Key = tuple[str, str, tuple[tuple[str, Any], ...]]
+
+
+def _freeze(value: Any) -> Any:
+    match value:
+        case dict():
+            return tuple(sorted((name, _freeze(item)) for name, item in value.items()))
+        case list() | tuple() | set() | frozenset():
+            return tuple(_freeze(item) for item in value)
+        case _:
+            try:
+                hash(value)
+            except TypeError:
+                return repr(value)
+            return value
+
+
+def _key(host: str, username: str, options: dict[str, Any]) -> _Key:
+    return host, username, _freeze(options)
+
+
+@dataclass
+class _Shared:
+    key: _Key
+    connection: asyncssh.SSHClientConnection
+    channels: int = 0
+    expire: asyncio.TimerHandle | None = field(default=None, repr=False)
+
+    def usable(self, max_channels: int) -> bool:
+        return not self.connection.is_closed() and self.channels < max_channels
+
+
+class SSHConnections:
+    """
+    SSHConnections shares authenticated asyncssh connections of the worker between channels.
+
+    NETCONF subsystem sessions and exec channels to the same host and username with the same
+    connect options (port, algorithms, known_hosts, client keys, ...) are opened on one
+    connection, so key exchange and authentication happen once per device instead of once
+    per session. Another connection is opened only if all connections of the host
+    carry max_channels channels. A connection without channels is closed after idle_timeout.
+
+    Args:
+        max_channels: maximum number of channels per connection
+        idle_timeout: seconds a connection without channels is kept open
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    def __init__(self, max_channels: int, idle_timeout: float) -> None:
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+
+        self._shared: dict[_Key, list[_Shared]] = {}
+        self._locks: dict[_Key, asyncio.Lock] = {}
+        self._entries: dict[asyncssh.SSHClientConnection, _Shared] = {}
+        # Tasks giving back the channels of open sessions when they are closed
+        self._tasks: set[asyncio.Task] = set()
+
+        self.connects = 0
+        self.reuses = 0
+
+    async def acquire(
+        self, host: str, username: str, timeout: float, **options: Any
+    ) -> asyncssh.SSHClientConnection:
+        """
+        Get a connection with a free channel and reserve the channel. The channel must be given
+        back with release when it is closed
+
+        Args:
+            host: host ip/name to connect to
+            username: SSH username
+            timeout: connection timeout
+            options: asyncssh.connect options of a new connection
+
+        Returns:
+            asyncssh.SSHClientConnection: shared connection
+
+        Raises:
+            asyncio.TimeoutError: timeout is exceeded
+            Exception: any asyncssh.connect exception
+        """
+        key = _key(host, username, options)
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            shared = self._shared.setdefault(key, [])
+            for entry in shared:
+                if entry.connection.is_closed() and not entry.channels:
+                    self._entries.pop(entry.connection, None)
+            shared[:] = [entry for entry in shared if not entry.connection.is_closed()]
+
+            entry = next((entry for entry in shared if entry.usable(self.max_channels)), None)
+            if entry is None:
+                connection = await asyncio.wait_for(
+                    asyncssh.connect(host, username=username, **options), timeout=timeout
+                )
+                entry = _Shared(key, connection)
+                shared.append(entry)
+                self._entries[connection] = entry
+                self.connects += 1
+                logger.debug(f"opened shared SSH connection to {username}@{host}")
+            else:
+                self.reuses += 1
+
+            entry.channels += 1
+            if entry.expire is not None:
+                entry.expire.cancel()
+                entry.expire = None
+
+            return entry.connection
+
+    def release(self, connection: asyncssh.SSHClientConnection) -> None:
+        """
+        Give back the channel reserved with acquire
+
+        Args:
+            connection: connection the channel was reserved on
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        entry = self._entries.get(connection)
+        if entry is None:
+            return
+
+        entry.channels -= 1
+        if entry.channels:
+            return
+
+        if entry not in self._shared.get(entry.key, []):
+            # Dropped as closed while the channel was in use
+            del self._entries[connection]
+            return
+
+        entry.expire = asyncio.get_running_loop().call_later(self.idle_timeout, self._expire, entry)
+
+    def _expire(self, entry: _Shared) -> None:
+        if entry.channels:
+            return
+
+        entry.connection.close()
+        self._entries.pop(entry.connection, None)
+        shared = self._shared.get(entry.key, [])
+        if entry in shared:
+            shared.remove(entry)
+        lock = self._locks.get(entry.key)
+        if not shared and (lock is None or not lock.locked()):
+            self._shared.pop(entry.key, None)
+            self._locks.pop(entry.key, None)
+        logger.debug(f"closed idle shared SSH connection to {entry.key[1]}@{entry.key[0]}")
+
+    async def open_session(
+        self, host: str, username: str, timeout: float, options: dict[str, Any], **session: Any
+    ) -> tuple[asyncssh.SSHClientConnection, asyncssh.SSHWriter, asyncssh.SSHReader]:
+        """
+        Open a session channel (e.g. NETCONF subsystem) on a shared connection.
+        The channel is given back automatically when it is closed
+
+        Args:
+            host: host ip/name to connect to
+            username: SSH username
+            timeout: connection timeout
+            options: asyncssh.connect options of a new connection
+            session: asyncssh open_session arguments
+
+        Returns:
+            tuple[SSHClientConnection, SSHWriter, SSHReader]: connection and channel streams
+
+        Raises:
+            asyncio.TimeoutError: timeout is exceeded
+            asyncssh.ChannelOpenError: the host refused to open the channel
+            Exception: any asyncssh.connect exception
+        """
+        connection = await self.acquire(host, username, timeout, **options)
+
+        try:
+            writer, reader, _ = await connection.open_session(**session)
+        except BaseException:
+            self.release(connection)
+            raise
+
+        task = asyncio.create_task(self._release_on_close(connection, writer.channel))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        return connection, writer, reader
+
+    @asynccontextmanager
+    async def channel(
+        self, host: str, username: str, timeout: float, options: dict[str, Any]
+    ) -> AsyncIterator[asyncssh.SSHClientConnection]:
+        """
+        Reserve a channel of a shared connection for a short lived exec
+
+        Args:
+            host: host ip/name to connect to
+            username: SSH username
+            timeout: connection timeout
+            options: asyncssh.connect options of a new connection
+
+        Returns:
+            AsyncIterator[asyncssh.SSHClientConnection]: connection to open the channel on
+
+        Raises:
+            asyncio.TimeoutError: timeout is exceeded
+            Exception: any asyncssh.connect exception
+        """
+        connection = await self.acquire(host, username, timeout, **options)
+
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    async def _release_on_close(
+        self, connection: asyncssh.SSHClientConnection, channel: asyncssh.SSHClientChannel
+    ) -> None:
+        try:
+            await channel.wait_closed()
+        finally:
+            self.release(connection)
+
+    async def close(self) -> None:
+        """
+        Close all shared connections
+
+        Args:
+            N/A
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        for shared in self._shared.values():
+            for entry in shared:
+                if entry.expire is not None:
+                    entry.expire.cancel()
+                entry.connection.close()
+
+        self._shared.clear()
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_channels": self.max_channels,
+            "connections": sum(len(shared) for shared in self._shared.values()),
+            "channels": sum(entry.channels for shared in self._shared.values() for entry in shared),
+            "connects": self.connects,
+            "reuses": self.reuses,
+        }
+
+
+ssh_connections = SSHConnections(
+    max_channels=settings.ssh_max_channels,
+    idle_timeout=settings.ssh_idle_timeout,
+)
@@ -1,8 +1,31 @@
-from typing import Protocol, Self, Type
+from typing import Any, Protocol, Self, Type
 
+from napi.settings import settings
+
+from .cache import CachedInventory, cache_stats, invalidate_cache
+from .events import events_stats, publish_event, start_events_poll, stop_events_poll
 from .exceptions import InventoryException, inventory_http_code_map
 from .inventory import Device, Interface, Vlans
-from .netbox import Netbox
+from .netbox import (
+    Netbox,
+    client_stats,
+    close_client,
+    get_client,
+    resilience_stats,
+    setup_vlans_stats,
+    start_setup_vlans_refresh,
+    stop_setup_vlans_refresh,
+)
+from .netbox_graphql import NetboxGraphQL
+from .snapshot import (
+    Snapshot,
+    apply_event,
+    snapshot_stats,
+    start_snapshot_sync,
+    stop_snapshot_sync,
+)
+from .singleflight import CoalescingInventory, singleflight_stats
+from .sqlite import SQLite, close_connection
 
 
 class SupportsGetDeviceInterface(Protocol):
@@ -13,6 +36,10 @@ class SupportsGetDeviceInterface(Protocol):
         get_device: returns a Device object from the SoT
         get_interface: returns an Interface object from the SoT
 
+    and their batch versions to resolve many objects at once:
+        get_devices: returns Device objects keyed by requested names
+        get_interfaces: returns Interface objects keyed by device fqdn and interface names
+
     """
     def __init__(self, api_url: str) -> None:
         """
@@ -93,14 +120,101 @@ class SupportsGetDeviceInterface(Protocol):
         """
         ...
 
+    async def get_devices(
+        self, names: list[str], domains: list[str], roles: list[str] | None
+    ) -> dict[str, Device | InventoryException]:
+        """
+        Grabs many devices information from the SoT using their names.
+        Works the same way as get_device but with as few SoT queries as possible.
+
+        Args:
+            names: names of the devices
+            domains: a list of domains to fqdn might be end with
+            roles: a list of roles to look for (might save some compute on the backend)
+
+        Returns:
+            dict[str, Device | InventoryException]: a bundled device information or
+                the lookup error for every requested name
+
+        Raises:
+            N/A
+        """
+        ...
+
+    async def get_interfaces(
+        self, names: list[str], devices: list[Device]
+    ) -> dict[str, dict[str, Interface | InventoryException]]:
+        """
+        Grabs many interfaces information of many devices from the SoT.
+        Works the same way as get_interface but with as few SoT queries as possible.
+
+        Args:
+            names: names of the interfaces to look for on every device
+            devices: device objects which are expected to have the interfaces
+
+        Returns:
+            dict[str, dict[str, Interface | InventoryException]]: a bundled interface information or
+                the lookup error keyed by device fqdn and interface name
+
+        Raises:
+            N/A
+        """
+        ...
+
 
 inventory_map: dict[str, Type[SupportsGetDeviceInterface]] = {
     "netbox": Netbox,
+    "netbox_graphql": NetboxGraphQL,
+    "snapshot": Snapshot,
+    "sqlite": SQLite,
 }
 
 
-def inventory_handler(kind: str, *args, **kwargs) -> SupportsGetDeviceInterface:
-    return inventory_map[kind](*args, **kwargs)
+def inventory_handler(
+    kind: str, *args, bypass_cache: bool = False, **kwargs
+) -> SupportsGetDeviceInterface:
+    inventory = inventory_map[kind](*args, **kwargs)
+
+    if settings.inventory_singleflight:
+        inventory = CoalescingInventory(inventory)
+
+    if not settings.inventory_cache:
+        return inventory
+
+    return CachedInventory(inventory, bypass=bypass_cache)
+
+
+async def init_inventory() -> None:
+    get_client()
+
+    if settings.inventory == "netbox":
+        start_setup_vlans_refresh()
+
+    if settings.inventory == "snapshot":
+        await start_snapshot_sync()
+
+    if "netbox_webhook" in settings.endpoints:
+        start_events_poll()
+
+
+async def close_inventory() -> None:
+    await stop_events_poll()
+    await stop_setup_vlans_refresh()
+    await stop_snapshot_sync()
+    await close_client()
+    close_connection()
+
+
+def inventory_stats() -> dict[str, dict[str, Any]]:
+    return {
+        "netbox_client": client_stats(),
+        "netbox_setup_vlans": setup_vlans_stats(),
+        **{f"netbox_{name}": stats for name, stats in resilience_stats().items()},
+        "snapshot": snapshot_stats(),
+        "events": events_stats(),
+        "singleflight": singleflight_stats(),
+        **cache_stats(),
+    }
 
 
 __all__ = [
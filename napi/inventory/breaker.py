@@ -0,0 +1,145 @@
+import time
+from collections import deque
+
+from napi.logger import core_logger as logger
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker stops calling a dependency after too many consecutive failures.
+
+    While the breaker is open every call fails fast. After reset_timeout one probe call
+    is let through: its success closes the breaker, its failure keeps it open for
+    another reset_timeout.
+
+    Args:
+        name: dependency name for logs
+        threshold: consecutive failures to open the breaker
+        reset_timeout: seconds to wait before the probe call
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    def __init__(self, name: str, threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.trips = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+
+        return "half-open"
+
+    def allow(self) -> bool:
+        """
+        Check if a call is allowed
+
+        Args:
+            N/A
+
+        Returns:
+            bool: True if the call might be done
+
+        Raises:
+            N/A
+        """
+        if self._opened_at is None:
+            return True
+
+        now = time.monotonic()
+        if now - self._opened_at < self.reset_timeout:
+            return False
+
+        # Let one probe through and re-arm the breaker until it succeeds
+        self._opened_at = now
+
+        return True
+
+    def success(self) -> None:
+        if self._opened_at is not None:
+            logger.warning(f"{self.name} circuit breaker is closed")
+
+        self.failures = 0
+        self._opened_at = None
+
+    def failure(self) -> None:
+        self.failures += 1
+
+        if self._opened_at is None and self.failures >= self.threshold:
+            self._opened_at = time.monotonic()
+            self.trips += 1
+            logger.critical(
+                f"{self.name} circuit breaker is open after {self.failures} failures in a row"
+            )
+
+    def stats(self) -> dict[str, int | str]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+        }
+
+
+class LatencyTracker:
+    """
+    LatencyTracker keeps the latest successful calls durations to estimate latency percentiles.
+
+    Args:
+        size: number of the latest samples to keep
+        min_samples: number of samples required to estimate a percentile
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=size)
+        self.hedged = 0
+
+    def add(self, duration: float) -> None:
+        self._samples.append(duration)
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Estimate latency percentile
+
+        Args:
+            p: percentile in 0..100 range
+
+        Returns:
+            float | None: latency in seconds or None if there are not enough samples
+
+        Raises:
+            N/A
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+
+        samples = sorted(self._samples)
+
+        return samples[min(int(len(samples) * p / 100), len(samples) - 1)]
+
+    def stats(self) -> dict[str, int | float | None]:
+        p95 = self.percentile(95)
+
+        return {
+            "samples": len(self._samples),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "hedged": self.hedged,
+        }
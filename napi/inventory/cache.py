@@ -0,0 +1,403 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Self
+
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+from .exceptions import InventoryException
+from .inventory import Device, Interface
+
+# Elements of InventoryException which mean "the object does not exist in the SoT".
+# Only these are cached as negative entries, connectivity issues never are.
+NEGATIVE_ELEMENTS = ("switch", "interface")
+
+
+@dataclass
+class Entry:
+    value: Any
+    expires: float
+
+
+class TTLCache:
+    """
+    TTLCache is a bounded LRU cache with per-entry expiration time.
+
+    Args:
+        maxsize: maximum number of entries, the least recently used one is evicted first
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Entry | None:
+        """
+        Get a fresh entry from the cache
+
+        Args:
+            key: entry key
+
+        Returns:
+            Entry | None: cached entry or None if it is missing or expired
+
+        Raises:
+            N/A
+        """
+        entry = self._data.get(key)
+        if entry is None or entry.expires < time.monotonic():
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+
+        return entry
+
+    def get_stale(self, key: Hashable) -> Entry | None:
+        """
+        Get a positive entry from the cache even if it is expired not longer than stale TTL ago.
+        Used to answer while the SoT is unavailable
+
+        Args:
+            key: entry key
+
+        Returns:
+            Entry | None: cached entry or None if there is no usable one
+
+        Raises:
+            N/A
+        """
+        entry = self._data.get(key)
+        if (
+            entry is None
+            or isinstance(entry.value, InventoryException)
+            or entry.expires + settings.inventory_cache_stale_ttl < time.monotonic()
+        ):
+            return None
+
+        self.stale += 1
+
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """
+        Put a value into the cache evicting the least recently used entries if needed
+
+        Args:
+            key: entry key
+            value: value to cache
+            ttl: entry time to live in seconds
+
+        Returns:
+            None
+
+        Raises:
+            N/A
+        """
+        self._data[key] = Entry(value=value, expires=time.monotonic() + ttl)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, predicate=None) -> int:
+        """
+        Remove entries from the cache
+
+        Args:
+            predicate: callable which gets an entry key and returns True if the entry must be removed.
+                All entries are removed if not provided
+
+        Returns:
+            int: number of removed entries
+
+        Raises:
+            N/A
+        """
+        if predicate is None:
+            removed = len(self._data)
+            self._data.clear()
+            return removed
+
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+
+        return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale": self.stale,
+        }
+
+
+device_cache = TTLCache(maxsize=settings.inventory_cache_size)
+interface_cache = TTLCache(maxsize=settings.inventory_cache_size)
+
+
+def invalidate_cache(hostname: str | None = None) -> int:
+    """
+    Invalidate cached inventory data
+
+    Args:
+        hostname: short name of the device to drop device and interfaces entries of.
+            The whole cache is dropped if not provided
+
+    Returns:
+        int: number of removed entries
+
+    Raises:
+        N/A
+    """
+    if hostname is None:
+        removed = device_cache.invalidate() + interface_cache.invalidate()
+    else:
+        hostname = hostname.split(".")[0]
+        removed = device_cache.invalidate(lambda key: key[1] == hostname)
+        removed += interface_cache.invalidate(lambda key: key[2].split(".")[0] == hostname)
+
+    logger.info(f"invalidated {removed} inventory cache entries")
+
+    return removed
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    return {
+        "device_cache": device_cache.stats(),
+        "interface_cache": interface_cache.stats(),
+    }
+
+
+def _value(entry: Entry) -> Any:
+    # Cached exceptions are copied so every raise gets its own traceback
+    if isinstance(entry.value, InventoryException):
+        return InventoryException(entry.value.message, element=entry.value.element)
+
+    return entry.value
+
+
+def _unwrap(entry: Entry) -> Any:
+    value = _value(entry)
+    if isinstance(value, InventoryException):
+        raise value
+
+    return value
+
+
+def _stale(cache: TTLCache, key: Hashable, error: InventoryException) -> Any:
+    """
+    Get a stale value from the cache if the SoT is unavailable
+
+    Args:
+        cache: cache to look up
+        key: entry key
+        error: the SoT error
+
+    Returns:
+        Any: stale cached value
+
+    Raises:
+        InventoryException: the error is not a connectivity one or there is no stale value
+    """
+    if error.element != "connect" or (entry := cache.get_stale(key)) is None:
+        raise error
+
+    logger.warning(f"inventory is unavailable ({error.message}), serving stale cache entry for {key}")
+
+    return entry.value
+
+
+def _store(cache: TTLCache, key: Hashable, value: Any, ttl: float) -> None:
+    if not isinstance(value, InventoryException):
+        cache.set(key, value, ttl)
+    elif value.element in NEGATIVE_ELEMENTS:
+        cache.set(key, value, settings.inventory_cache_negative_ttl)
+
+
+@dataclass
+class CachedInventory:
+    """
+    CachedInventory wraps any SoT implementing SupportsGetDeviceInterface with
+    the worker-wide TTL/LRU cache of devices and interfaces.
+
+    "No such switch/interface" answers are cached as well for a short time.
+    While the SoT is unavailable expired entries are served for inventory_cache_stale_ttl more seconds.
+    Stale entries are never served in bypass mode: the SoT error is raised instead.
+
+    Args:
+        inventory: SoT object to get the data from on cache miss
+        bypass: do not read from the cache, always query the SoT and refresh the cache
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    inventory: Any
+    bypass: bool = False
+
+    async def __aenter__(self) -> Self:
+        await self.inventory.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.inventory.__aexit__(*exc)
+
+    def _device_key(self, name: str, domains: list[str], roles: list[str] | None) -> Hashable:
+        return (
+            self.inventory.__class__.__name__,
+            name.split(".")[0],
+            tuple(domains),
+            tuple(roles) if roles is not None else None,
+        )
+
+    def _interface_key(self, name: str, device: Device) -> Hashable:
+        return (self.inventory.__class__.__name__, name, device.fqdn)
+
+    def _stale(self, cache: TTLCache, key: Hashable, error: InventoryException) -> Any:
+        # Bypass callers must get fresh data or an error, never an expired entry
+        if self.bypass:
+            raise error
+
+        return _stale(cache, key, error)
+
+    async def get_device(
+        self,
+        name: str,
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> Device:
+        key = self._device_key(name, domains, roles)
+
+        if not self.bypass and (entry := device_cache.get(key)) is not None:
+            return _unwrap(entry)
+
+        try:
+            device = await self.inventory.get_device(name, domains=domains, roles=roles)
+        except InventoryException as e:
+            _store(device_cache, key, e, settings.inventory_cache_device_ttl)
+            return self._stale(device_cache, key, e)
+
+        _store(device_cache, key, device, settings.inventory_cache_device_ttl)
+
+        return device
+
+    async def get_interface(self, name: str, device: Device) -> Interface:
+        key = self._interface_key(name, device)
+
+        if not self.bypass and (entry := interface_cache.get(key)) is not None:
+            return _unwrap(entry)
+
+        try:
+            interface = await self.inventory.get_interface(name, device)
+        except InventoryException as e:
+            _store(interface_cache, key, e, settings.inventory_cache_interface_ttl)
+            return self._stale(interface_cache, key, e)
+
+        _store(interface_cache, key, interface, settings.inventory_cache_interface_ttl)
+
+        return interface
+
+    async def get_devices(
+        self,
+        names: list[str],
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> dict[str, Device | InventoryException]:
+        result: dict[str, Device | InventoryException] = {}
+        missing = []
+
+        for name in names:
+            key = self._device_key(name, domains, roles)
+            if not self.bypass and (entry := device_cache.get(key)) is not None:
+                result[name] = _value(entry)
+            else:
+                missing.append(name)
+
+        if missing:
+            try:
+                devices = await self.inventory.get_devices(missing, domains=domains, roles=roles)
+            except InventoryException as e:
+                devices = {name: e for name in missing}
+
+            for name, device in devices.items():
+                key = self._device_key(name, domains, roles)
+                _store(device_cache, key, device, settings.inventory_cache_device_ttl)
+                if isinstance(device, InventoryException):
+                    try:
+                        device = self._stale(device_cache, key, device)
+                    except InventoryException:
+                        pass
+                result[name] = device
+
+        return {name: result[name] for name in names}
+
+    async def get_interfaces(
+        self,
+        names: list[str],
+        devices: list[Device],
+    ) -> dict[str, dict[str, Interface | InventoryException]]:
+        result: dict[str, dict[str, Interface | InventoryException]] = {}
+        missing_names: dict[str, None] = {}
+        missing_devices: dict[str, Device] = {}
+
+        for device in devices:
+            interfaces = result.setdefault(device.fqdn, {})
+
+            for name in names:
+                key = self._interface_key(name, device)
+                if not self.bypass and (entry := interface_cache.get(key)) is not None:
+                    interfaces[name] = _value(entry)
+                else:
+                    missing_names[name] = None
+                    missing_devices[device.fqdn] = device
+
+        if missing_names:
+            try:
+                fetched = await self.inventory.get_interfaces(
+                    list(missing_names), list(missing_devices.values())
+                )
+            except InventoryException as e:
+                fetched = {
+                    device.fqdn: {name: e for name in missing_names}
+                    for device in missing_devices.values()
+                }
+
+            for device in missing_devices.values():
+                for name, interface in fetched[device.fqdn].items():
+                    if name in result[device.fqdn]:
+                        continue
+
+                    key = self._interface_key(name, device)
+                    _store(interface_cache, key, interface, settings.inventory_cache_interface_ttl)
+                    if isinstance(interface, InventoryException):
+                        try:
+                            interface = self._stale(interface_cache, key, interface)
+                        except InventoryException:
+                            pass
+                    result[device.fqdn][name] = interface
+
+        return result
@@ -0,0 +1,220 @@
+import asyncio
+import fcntl
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+from .cache import invalidate_cache
+from .snapshot import apply_event
+
+# Position of the worker in the journal: (inode, offset)
+_position: tuple[int | None, int] = (None, 0)
+# Receive time of the first event of the journal
+_oldest: float | None = None
+_poll_task: asyncio.Task | None = None
+
+_published = 0
+_received = 0
+
+
+def _path() -> Path:
+    return Path(settings.inventory_events_file)
+
+
+def handle_event(model: str, event: str, data: dict[str, Any], received: float) -> None:
+    """
+    Applies Netbox webhook event to the inventory snapshot and the inventory cache of the worker
+
+    Args:
+        model: Netbox model name - "device", "interface" or "vlan"
+        event: Netbox event - "created", "updated" or "deleted"
+        data: Netbox object data
+        received: time the webhook was received
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    apply_event(model, event, data, received)
+
+    match model:
+        case "device":
+            invalidate_cache(data["name"])
+        case "interface":
+            invalidate_cache(data["device"]["name"])
+        case "vlan":
+            invalidate_cache()
+
+
+def _append(path: Path, line: str) -> None:
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        with path.open("a") as f:
+            f.write(line)
+
+
+async def publish_event(model: str, event: str, data: dict[str, Any]) -> None:
+    """
+    Applies Netbox webhook event in this worker and appends it to the events journal
+    shared by all workers of the host, so the others apply it on their next poll
+
+    Args:
+        model: Netbox model name - "device", "interface" or "vlan"
+        event: Netbox event - "created", "updated" or "deleted"
+        data: Netbox object data
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    global _published
+
+    received = time.time()
+    handle_event(model, event, data, received)
+
+    record = {
+        "pid": os.getpid(),
+        "received": received,
+        "model": model,
+        "event": event,
+        "data": data,
+    }
+    try:
+        await asyncio.to_thread(_append, _path(), json.dumps(record) + "\n")
+    except OSError as e:
+        logger.error(f"failed to publish inventory event to {_path()}: {e!r}")
+        return
+
+    _published += 1
+
+
+def _read(path: Path, position: tuple[int | None, int]) -> tuple[tuple[int | None, int], list[str]]:
+    try:
+        with path.open("rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            # The journal is replaced by compaction, read the new one from the start
+            offset = position[1] if inode == position[0] else 0
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return (None, 0), []
+
+    # The last line might be being written
+    end = data.rfind(b"\n") + 1
+
+    return (inode, offset + end), data[:end].decode().splitlines()
+
+
+def _compact(path: Path, before: float) -> None:
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        try:
+            with path.open() as f:
+                lines = [line for line in f if json.loads(line)["received"] >= before]
+        except FileNotFoundError:
+            return
+
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}")
+        with tmp_path.open("w") as f:
+            f.writelines(lines)
+        os.replace(tmp_path, path)
+
+
+async def poll_events() -> None:
+    """
+    Applies events published by other workers since the last poll.
+    Events older than inventory_events_keep are dropped from the journal
+
+    Args:
+        N/A
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    global _position, _oldest, _received
+
+    path = _path()
+    inode = _position[0]
+
+    _position, lines = await asyncio.to_thread(_read, path, _position)
+    if _position[0] != inode:
+        _oldest = None
+
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logger.error(f"invalid inventory event in {path}: {line[:200]!r}")
+            continue
+
+        if _oldest is None:
+            _oldest = record["received"]
+
+        # Events of the worker are applied when published. Replayed events of the other
+        # workers after compaction end up in the same state
+        if record["pid"] == os.getpid():
+            continue
+
+        try:
+            handle_event(record["model"], record["event"], record["data"], record["received"])
+        except (KeyError, TypeError) as e:
+            logger.error(f"failed to apply inventory event {line[:200]!r}: {e!r}")
+            continue
+
+        _received += 1
+
+    before = time.time() - settings.inventory_events_keep
+    if _oldest is not None and _oldest < before:
+        try:
+            await asyncio.to_thread(_compact, path, before)
+        except (OSError, ValueError) as e:
+            logger.error(f"failed to compact inventory events journal {path}: {e!r}")
+        else:
+            logger.debug(f"inventory events journal {path} is compacted")
+        _oldest = None
+
+
+async def _poll_events_forever() -> None:
+    while True:
+        await poll_events()
+        await asyncio.sleep(settings.inventory_events_poll)
+
+
+def start_events_poll() -> None:
+    global _poll_task
+
+    if _poll_task is None or _poll_task.done():
+        _poll_task = asyncio.create_task(_poll_events_forever())
+
+
+async def stop_events_poll() -> None:
+    global _poll_task
+
+    if _poll_task is not None:
+        _poll_task.cancel()
+        try:
+            await _poll_task
+        except asyncio.CancelledError:
+            pass
+        _poll_task = None
+
+
+def events_stats() -> dict[str, Any]:
+    return {
+        "published": _published,
+        "received": _received,
+        "offset": _position[1],
+    }
@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
 
+from napi.lib import VlanSet
+
 
 @dataclass
 class Device:
@@ -19,7 +21,7 @@ class Device:
 class Vlans:
     setup: int | None
     untagged: int | None
-    tagged: list[int] = field(default_factory=list)
+    tagged: VlanSet = field(default_factory=VlanSet)
 
 
 @dataclass
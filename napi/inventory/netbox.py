@@ -1,11 +1,15 @@
+import asyncio
+import time
 from dataclasses import dataclass
-from typing import Self
+from typing import Any, Self
 
 import httpx
 
+from napi.lib import VlanSet
 from napi.logger import core_logger as logger
 from napi.settings import settings
 
+from .breaker import CircuitBreaker, LatencyTracker
 from .exceptions import InventoryException
 from .inventory import Device, Interface, Vlans
 
@@ -13,29 +17,425 @@ NETBOX_DEVICE_SUFFIX = "/dcim/devices/"
 NETBOX_INTERFACES_SUFFIX = "/dcim/interfaces/"
 NETBOX_VLANS_SUFFIX = "/ipam/vlans/"
 
-_translations = str.maketrans(
-    {
-        "/": "%2F",
-        ":": "%3A",
-    }
+NETBOX_PAGE_SIZE = 1000
+# Maximum number of values of one filter in a single request to keep URLs short
+NETBOX_FILTER_CHUNK = 100
+
+_client: httpx.AsyncClient | None = None
+
+breaker = CircuitBreaker(
+    "Netbox", threshold=settings.nb_breaker_threshold, reset_timeout=settings.nb_breaker_reset
 )
+latency = LatencyTracker()
+
+# Site slug -> setup VLAN id. Preloaded and periodically refreshed by the background task
+_setup_vlans: dict[str, int] = {}
+_setup_vlans_task: asyncio.Task | None = None
+
+
+def _chunks(values: list[str], size: int = NETBOX_FILTER_CHUNK) -> list[list[str]]:
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def device_from_data(device: dict[str, Any]) -> Device:
+    """
+    Builds Device from Netbox API device object
+
+    Args:
+        device: Netbox API device object
+
+    Returns:
+        Device: a bundled device information
+
+    Raises:
+        N/A
+    """
+    return Device(
+        fqdn=device["name"],
+        vendor=device["device_type"]["manufacturer"]["slug"],
+        model=device["device_type"]["slug"],
+        tenant=device["tenant"]["slug"] if device["tenant"] else None,
+        location=device["site"]["slug"],
+        ip=device["primary_ip"]["address"].split("/")[0] if device["primary_ip"] else None,
+    )
+
+
+def device_role(device: dict[str, Any]) -> str | None:
+    """
+    Returns role slug of Netbox API device object. Netbox < 4.0 calls the field "device_role"
+
+    Args:
+        device: Netbox API device object
+
+    Returns:
+        str | None: device role slug
+
+    Raises:
+        N/A
+    """
+    role = device.get("role") or device.get("device_role")
+
+    return role["slug"] if role else None
+
+
+def interface_from_data(interface: dict[str, Any], setup_vlan: int | None) -> Interface:
+    """
+    Builds Interface from Netbox API interface object
+
+    Args:
+        interface: Netbox API interface object
+        setup_vlan: setup VLAN of the interface device site
+
+    Returns:
+        Interface: a bundled interface information
+
+    Raises:
+        N/A
+    """
+    return Interface(
+        name=interface["name"],
+        description=interface["description"],
+        vlans=Vlans(
+            setup=setup_vlan,
+            untagged=interface["untagged_vlan"]["vid"] if interface["untagged_vlan"] else None,
+            tagged=VlanSet(vlan["vid"] for vlan in interface["tagged_vlans"]),
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the worker-wide Netbox HTTP client. The client is created on first use
+    and keeps its connections alive between requests.
+
+    Args:
+        N/A
+
+    Returns:
+        httpx.AsyncClient: shared HTTP client
+
+    Raises:
+        N/A
+    """
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            verify=False,
+            timeout=settings.nb_timeout,
+            http2=settings.nb_http2,
+            limits=httpx.Limits(
+                max_connections=settings.nb_max_connections,
+                max_keepalive_connections=settings.nb_max_keepalive_connections,
+                keepalive_expiry=settings.nb_keepalive_expiry,
+            ),
+        )
+        logger.info(
+            f"Netbox client is created: max_connections={settings.nb_max_connections}, "
+            f"max_keepalive_connections={settings.nb_max_keepalive_connections}, "
+            f"http2={settings.nb_http2}"
+        )
+
+    return _client
+
+
+async def close_client() -> None:
+    """
+    Closes the worker-wide Netbox HTTP client and all its connections.
+
+    Args:
+        N/A
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Netbox client is closed")
+
+
+def client_stats() -> dict[str, int]:
+    """
+    Returns usage statistics of the Netbox HTTP connection pool.
+
+    Args:
+        N/A
+
+    Returns:
+        dict[str, int]: pool limits and current connections/requests counters
+
+    Raises:
+        N/A
+    """
+    stats = {
+        "max_connections": settings.nb_max_connections,
+        "max_keepalive_connections": settings.nb_max_keepalive_connections,
+        "connections": 0,
+        "active": 0,
+        "idle": 0,
+        "requests": 0,
+    }
+
+    if _client is None:
+        return stats
+
+    # httpx does not expose its pool publicly, so peek into the transport
+    pool = getattr(_client._transport, "_pool", None)
+    if pool is None:
+        return stats
+
+    connections = pool.connections
+    stats["connections"] = len(connections)
+    stats["idle"] = len([c for c in connections if c.is_idle()])
+    stats["active"] = stats["connections"] - stats["idle"]
+    stats["requests"] = len(getattr(pool, "_requests", []))
+
+    return stats
+
+
+async def refresh_setup_vlans() -> None:
+    """
+    Reloads the site -> setup VLAN index from Netbox.
+
+    Args:
+        N/A
+
+    Returns:
+        None
+
+    Raises:
+        InventoryException: failed to query Netbox
+    """
+    global _setup_vlans
+
+    vlans = await Netbox()._get_all(NETBOX_VLANS_SUFFIX, [("role", "setup")])
+
+    index: dict[str, int] = {}
+    for vlan in vlans:
+        if vlan["site"] is not None:
+            index.setdefault(vlan["site"]["slug"], vlan["vid"])
+
+    _setup_vlans = index
+    logger.debug(f"setup VLANs index is refreshed: {len(index)} sites")
+
+
+async def _refresh_setup_vlans_forever() -> None:
+    while True:
+        try:
+            await refresh_setup_vlans()
+        except InventoryException as e:
+            logger.error(f"failed to refresh setup VLANs index: {e}")
+
+        await asyncio.sleep(settings.nb_setup_vlans_refresh)
+
+
+def resilience_stats() -> dict[str, dict[str, int | float | str | None]]:
+    return {
+        "breaker": breaker.stats(),
+        "latency": latency.stats(),
+    }
+
+
+def setup_vlans_stats() -> dict[str, int]:
+    return {
+        "sites": len(_setup_vlans),
+    }
+
+
+def start_setup_vlans_refresh() -> None:
+    global _setup_vlans_task
+
+    if _setup_vlans_task is None or _setup_vlans_task.done():
+        _setup_vlans_task = asyncio.create_task(_refresh_setup_vlans_forever())
+
+
+async def stop_setup_vlans_refresh() -> None:
+    global _setup_vlans_task
+
+    if _setup_vlans_task is not None:
+        _setup_vlans_task.cancel()
+        try:
+            await _setup_vlans_task
+        except asyncio.CancelledError:
+            pass
+        _setup_vlans_task = None
 
 
 @dataclass
 class Netbox:
     """
     Netbox gets network devices information from Netbox.
+
+    All instances share one HTTP client per worker so connections to Netbox
+    are reused across API requests.
     """
     api_url: str = settings.nb_api_url
 
     def __post_init__(self):
-        self.client = httpx.AsyncClient(verify=False)
+        self.client = get_client()
 
     async def __aenter__(self) -> Self:
         return self
 
     async def __aexit__(self, *_) -> None:
-        await self.client.aclose()
+        pass
+
+    async def _request(self, url: str, params: list[tuple[str, str]] | None = None) -> dict[str, Any]:
+        """
+        Query Netbox API and return the response page
+
+        Args:
+            url: full API endpoint url
+            params: query parameters. The same parameter might be repeated to filter by many values
+
+        Returns:
+            dict[str, Any]: response page with found objects in "results" key
+
+        Raises:
+            InventoryException: failed to query Netbox or invalid query parameters
+        """
+        if not breaker.allow():
+            raise InventoryException("Netbox is unavailable", element="connect")
+
+        try:
+            async with asyncio.timeout(settings.nb_timeout):
+                response = await self._hedged_get(url, params)
+        except (TimeoutError, httpx.TimeoutException) as e:
+            breaker.failure()
+            logger.critical(f"Netbox request timed out: {e!r}")
+            raise InventoryException("Netbox request timed out", element="connect")
+        except httpx.ConnectError as e:
+            breaker.failure()
+            logger.critical(repr(e), exc_info=True)
+            raise InventoryException("failed to connect to Netbox", element="connect")
+        except Exception as e:
+            breaker.failure()
+            logger.critical(repr(e), exc_info=True)
+            raise InventoryException("unknown error", element="connect")
+
+        if response.status_code >= 500:
+            breaker.failure()
+            logger.critical(f"Netbox responded with {response.status_code}")
+            raise InventoryException(
+                f"Netbox responded with {response.status_code}", element="connect"
+            )
+
+        breaker.success()
+
+        try:
+            responce = response.json()
+        except ValueError as e:
+            logger.critical(repr(e), exc_info=True)
+            raise InventoryException("unknown error", element="connect")
+
+        if responce.get("results") is None:
+            msg = f"Invalid choices for fields {', '.join(responce)}"
+            logger.critical(msg)
+            raise InventoryException(msg, element="inventory")
+
+        return responce
+
+    async def _timed_get(self, url: str, params: list[tuple[str, str]] | None) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.client.get(url, params=params)
+        latency.add(time.monotonic() - started)
+
+        return response
+
+    async def _hedged_get(self, url: str, params: list[tuple[str, str]] | None) -> httpx.Response:
+        """
+        GET request hedged by a second identical request if the first one is slower than usual (p95).
+        The first successful response wins, the other request is cancelled.
+
+        Args:
+            url: full API endpoint url
+            params: query parameters
+
+        Returns:
+            httpx.Response: Netbox response
+
+        Raises:
+            Exception: both requests failed
+        """
+        delay = latency.percentile(95) if settings.nb_hedge else None
+        if delay is None:
+            return await self._timed_get(url, params)
+
+        tasks = {asyncio.create_task(self._timed_get(url, params))}
+        error: BaseException | None = None
+
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                latency.hedged += 1
+                hedge = asyncio.create_task(self._timed_get(url, params))
+                tasks.add(hedge)
+                pending.add(hedge)
+
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Cancel the loser or everything on the deadline
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        raise error
+
+    async def _get(self, suffix: str, params: list[tuple[str, str]]) -> list[dict[str, Any]]:
+        """
+        Query Netbox API endpoint and return the first page of found objects
+
+        Args:
+            suffix: API endpoint suffix
+            params: query parameters. The same parameter might be repeated to filter by many values
+
+        Returns:
+            list[dict[str, Any]]: found objects
+
+        Raises:
+            InventoryException: failed to query Netbox or invalid query parameters
+        """
+        return (await self._request(f"{self.api_url}{suffix}", params))["results"]
+
+    async def _get_all(self, suffix: str, params: list[tuple[str, str]]) -> list[dict[str, Any]]:
+        """
+        Query Netbox API endpoint and return found objects from all the pages
+
+        Args:
+            suffix: API endpoint suffix
+            params: query parameters. The same parameter might be repeated to filter by many values
+
+        Returns:
+            list[dict[str, Any]]: found objects
+
+        Raises:
+            InventoryException: failed to query Netbox or invalid query parameters
+        """
+        responce = await self._request(
+            f"{self.api_url}{suffix}", [*params, ("limit", str(NETBOX_PAGE_SIZE))]
+        )
+        results = responce["results"]
+
+        while responce.get("next"):
+            responce = await self._request(responce["next"])
+            results.extend(responce["results"])
+
+        return results
 
     async def get_device(
         self,
@@ -44,74 +444,52 @@ class Netbox:
         roles: list[str] | None,
     ) -> Device:
         hostname = name.split(".")[0]
+        fqdns = [f"{hostname}.{domain}" for domain in domains]
 
-        if roles is not None:
-            roles_str = "".join([f"&role={role}" for role in roles])
-        else:
-            roles = []
-
-        for domain in domains:
-            try:
-                responce = (
-                    await self.client.get(
-                        f"{self.api_url}{NETBOX_DEVICE_SUFFIX}"
-                        f"?name={hostname}.{domain}&status=active{roles_str}"
-                    )
-                ).json()
-            except httpx.ConnectError as e:
-                logger.critical(repr(e), exc_info=True)
-                raise InventoryException("failed to connect to Netbox", element="connect")
-            except Exception as e:
-                logger.critical(repr(e), exc_info=True)
-                raise InventoryException("unknown error", element="connect")
-
-            devices = responce.get("results")
-            if devices is None:
-                msg = f"Invalid choices for fields {', '.join(responce)}"
-                logger.critical(msg)
-                raise InventoryException(msg, element="inventory")
-
-            if devices:
+        # All the domains are checked with a single request
+        devices = await self._get(
+            NETBOX_DEVICE_SUFFIX,
+            [
+                *[("name", fqdn) for fqdn in fqdns],
+                ("status", "active"),
+                *[("role", role) for role in roles or []],
+            ],
+        )
+        found = {device["name"].lower(): device for device in devices}
+
+        # Domains order is the priority order
+        for fqdn in fqdns:
+            device = found.get(fqdn.lower())
+            if device is not None:
                 break
         else:
             raise InventoryException("there is no such switch in Netbox", element="switch")
 
-        device = devices[0]
+        return device_from_data(device)
 
-        return Device(
-            fqdn=device["name"],
-            vendor=device["device_type"]["manufacturer"]["slug"],
-            model=device["device_type"]["slug"],
-            tenant=device["tenant"]["slug"] if device["tenant"] else None,
-            location=device["site"]["slug"],
-            ip=device["primary_ip"]["address"].split("/")[0] if device["primary_ip"] else None,
-        )
+    async def _get_setup_vlan(self, site: str) -> int | None:
+        setup_vlans = await self._get(NETBOX_VLANS_SUFFIX, [("role", "setup"), ("site", site)])
+
+        return setup_vlans[0]["vid"] if setup_vlans else None
 
     async def get_interface(
         self,
         name: str,
         device: Device,
     ) -> Interface:
-        normilized_name = name.translate(_translations)
-
-        try:
-            responce = (
-                await self.client.get(
-                    f"{self.api_url}{NETBOX_INTERFACES_SUFFIX}?name={normilized_name}&device={device.fqdn}"
-                )
-            ).json()
-        except httpx.ConnectError as e:
-            logger.critical(repr(e), exc_info=True)
-            raise InventoryException("failed to connect to Netbox", element="connect")
-        except Exception as e:
-            logger.critical(repr(e), exc_info=True)
-            raise InventoryException("unknown error", element="connect")
+        interfaces_request = self._get(
+            NETBOX_INTERFACES_SUFFIX, [("name", name), ("device", device.fqdn)]
+        )
 
-        interfaces = responce.get("results")
-        if interfaces is None:
-            msg = f"invalid choices for fields {', '.join(responce)}"
-            logger.critical(msg)
-            raise InventoryException(msg, element="inventory")
+        # Setup VLAN depends only on the device site so it is either taken from the index
+        # or requested concurrently with the interface
+        setup_vlan = _setup_vlans.get(device.location)
+        if setup_vlan is not None:
+            interfaces = await interfaces_request
+        else:
+            interfaces, setup_vlan = await asyncio.gather(
+                interfaces_request, self._get_setup_vlan(device.location)
+            )
 
         if not interfaces:
             raise InventoryException(
@@ -120,28 +498,109 @@ class Netbox:
 
         interface = interfaces[0]
 
-        responce = (
-            await self.client.get(
-                f"{self.api_url}{NETBOX_VLANS_SUFFIX}?role=setup&site={device.location}"
-            )
-        ).json()
+        return interface_from_data(interface, setup_vlan)
 
-        setup_vlans = responce.get("results")
-        if setup_vlans is None:
-            msg = f"invalid choices for fields {', '.join(responce)}"
-            logger.critical(msg)
-            raise InventoryException(msg, element="inventory")
+    async def get_devices(
+        self,
+        names: list[str],
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> dict[str, Device | InventoryException]:
+        candidates = {
+            name: [f"{name.split('.')[0]}.{domain}" for domain in domains] for name in names
+        }
+        fqdns = list(dict.fromkeys(fqdn for fqdns in candidates.values() for fqdn in fqdns))
 
-        setup_vlan = setup_vlans[0]["vid"] if setup_vlans else None
-        untagged_vlan = interface["untagged_vlan"]["vid"] if interface["untagged_vlan"] else None
-        tagged_vlans = [vlan["vid"] for vlan in interface["tagged_vlans"]]
-
-        return Interface(
-            name=interface["name"],
-            description=interface["description"],
-            vlans=Vlans(
-                setup=setup_vlan,
-                untagged=untagged_vlan,
-                tagged=tagged_vlans,
-            ),
+        pages = await asyncio.gather(
+            *[
+                self._get_all(
+                    NETBOX_DEVICE_SUFFIX,
+                    [
+                        *[("name", fqdn) for fqdn in chunk],
+                        ("status", "active"),
+                        *[("role", role) for role in roles or []],
+                    ],
+                )
+                for chunk in _chunks(fqdns)
+            ]
+        )
+        found = {device["name"].lower(): device for page in pages for device in page}
+
+        result: dict[str, Device | InventoryException] = {}
+        for name, fqdns in candidates.items():
+            # Domains order is the priority order
+            for fqdn in fqdns:
+                device = found.get(fqdn.lower())
+                if device is not None:
+                    result[name] = device_from_data(device)
+                    break
+            else:
+                result[name] = InventoryException(
+                    "there is no such switch in Netbox", element="switch"
+                )
+
+        return result
+
+    async def _get_setup_vlans(self, sites: list[str]) -> dict[str, int]:
+        missing = [site for site in sites if site not in _setup_vlans]
+
+        pages = await asyncio.gather(
+            *[
+                self._get_all(
+                    NETBOX_VLANS_SUFFIX, [("role", "setup"), *[("site", site) for site in chunk]]
+                )
+                for chunk in _chunks(missing)
+            ]
+        )
+
+        setup_vlans = {site: _setup_vlans[site] for site in sites if site in _setup_vlans}
+        for vlan in [vlan for page in pages for vlan in page]:
+            if vlan["site"] is not None:
+                setup_vlans.setdefault(vlan["site"]["slug"], vlan["vid"])
+
+        return setup_vlans
+
+    async def get_interfaces(
+        self,
+        names: list[str],
+        devices: list[Device],
+    ) -> dict[str, dict[str, Interface | InventoryException]]:
+        fqdns = list(dict.fromkeys(device.fqdn for device in devices))
+        sites = list(dict.fromkeys(device.location for device in devices))
+
+        *pages, setup_vlans = await asyncio.gather(
+            *[
+                self._get_all(
+                    NETBOX_INTERFACES_SUFFIX,
+                    [
+                        *[("device", fqdn) for fqdn in devices_chunk],
+                        *[("name", name) for name in names_chunk],
+                    ],
+                )
+                for devices_chunk in _chunks(fqdns)
+                for names_chunk in _chunks(names)
+            ],
+            self._get_setup_vlans(sites),
         )
+        found = {
+            (interface["device"]["name"].lower(), interface["name"]): interface
+            for page in pages
+            for interface in page
+        }
+
+        result: dict[str, dict[str, Interface | InventoryException]] = {}
+        for device in devices:
+            interfaces = result.setdefault(device.fqdn, {})
+
+            for name in names:
+                interface = found.get((device.fqdn.lower(), name))
+                if interface is not None:
+                    interfaces[name] = interface_from_data(
+                        interface, setup_vlans.get(device.location)
+                    )
+                else:
+                    interfaces[name] = InventoryException(
+                        "there is no such interface on this switch in Netbox", element="interface"
+                    )
+
+        return result
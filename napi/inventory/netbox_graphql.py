@@ -0,0 +1,267 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Self
+
+import httpx
+
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+from .exceptions import InventoryException
+from .inventory import Device, Interface
+from .netbox import breaker, get_client, interface_from_data
+
+NETBOX_GRAPHQL_SUFFIX = "/graphql/"
+
+DEVICE_QUERY = """
+query Device($names: [String]{roles_variable}) {{
+  device_list(name: $names, status: "active"{roles_filter}) {{
+    name
+    device_type {{ slug manufacturer {{ slug }} }}
+    tenant {{ slug }}
+    site {{ slug }}
+    primary_ip4 {{ address }}
+    primary_ip6 {{ address }}
+  }}
+}}
+"""
+
+INTERFACE_QUERY = """
+query Interface($name: [String], $device: [String], $site: [String]) {
+  interface_list(name: $name, device: $device) {
+    name
+    device { name }
+    description
+    untagged_vlan { vid }
+    tagged_vlans { vid }
+  }
+  vlan_list(role: "setup", site: $site) {
+    vid
+    site { slug }
+  }
+}
+"""
+
+
+def _device_query(with_roles: bool) -> str:
+    return DEVICE_QUERY.format(
+        roles_variable=", $roles: [String]" if with_roles else "",
+        roles_filter=", role: $roles" if with_roles else "",
+    )
+
+
+def _device_from_data(device: dict[str, Any]) -> Device:
+    primary_ip = device["primary_ip4"] or device["primary_ip6"]
+
+    return Device(
+        fqdn=device["name"],
+        vendor=device["device_type"]["manufacturer"]["slug"],
+        model=device["device_type"]["slug"],
+        tenant=device["tenant"]["slug"] if device["tenant"] else None,
+        location=device["site"]["slug"],
+        ip=primary_ip["address"].split("/")[0] if primary_ip else None,
+    )
+
+
+@dataclass
+class NetboxGraphQL:
+    """
+    NetboxGraphQL gets network devices information from Netbox GraphQL API.
+
+    It requests only the fields napi needs: a device is resolved for all the domains with one query,
+    an interface and its site setup VLAN are resolved with another one.
+    Uses the same worker-wide HTTP client as Netbox.
+    """
+    api_url: str = settings.nb_api_url
+
+    def __post_init__(self):
+        self.client = get_client()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+    async def _query(self, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        """
+        Run GraphQL query
+
+        Args:
+            query: GraphQL query
+            variables: query variables
+
+        Returns:
+            dict[str, Any]: query result data
+
+        Raises:
+            InventoryException: failed to query Netbox or query is invalid
+        """
+        if not breaker.allow():
+            raise InventoryException("Netbox is unavailable", element="connect")
+
+        try:
+            async with asyncio.timeout(settings.nb_timeout):
+                response = await self.client.post(
+                    f"{self.api_url}{NETBOX_GRAPHQL_SUFFIX}",
+                    json={"query": query, "variables": variables},
+                )
+        except (TimeoutError, httpx.TimeoutException) as e:
+            breaker.failure()
+            logger.critical(f"Netbox request timed out: {e!r}")
+            raise InventoryException("Netbox request timed out", element="connect")
+        except httpx.ConnectError as e:
+            breaker.failure()
+            logger.critical(repr(e), exc_info=True)
+            raise InventoryException("failed to connect to Netbox", element="connect")
+        except Exception as e:
+            breaker.failure()
+            logger.critical(repr(e), exc_info=True)
+            raise InventoryException("unknown error", element="connect")
+
+        if response.status_code >= 500:
+            breaker.failure()
+            logger.critical(f"Netbox responded with {response.status_code}")
+            raise InventoryException(
+                f"Netbox responded with {response.status_code}", element="connect"
+            )
+
+        breaker.success()
+
+        try:
+            responce = response.json()
+        except ValueError as e:
+            logger.critical(repr(e), exc_info=True)
+            raise InventoryException("unknown error", element="connect")
+
+        if responce.get("errors") or responce.get("data") is None:
+            msg = "; ".join(error["message"] for error in responce.get("errors", []))
+            logger.critical(f"GraphQL query failed: {msg}")
+            raise InventoryException(f"invalid query: {msg}", element="inventory")
+
+        return responce["data"]
+
+    async def get_device(
+        self,
+        name: str,
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> Device:
+        hostname = name.split(".")[0]
+        fqdns = [f"{hostname}.{domain}" for domain in domains]
+
+        variables: dict[str, Any] = {"names": fqdns}
+        if roles is not None:
+            variables["roles"] = roles
+
+        data = await self._query(_device_query(roles is not None), variables)
+        found = {device["name"].lower(): device for device in data["device_list"]}
+
+        # Domains order is the priority order
+        for fqdn in fqdns:
+            device = found.get(fqdn.lower())
+            if device is not None:
+                break
+        else:
+            raise InventoryException("there is no such switch in Netbox", element="switch")
+
+        return _device_from_data(device)
+
+    async def get_interface(
+        self,
+        name: str,
+        device: Device,
+    ) -> Interface:
+        data = await self._query(
+            INTERFACE_QUERY,
+            {
+                "name": [name],
+                "device": [device.fqdn],
+                "site": [device.location],
+            },
+        )
+
+        interfaces = data["interface_list"]
+        if not interfaces:
+            raise InventoryException(
+                "there is no such interface on this switch in Netbox", element="interface"
+            )
+
+        setup_vlans = data["vlan_list"]
+
+        return interface_from_data(
+            interfaces[0], setup_vlans[0]["vid"] if setup_vlans else None
+        )
+
+    async def get_devices(
+        self,
+        names: list[str],
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> dict[str, Device | InventoryException]:
+        candidates = {
+            name: [f"{name.split('.')[0]}.{domain}" for domain in domains] for name in names
+        }
+
+        variables: dict[str, Any] = {
+            "names": list(dict.fromkeys(fqdn for fqdns in candidates.values() for fqdn in fqdns))
+        }
+        if roles is not None:
+            variables["roles"] = roles
+
+        data = await self._query(_device_query(roles is not None), variables)
+        found = {device["name"].lower(): device for device in data["device_list"]}
+
+        result: dict[str, Device | InventoryException] = {}
+        for name, fqdns in candidates.items():
+            # Domains order is the priority order
+            for fqdn in fqdns:
+                device = found.get(fqdn.lower())
+                if device is not None:
+                    result[name] = _device_from_data(device)
+                    break
+            else:
+                result[name] = InventoryException(
+                    "there is no such switch in Netbox", element="switch"
+                )
+
+        return result
+
+    async def get_interfaces(
+        self,
+        names: list[str],
+        devices: list[Device],
+    ) -> dict[str, dict[str, Interface | InventoryException]]:
+        data = await self._query(
+            INTERFACE_QUERY,
+            {
+                "name": names,
+                "device": list(dict.fromkeys(device.fqdn for device in devices)),
+                "site": list(dict.fromkeys(device.location for device in devices)),
+            },
+        )
+
+        found = {
+            (interface["device"]["name"].lower(), interface["name"]): interface
+            for interface in data["interface_list"]
+        }
+        setup_vlans: dict[str, int] = {}
+        for vlan in data["vlan_list"]:
+            setup_vlans.setdefault(vlan["site"]["slug"], vlan["vid"])
+
+        result: dict[str, dict[str, Interface | InventoryException]] = {}
+        for device in devices:
+            interfaces = result.setdefault(device.fqdn, {})
+
+            for name in names:
+                interface = found.get((device.fqdn.lower(), name))
+                if interface is not None:
+                    interfaces[name] = interface_from_data(
+                        interface, setup_vlans.get(device.location)
+                    )
+                else:
+                    interfaces[name] = InventoryException(
+                        "there is no such interface on this switch in Netbox", element="interface"
+                    )
+
+        return result
@@ -0,0 +1,138 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Self, TypeVar
+
+from .exceptions import InventoryException
+from .inventory import Device, Interface
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    SingleFlight runs only one call per key at a time. Concurrent callers with the same key
+    wait for the call in flight and share its result or exception.
+
+    The call runs in its own task, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+        # Mark the exception as retrieved in case every caller is gone
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run the call or join the one in flight
+
+        Args:
+            key: call key, calls with equal keys are coalesced
+            func: coroutine function to run
+
+        Returns:
+            T: the call result
+
+        Raises:
+            Exception: any exception raised by the call
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda task: self._done(key, task))
+            self.calls += 1
+        else:
+            self.collapsed += 1
+
+        try:
+            return await asyncio.shield(task)
+        except InventoryException as e:
+            # Every caller gets its own exception so tracebacks do not pile up
+            raise InventoryException(e.message, element=e.element) from None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._tasks),
+        }
+
+
+singleflight = SingleFlight()
+
+
+def singleflight_stats() -> dict[str, int]:
+    return singleflight.stats()
+
+
+@dataclass
+class CoalescingInventory:
+    """
+    CoalescingInventory wraps any SoT implementing SupportsGetDeviceInterface and
+    coalesces concurrent identical get_device/get_interface lookups of the worker,
+    so only one SoT request runs for them.
+
+    Args:
+        inventory: SoT object to get the data from
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+
+    inventory: Any
+
+    async def __aenter__(self) -> Self:
+        await self.inventory.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.inventory.__aexit__(*exc)
+
+    async def get_device(
+        self,
+        name: str,
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> Device:
+        key = (
+            "device",
+            self.inventory.__class__.__name__,
+            name.split(".")[0],
+            tuple(domains),
+            tuple(roles) if roles is not None else None,
+        )
+
+        return await singleflight.do(
+            key, lambda: self.inventory.get_device(name, domains=domains, roles=roles)
+        )
+
+    async def get_interface(self, name: str, device: Device) -> Interface:
+        key = ("interface", self.inventory.__class__.__name__, name, device.fqdn)
+
+        return await singleflight.do(key, lambda: self.inventory.get_interface(name, device))
+
+    async def get_devices(
+        self,
+        names: list[str],
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> dict[str, Device | InventoryException]:
+        return await self.inventory.get_devices(names, domains=domains, roles=roles)
+
+    async def get_interfaces(
+        self,
+        names: list[str],
+        devices: list[Device],
+    ) -> dict[str, dict[str, Interface | InventoryException]]:
+        return await self.inventory.get_interfaces(names, devices)
@@ -0,0 +1,545 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Self
+
+from napi.lib import VlanSet
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+from .exceptions import InventoryException
+from .inventory import Device, Interface, Vlans
+from .netbox import (
+    NETBOX_DEVICE_SUFFIX,
+    NETBOX_INTERFACES_SUFFIX,
+    NETBOX_VLANS_SUFFIX,
+    Netbox,
+    device_from_data,
+    device_role,
+)
+
+
+@dataclass
+class DeviceEntry:
+    id: int
+    device: Device
+    role: str | None
+
+
+@dataclass
+class InterfaceEntry:
+    id: int
+    device_id: int
+    name: str
+    description: str
+    untagged: int | None
+    tagged: list[int] = field(default_factory=list)
+
+
+@dataclass
+class SetupVlanEntry:
+    id: int
+    site: str
+    vid: int
+
+
+def _device_entry(data: dict[str, Any]) -> DeviceEntry | None:
+    status = data["status"]["value"] if isinstance(data["status"], dict) else data["status"]
+    if status != "active":
+        return None
+
+    return DeviceEntry(id=data["id"], device=device_from_data(data), role=device_role(data))
+
+
+def _interface_entry(data: dict[str, Any]) -> InterfaceEntry:
+    return InterfaceEntry(
+        id=data["id"],
+        device_id=data["device"]["id"],
+        name=data["name"],
+        description=data["description"],
+        untagged=data["untagged_vlan"]["vid"] if data["untagged_vlan"] else None,
+        tagged=[vlan["vid"] for vlan in data["tagged_vlans"]],
+    )
+
+
+def _setup_vlan_entry(data: dict[str, Any]) -> SetupVlanEntry | None:
+    if data["site"] is None or data["role"] is None or data["role"]["slug"] != "setup":
+        return None
+
+    return SetupVlanEntry(id=data["id"], site=data["site"]["slug"], vid=data["vid"])
+
+
+class SnapshotIndex:
+    """
+    SnapshotIndex is an in-memory mirror of Netbox data napi needs.
+
+    Keeps active devices by FQDN, interfaces by (device, name) and setup VLAN by site.
+    Objects are also stored by their Netbox ids to apply incremental updates.
+    """
+
+    def __init__(self) -> None:
+        self.synced: float | None = None
+
+        self._devices: dict[int, DeviceEntry] = {}
+        self._interfaces: dict[int, InterfaceEntry] = {}
+        self._setup_vlans: dict[int, SetupVlanEntry] = {}
+
+        self._devices_by_fqdn: dict[str, DeviceEntry] = {}
+        self._interfaces_by_name: dict[tuple[int, str], InterfaceEntry] = {}
+        self._setup_vlans_by_site: dict[str, int] = {}
+
+    def add_device(self, entry: DeviceEntry) -> None:
+        self.remove_device(entry.id, with_interfaces=False)
+        self._devices[entry.id] = entry
+        self._devices_by_fqdn[entry.device.fqdn.lower()] = entry
+
+    def remove_device(self, id_: int, with_interfaces: bool = True) -> None:
+        entry = self._devices.pop(id_, None)
+        if entry is not None:
+            self._devices_by_fqdn.pop(entry.device.fqdn.lower(), None)
+
+        if with_interfaces:
+            for interface in [i for i in self._interfaces.values() if i.device_id == id_]:
+                self.remove_interface(interface.id)
+
+    def add_interface(self, entry: InterfaceEntry) -> None:
+        self.remove_interface(entry.id)
+        self._interfaces[entry.id] = entry
+        self._interfaces_by_name[(entry.device_id, entry.name)] = entry
+
+    def remove_interface(self, id_: int) -> None:
+        entry = self._interfaces.pop(id_, None)
+        if entry is not None:
+            self._interfaces_by_name.pop((entry.device_id, entry.name), None)
+
+    def add_setup_vlan(self, entry: SetupVlanEntry) -> None:
+        self.remove_setup_vlan(entry.id)
+        self._setup_vlans[entry.id] = entry
+        self._reindex_site(entry.site)
+
+    def remove_setup_vlan(self, id_: int) -> None:
+        entry = self._setup_vlans.pop(id_, None)
+        if entry is not None:
+            self._reindex_site(entry.site)
+
+    def _reindex_site(self, site: str) -> None:
+        vids = [vlan.vid for vlan in self._setup_vlans.values() if vlan.site == site]
+        if vids:
+            self._setup_vlans_by_site[site] = min(vids)
+        else:
+            self._setup_vlans_by_site.pop(site, None)
+
+    def device(self, fqdn: str) -> DeviceEntry | None:
+        return self._devices_by_fqdn.get(fqdn.lower())
+
+    def interface(self, device_id: int, name: str) -> InterfaceEntry | None:
+        return self._interfaces_by_name.get((device_id, name))
+
+    def setup_vlan(self, site: str) -> int | None:
+        return self._setup_vlans_by_site.get(site)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "devices": len(self._devices),
+            "interfaces": len(self._interfaces),
+            "setup_vlans": len(self._setup_vlans),
+            "age": round(time.time() - self.synced) if self.synced is not None else None,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "synced": self.synced,
+            "devices": [
+                {
+                    "id": entry.id,
+                    "fqdn": entry.device.fqdn,
+                    "vendor": entry.device.vendor,
+                    "model": entry.device.model,
+                    "tenant": entry.device.tenant,
+                    "location": entry.device.location,
+                    "ip": entry.device.ip,
+                    "role": entry.role,
+                }
+                for entry in self._devices.values()
+            ],
+            "interfaces": [
+                {
+                    "id": entry.id,
+                    "device_id": entry.device_id,
+                    "name": entry.name,
+                    "description": entry.description,
+                    "untagged": entry.untagged,
+                    "tagged": entry.tagged,
+                }
+                for entry in self._interfaces.values()
+            ],
+            "setup_vlans": [
+                {
+                    "id": entry.id,
+                    "site": entry.site,
+                    "vid": entry.vid,
+                }
+                for entry in self._setup_vlans.values()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        index = cls()
+        index.synced = data["synced"]
+
+        for device in data["devices"]:
+            index.add_device(
+                DeviceEntry(
+                    id=device.pop("id"),
+                    role=device.pop("role"),
+                    device=Device(**device),
+                )
+            )
+
+        for interface in data["interfaces"]:
+            index.add_interface(InterfaceEntry(**interface))
+
+        for vlan in data["setup_vlans"]:
+            index.add_setup_vlan(SetupVlanEntry(**vlan))
+
+        return index
+
+
+_index = SnapshotIndex()
+_dirty = False
+_sync_task: asyncio.Task | None = None
+# Events received while a full sync is in flight
+_replay: list[tuple[str, str, dict[str, Any], float]] | None = None
+
+
+async def sync_snapshot() -> None:
+    """
+    Replaces the snapshot with the full copy of Netbox data.
+    Events received while Netbox is queried are replayed on the new snapshot.
+
+    Args:
+        N/A
+
+    Returns:
+        None
+
+    Raises:
+        InventoryException: failed to query Netbox
+    """
+    global _index, _dirty, _replay
+
+    netbox = Netbox()
+    started = time.time()
+
+    _replay = replay = []
+    try:
+        devices, interfaces, vlans = await asyncio.gather(
+            netbox._get_all(NETBOX_DEVICE_SUFFIX, [("status", "active")]),
+            netbox._get_all(NETBOX_INTERFACES_SUFFIX, []),
+            netbox._get_all(NETBOX_VLANS_SUFFIX, [("role", "setup")]),
+        )
+    finally:
+        _replay = None
+
+    index = SnapshotIndex()
+    index.synced = started
+
+    for data in devices:
+        if (device := _device_entry(data)) is not None:
+            index.add_device(device)
+
+    for data in interfaces:
+        index.add_interface(_interface_entry(data))
+
+    for data in vlans:
+        if (vlan := _setup_vlan_entry(data)) is not None:
+            index.add_setup_vlan(vlan)
+
+    # Netbox might have answered before or after the change, the event is applied anyway
+    for model, event, data, received in replay:
+        if received >= started:
+            _apply(index, model, event, data)
+
+    _index = index
+    _dirty = True
+
+    logger.info(
+        f"inventory snapshot is synced in {time.time() - started:.1f}s: "
+        f"{len(devices)} devices, {len(interfaces)} interfaces, {len(vlans)} setup VLANs"
+    )
+
+
+def _dump(path: Path, data: dict[str, Any]) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}")
+    with tmp_path.open("w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _load(path: Path) -> dict[str, Any]:
+    with path.open() as f:
+        return json.load(f)
+
+
+async def save_snapshot() -> None:
+    """
+    Persists the snapshot to disk if it has changed since the last save.
+
+    Args:
+        N/A
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    global _dirty
+
+    if not _dirty or _index.synced is None:
+        return
+
+    path = Path(settings.inventory_snapshot_file)
+    try:
+        await asyncio.to_thread(_dump, path, _index.as_dict())
+    except OSError as e:
+        logger.error(f"failed to save inventory snapshot to {path}: {e!r}")
+        return
+
+    _dirty = False
+    logger.debug(f"inventory snapshot is saved to {path}")
+
+
+async def load_snapshot() -> None:
+    """
+    Loads the snapshot persisted by any worker from disk.
+
+    Args:
+        N/A
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    global _index
+
+    path = Path(settings.inventory_snapshot_file)
+    if not path.exists():
+        return
+
+    try:
+        _index = SnapshotIndex.from_dict(await asyncio.to_thread(_load, path))
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"failed to load inventory snapshot from {path}: {e!r}")
+        return
+
+    logger.info(f"inventory snapshot is loaded from {path}: {_index.stats()}")
+
+
+def _apply(index: SnapshotIndex, model: str, event: str, data: dict[str, Any]) -> bool:
+    match model, event:
+        case "device", "deleted":
+            index.remove_device(data["id"])
+        case "device", _:
+            if (device := _device_entry(data)) is not None:
+                index.add_device(device)
+            else:
+                index.remove_device(data["id"], with_interfaces=False)
+        case "interface", "deleted":
+            index.remove_interface(data["id"])
+        case "interface", _:
+            index.add_interface(_interface_entry(data))
+        case "vlan", "deleted":
+            index.remove_setup_vlan(data["id"])
+        case "vlan", _:
+            if (vlan := _setup_vlan_entry(data)) is not None:
+                index.add_setup_vlan(vlan)
+            else:
+                index.remove_setup_vlan(data["id"])
+        case _:
+            return False
+
+    return True
+
+
+def apply_event(
+    model: str, event: str, data: dict[str, Any], received: float | None = None
+) -> None:
+    """
+    Applies Netbox webhook event to the snapshot.
+
+    Events received while a full sync is in flight are queued and replayed on the new snapshot.
+    Events received before the snapshot was synced are already in it and are skipped.
+
+    Args:
+        model: Netbox model name - "device", "interface" or "vlan"
+        event: Netbox event - "created", "updated" or "deleted"
+        data: Netbox object data
+        received: time the webhook was received, now if not provided
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    global _dirty
+
+    if received is None:
+        received = time.time()
+
+    if _replay is not None:
+        _replay.append((model, event, data, received))
+
+    if _index.synced is None or received < _index.synced:
+        return
+
+    if _apply(_index, model, event, data):
+        _dirty = True
+
+
+def snapshot_stats() -> dict[str, Any]:
+    return _index.stats()
+
+
+async def _sync_snapshot_forever() -> None:
+    while True:
+        # A fresh snapshot saved by another worker is served as is until it expires
+        if _index.synced is not None:
+            age = time.time() - _index.synced
+            await asyncio.sleep(max(settings.inventory_snapshot_sync - age, 0))
+
+        try:
+            await sync_snapshot()
+        except InventoryException as e:
+            logger.error(f"failed to sync inventory snapshot: {e}")
+            await asyncio.sleep(settings.inventory_snapshot_retry)
+            continue
+
+        await save_snapshot()
+
+
+async def start_snapshot_sync() -> None:
+    global _sync_task
+
+    # The persisted snapshot is loaded before any webhook event is applied
+    if _index.synced is None:
+        await load_snapshot()
+
+    if _sync_task is None or _sync_task.done():
+        _sync_task = asyncio.create_task(_sync_snapshot_forever())
+
+
+async def stop_snapshot_sync() -> None:
+    global _sync_task
+
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
+
+    await save_snapshot()
+
+
+@dataclass
+class Snapshot:
+    """
+    Snapshot gets network devices information from the in-memory mirror of Netbox.
+
+    The mirror is synced from Netbox in background, updated by Netbox webhooks
+    and persisted to disk, so lookups never wait for network I/O.
+    """
+    api_url: str = settings.nb_api_url
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+    async def get_device(
+        self,
+        name: str,
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> Device:
+        if _index.synced is None:
+            raise InventoryException("inventory snapshot is not loaded yet", element="connect")
+
+        hostname = name.split(".")[0]
+
+        # Domains order is the priority order
+        for domain in domains:
+            entry = _index.device(f"{hostname}.{domain}")
+            if entry is not None and (roles is None or entry.role in roles):
+                return entry.device
+
+        raise InventoryException("there is no such switch in Netbox", element="switch")
+
+    async def get_interface(
+        self,
+        name: str,
+        device: Device,
+    ) -> Interface:
+        if _index.synced is None:
+            raise InventoryException("inventory snapshot is not loaded yet", element="connect")
+
+        device_entry = _index.device(device.fqdn)
+        interface = (
+            _index.interface(device_entry.id, name) if device_entry is not None else None
+        )
+        if interface is None:
+            raise InventoryException(
+                "there is no such interface on this switch in Netbox", element="interface"
+            )
+
+        return Interface(
+            name=interface.name,
+            description=interface.description,
+            vlans=Vlans(
+                setup=_index.setup_vlan(device.location),
+                untagged=interface.untagged,
+                tagged=VlanSet(interface.tagged),
+            ),
+        )
+
+    async def get_devices(
+        self,
+        names: list[str],
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> dict[str, Device | InventoryException]:
+        result: dict[str, Device | InventoryException] = {}
+        for name in names:
+            try:
+                result[name] = await self.get_device(name, domains=domains, roles=roles)
+            except InventoryException as e:
+                result[name] = e
+
+        return result
+
+    async def get_interfaces(
+        self,
+        names: list[str],
+        devices: list[Device],
+    ) -> dict[str, dict[str, Interface | InventoryException]]:
+        result: dict[str, dict[str, Interface | InventoryException]] = {}
+        for device in devices:
+            interfaces = result.setdefault(device.fqdn, {})
+
+            for name in names:
+                try:
+                    interfaces[name] = await self.get_interface(name, device)
+                except InventoryException as e:
+                    interfaces[name] = e
+
+        return result
@@ -0,0 +1,270 @@
+import json
+import sqlite3
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Self
+
+import yaml
+
+from napi.lib import VlanSet
+from napi.logger import core_logger as logger
+from napi.settings import settings
+
+from .exceptions import InventoryException
+from .inventory import Device, Interface, Vlans
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    fqdn TEXT PRIMARY KEY COLLATE NOCASE,
+    vendor TEXT NOT NULL,
+    model TEXT NOT NULL,
+    tenant TEXT,
+    site TEXT NOT NULL,
+    ip TEXT,
+    role TEXT,
+    status TEXT NOT NULL DEFAULT 'active'
+);
+
+CREATE TABLE IF NOT EXISTS interfaces (
+    device TEXT NOT NULL COLLATE NOCASE,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    untagged INTEGER,
+    tagged TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (device, name)
+);
+
+CREATE TABLE IF NOT EXISTS vlans (
+    site TEXT,
+    vid INTEGER NOT NULL,
+    role TEXT
+);
+
+CREATE INDEX IF NOT EXISTS vlans_role_site ON vlans (role, site, vid);
+"""
+
+_connection: sqlite3.Connection | None = None
+
+
+def get_connection() -> sqlite3.Connection:
+    """
+    Returns the worker-wide read-only connection to the inventory database.
+
+    Args:
+        N/A
+
+    Returns:
+        sqlite3.Connection: database connection
+
+    Raises:
+        InventoryException: failed to open the database
+    """
+    global _connection
+
+    if _connection is None:
+        try:
+            _connection = sqlite3.connect(
+                f"file:{settings.inventory_db}?mode=ro", uri=True, check_same_thread=False
+            )
+        except sqlite3.Error as e:
+            logger.critical(f"failed to open inventory database {settings.inventory_db}: {e!r}")
+            raise InventoryException("failed to open inventory database", element="connect")
+
+    return _connection
+
+
+def close_connection() -> None:
+    global _connection
+
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+
+def _tagged(tagged: str | int | list[int] | None) -> str:
+    if isinstance(tagged, list):
+        return str(VlanSet(tagged))
+
+    return str(tagged) if tagged is not None else ""
+
+
+def build_database(source: str, db: str) -> None:
+    """
+    Creates the inventory database from YAML/JSON file with "devices", "interfaces" and "vlans" lists.
+
+    Args:
+        source: YAML or JSON file with inventory data
+        db: database file to create
+
+    Returns:
+        None
+
+    Raises:
+        N/A
+    """
+    with open(source) as f:
+        data = json.load(f) if source.endswith(".json") else yaml.safe_load(f)
+
+    with sqlite3.connect(db) as connection:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            "INSERT OR REPLACE INTO devices "
+            "VALUES (:fqdn, :vendor, :model, :tenant, :site, :ip, :role, :status)",
+            [
+                {"tenant": None, "ip": None, "role": None, "status": "active", **device}
+                for device in data.get("devices", [])
+            ],
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO interfaces VALUES (:device, :name, :description, :untagged, :tagged)",
+            [
+                {
+                    "description": "",
+                    "untagged": None,
+                    **interface,
+                    "tagged": _tagged(interface.get("tagged")),
+                }
+                for interface in data.get("interfaces", [])
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO vlans VALUES (:site, :vid, :role)",
+            [{"site": None, "role": None, **vlan} for vlan in data.get("vlans", [])],
+        )
+
+
+@dataclass
+class SQLite:
+    """
+    SQLite gets network devices information from the local SQLite database.
+
+    It does not need any network I/O, so it is handy for offline operation and
+    load testing of the API layer. Build the database with:
+
+        python -m napi.inventory.sqlite inventory.yml inventory.db
+    """
+    api_url: str = settings.inventory_db
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+    def _query(self, query: str, params: list[Any]) -> list[tuple[Any, ...]]:
+        # The database is opened on the first query, so its failure is an inventory error
+        # of the request instead of the handler construction
+        connection = get_connection()
+
+        try:
+            return connection.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            logger.critical(repr(e), exc_info=True)
+            raise InventoryException(f"invalid inventory database: {e}", element="inventory")
+
+    async def get_device(
+        self,
+        name: str,
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> Device:
+        hostname = name.split(".")[0]
+        fqdns = [f"{hostname}.{domain}" for domain in domains]
+
+        query = (
+            "SELECT fqdn, vendor, model, tenant, site, ip FROM devices "
+            f"WHERE status = 'active' AND fqdn IN ({', '.join('?' * len(fqdns))})"
+        )
+        params: list[Any] = [*fqdns]
+        if roles is not None:
+            query += f" AND role IN ({', '.join('?' * len(roles))})"
+            params.extend(roles)
+
+        found = {row[0].lower(): row for row in self._query(query, params)}
+
+        # Domains order is the priority order
+        for fqdn in fqdns:
+            row = found.get(fqdn.lower())
+            if row is not None:
+                break
+        else:
+            raise InventoryException("there is no such switch in inventory", element="switch")
+
+        return Device(
+            fqdn=row[0],
+            vendor=row[1],
+            model=row[2],
+            tenant=row[3],
+            location=row[4],
+            ip=row[5],
+        )
+
+    async def get_interface(
+        self,
+        name: str,
+        device: Device,
+    ) -> Interface:
+        rows = self._query(
+            "SELECT name, description, untagged, tagged, "
+            "(SELECT MIN(vid) FROM vlans WHERE role = 'setup' AND site = ?) "
+            "FROM interfaces WHERE device = ? AND name = ?",
+            [device.location, device.fqdn, name],
+        )
+        if not rows:
+            raise InventoryException(
+                "there is no such interface on this switch in inventory", element="interface"
+            )
+
+        name, description, untagged, tagged, setup = rows[0]
+
+        return Interface(
+            name=name,
+            description=description,
+            vlans=Vlans(
+                setup=setup,
+                untagged=untagged,
+                tagged=VlanSet.parse(tagged),
+            ),
+        )
+
+    async def get_devices(
+        self,
+        names: list[str],
+        domains: list[str],
+        roles: list[str] | None,
+    ) -> dict[str, Device | InventoryException]:
+        result: dict[str, Device | InventoryException] = {}
+        for name in names:
+            try:
+                result[name] = await self.get_device(name, domains=domains, roles=roles)
+            except InventoryException as e:
+                result[name] = e
+
+        return result
+
+    async def get_interfaces(
+        self,
+        names: list[str],
+        devices: list[Device],
+    ) -> dict[str, dict[str, Interface | InventoryException]]:
+        result: dict[str, dict[str, Interface | InventoryException]] = {}
+        for device in devices:
+            interfaces = result.setdefault(device.fqdn, {})
+
+            for name in names:
+                try:
+                    interfaces[name] = await self.get_interface(name, device)
+                except InventoryException as e:
+                    interfaces[name] = e
+
+        return result
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m napi.inventory.sqlite <inventory.yml|inventory.json> <inventory.db>")
+        sys.exit(1)
+
+    build_database(sys.argv[1], sys.argv[2])
+    print(f"{Path(sys.argv[2]).resolve()} is built")
@@ -1,10 +1,17 @@
-def _flatten(vlans: str) -> list[int]:
-    return [
-        num
-        for group in vlans.split(",")
-        for a, _, b in [group.partition("-")]
-        for num in range(int(a), int(b or a) + 1)
-    ]
+from .vlans import VlanSet
+
+__all__ = [
+    "VlanSet",
+]
+
+
+def _mac_digits(mac: str) -> str:
+    # "AA:BB:CC", "aabb-cc" and "aabb.cc" are the same MAC prefix "aabbcc"
+    return "".join(char for char in mac.lower() if char in "0123456789abcdef")
+
+
+def _mac_digits_to_dash(digits: str) -> str:
+    return "-".join(digits[i : i + 4] for i in range(0, len(digits), 4))
 
 
 def _mac_dash_to_column(mac):
@@ -0,0 +1,171 @@
+from typing import Any, Iterable, Iterator, Self
+
+MAX_VLAN = 4095
+
+
+def _span(start: int, end: int) -> int:
+    if not 0 <= start <= end <= MAX_VLAN:
+        raise ValueError(f"invalid VLAN range {start}-{end}")
+
+    return ((1 << (end + 1)) - 1) ^ ((1 << start) - 1)
+
+
+class VlanSet:
+    """
+    VlanSet is an immutable set of VLAN IDs backed by a 4096 bit bitmap.
+
+    Membership is O(1), set operations are single bitwise operations and equality does not
+    depend on order. The text form is the range compressed "10-20,30" used by both Huawei
+    trunkVlans and Cumulus bridge commands.
+
+    Args:
+        vlans: VLAN IDs
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: VLAN ID is out of 0-4095
+    """
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, vlans: Iterable[int] = ()) -> None:
+        if isinstance(vlans, VlanSet):
+            self._bits = vlans._bits
+            return
+
+        if isinstance(vlans, range) and vlans.step == 1:
+            self._bits = _span(vlans.start, vlans.stop - 1) if vlans else 0
+            return
+
+        bits = 0
+        for vlan in vlans:
+            bits |= _span(vlan, vlan)
+        self._bits = bits
+
+    @classmethod
+    def _from_bits(cls, bits: int) -> Self:
+        instance = cls.__new__(cls)
+        instance._bits = bits
+
+        return instance
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[tuple[int, int]]) -> Self:
+        """
+        Build the set from (start, end) ranges, both ends included
+
+        Args:
+            ranges: VLAN ranges
+
+        Returns:
+            Self: VLAN set
+
+        Raises:
+            ValueError: VLAN ID is out of 0-4095
+        """
+        bits = 0
+        for start, end in ranges:
+            bits |= _span(start, end)
+
+        return cls._from_bits(bits)
+
+    @classmethod
+    def parse(cls, text: str | None) -> Self:
+        """
+        Parse range compressed text, e.g. "10-20,30". Spaces are ignored
+
+        Args:
+            text: VLAN ranges text
+
+        Returns:
+            Self: VLAN set
+
+        Raises:
+            ValueError: the text is not a valid VLAN ranges list
+        """
+        ranges = []
+        for group in (text or "").replace(" ", "").split(","):
+            if not group:
+                continue
+
+            start, _, end = group.partition("-")
+            ranges.append((int(start), int(end or start)))
+
+        return cls.from_ranges(ranges)
+
+    def ranges(self) -> list[tuple[int, int]]:
+        """
+        Consecutive VLANs as (start, end) ranges in ascending order
+
+        Args:
+            N/A
+
+        Returns:
+            list[tuple[int, int]]: VLAN ranges
+
+        Raises:
+            N/A
+        """
+        ranges = []
+        bits = self._bits
+
+        while bits:
+            start = (bits & -bits).bit_length() - 1
+            run = bits >> start
+            # Number of trailing ones is the range length
+            end = start + ((run + 1) & ~run).bit_length() - 2
+            ranges.append((start, end))
+            bits &= ~((1 << (end + 1)) - 1)
+
+        return ranges
+
+    def __contains__(self, vlan: object) -> bool:
+        return isinstance(vlan, int) and 0 <= vlan <= MAX_VLAN and bool(self._bits >> vlan & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for start, end in self.ranges():
+            yield from range(start, end + 1)
+
+    def __len__(self) -> int:
+        return self._bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return bool(self._bits)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, VlanSet):
+            return self._bits == other._bits
+
+        if isinstance(other, (set, frozenset, list, tuple, range)):
+            return self._bits == VlanSet(other)._bits
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._bits)
+
+    def __or__(self, other: Iterable[int]) -> Self:
+        return self._from_bits(self._bits | VlanSet(other)._bits)
+
+    def __and__(self, other: Iterable[int]) -> Self:
+        return self._from_bits(self._bits & VlanSet(other)._bits)
+
+    def __sub__(self, other: Iterable[int]) -> Self:
+        return self._from_bits(self._bits & ~VlanSet(other)._bits)
+
+    def __xor__(self, other: Iterable[int]) -> Self:
+        return self._from_bits(self._bits ^ VlanSet(other)._bits)
+
+    def __str__(self) -> str:
+        return ",".join(f"{start}-{end}" if start != end else f"{start}" for start, end in self.ranges())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({str(self)!r})"
+
+    def __getstate__(self) -> Any:
+        return self._bits
+
+    def __setstate__(self, bits: Any) -> None:
+        self._bits = bits
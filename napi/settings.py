@@ -13,6 +13,71 @@ class Settings(BaseSettings):
     tenants: list[str]
     domains: list[str]
     endpoints: list[str]
+    inventory: str = "netbox"
+
+    # Netbox HTTP connection pool (shared by all requests of a worker)
+    nb_max_connections: int = 100
+    nb_max_keepalive_connections: int = 20
+    nb_keepalive_expiry: float = 30.0
+    nb_http2: bool = False
+    nb_setup_vlans_refresh: float = 300.0
+
+    # Netbox requests resilience
+    nb_timeout: float = 5.0
+    nb_hedge: bool = True
+    nb_breaker_threshold: int = 5
+    nb_breaker_reset: float = 30.0
+
+    # Coalesce concurrent identical inventory lookups (per worker)
+    inventory_singleflight: bool = True
+
+    # Inventory cache (per worker)
+    inventory_cache: bool = True
+    inventory_cache_size: int = 10000
+    inventory_cache_device_ttl: float = 300.0
+    inventory_cache_interface_ttl: float = 60.0
+    inventory_cache_negative_ttl: float = 10.0
+    inventory_cache_stale_ttl: float = 3600.0
+
+    # Inventory snapshot (used by "snapshot" inventory)
+    inventory_snapshot_file: str = "inventory_snapshot.json"
+    inventory_snapshot_sync: float = 3600.0
+    inventory_snapshot_retry: float = 30.0
+
+    # Netbox webhook events journal shared by the workers of the host
+    inventory_events_file: str = "inventory_events.jsonl"
+    inventory_events_poll: float = 1.0
+    inventory_events_keep: float = 7200.0
+
+    # Inventory database (used by "sqlite" inventory)
+    inventory_db: str = "inventory.db"
+
+    # Shared SSH connections (per worker)
+    ssh_max_channels: int = 8
+    ssh_idle_timeout: float = 60.0
+
+    # NETCONF sessions pool (per worker)
+    netconf_max_sessions: int = 4
+    netconf_idle_timeout: float = 60.0
+    netconf_codec: str = "xmltodict"
+    netconf_commit_window: float = 0.05
+    netconf_reply_timeout: float = 300.0
+
+    # CLI (SSH) sessions pool (per worker)
+    cli_max_sessions: int = 4
+    cli_idle_timeout: float = 60.0
+
+    # Device operations scheduler (per worker)
+    scheduler_max_operations: int = 256
+    scheduler_device_reads: int = 4
+    scheduler_device_writes: int = 1
+    scheduler_vendor_reads: int = 64
+    scheduler_vendor_writes: int = 16
+    scheduler_queue_timeout: float = 30.0
+    scheduler_retry_after: int = 5
+
+    # Macgrabber
+    macgrabber_partitions: int = 1
 
     class Config:
         env_file: str = ".env"
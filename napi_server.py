@@ -5,8 +5,12 @@ from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 
 from endpoints.ping import ping_router
+from endpoints.stats import stats_router
 from napi.auth import init_auth_database
 from napi.custom_handlers import http422_error_handler
+from napi.driver.pool import close_pools, start_pools
+from napi.driver.ssh import ssh_connections
+from napi.inventory import close_inventory, init_inventory
 from napi.logger import core_logger
 from napi.settings import ENDPOINTS_DIR, ENV, settings
 
@@ -19,7 +23,13 @@ app = FastAPI(
 
 app.add_exception_handler(RequestValidationError, http422_error_handler)
 app.on_event("startup")(init_auth_database)
+app.on_event("startup")(init_inventory)
+app.on_event("startup")(start_pools)
+app.on_event("shutdown")(close_inventory)
+app.on_event("shutdown")(close_pools)
+app.on_event("shutdown")(ssh_connections.close)
 app.include_router(ping_router)
+app.include_router(stats_router)
 
 for endpoint in settings.endpoints:
     module_path = Path(f"{ENDPOINTS_DIR}/{endpoint}")
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import pytest
+
+from napi.inventory import Device, InventoryException
+from napi.inventory.cache import CachedInventory, TTLCache, device_cache, interface_cache
+from napi.settings import settings
+
+DEVICE = Device(
+    fqdn="sw1.example.net", vendor="huawei", model="ce6870", tenant=None, location="dc1", ip=None
+)
+
+
+class Inventory:
+    """SoT answering from the results list, one result per call"""
+
+    def __init__(self, *results) -> None:
+        self.results = list(results)
+        self.calls = 0
+
+    async def get_device(self, name, domains, roles):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _get(inventory: Inventory, bypass: bool = False) -> Device:
+    cached = CachedInventory(inventory, bypass=bypass)
+    return asyncio.run(cached.get_device("sw1", domains=["example.net"], roles=None))
+
+
+def _expire(cache: TTLCache, seconds: float = 1.0) -> None:
+    for entry in cache._data.values():
+        entry.expires = time.monotonic() - seconds
+
+
+def _unavailable() -> InventoryException:
+    return InventoryException("netbox is unavailable", element="connect")
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    monkeypatch.setattr(settings, "inventory_cache_stale_ttl", 60.0)
+    device_cache.invalidate()
+    interface_cache.invalidate()
+    yield
+    device_cache.invalidate()
+    interface_cache.invalidate()
+
+
+def test_hit():
+    inventory = Inventory(DEVICE)
+
+    assert _get(inventory) is DEVICE
+    assert _get(inventory) is DEVICE
+    assert inventory.calls == 1
+
+
+def test_negative():
+    inventory = Inventory(InventoryException("there is no such switch", element="switch"))
+
+    for _ in range(2):
+        with pytest.raises(InventoryException) as e:
+            _get(inventory)
+        assert e.value.element == "switch"
+
+    assert inventory.calls == 1
+
+
+def test_connect_errors_are_not_cached():
+    inventory = Inventory(_unavailable(), DEVICE)
+
+    with pytest.raises(InventoryException):
+        _get(inventory)
+
+    assert _get(inventory) is DEVICE
+    assert inventory.calls == 2
+
+
+def test_stale():
+    inventory = Inventory(DEVICE, _unavailable())
+
+    _get(inventory)
+    _expire(device_cache)
+
+    assert _get(inventory) is DEVICE
+    assert inventory.calls == 2
+    assert device_cache.stale == 1
+
+
+def test_stale_too_old():
+    inventory = Inventory(DEVICE, _unavailable())
+
+    _get(inventory)
+    _expire(device_cache, settings.inventory_cache_stale_ttl + 1)
+
+    with pytest.raises(InventoryException):
+        _get(inventory)
+
+
+def test_bypass_refreshes():
+    updated = Device(
+        fqdn="sw1.example.net",
+        vendor="huawei",
+        model="ce6881",
+        tenant=None,
+        location="dc1",
+        ip=None,
+    )
+    inventory = Inventory(DEVICE, updated)
+
+    _get(inventory)
+
+    assert _get(inventory, bypass=True) is updated
+    assert _get(inventory) is updated
+    assert inventory.calls == 2
+
+
+def test_bypass_never_serves_stale():
+    inventory = Inventory(DEVICE, _unavailable())
+
+    _get(inventory)
+
+    with pytest.raises(InventoryException) as e:
+        _get(inventory, bypass=True)
+    assert e.value.element == "connect"
@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from napi.driver.netconf import commit, exceptions
+from napi.driver.netconf.ce import InterfaceTree, L2Interface
+from napi.driver.netconf.commit import CommitCoalescer
+from napi.driver.netconf.driver import CANDIDATE
+
+
+class Driver:
+    """NETCONF driver recording RPCs. Edits of the "bad" interface are rejected"""
+
+    log: list = []
+    error: Exception | None = None
+
+    def __init__(self, host: str = "sw1", **_) -> None:
+        self.host = host
+        self.timeout = 1
+        self.reply_timeout = 1
+        self.capabilities = []
+        self.codec = None
+        self.vendor = "huawei"
+        self.priority = None
+        self._session = None
+
+    @classmethod
+    def caller(cls) -> "Driver":
+        driver = cls()
+        driver._session = object()
+        return driver
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    @property
+    def server_capabilities(self) -> list[str]:
+        return [CANDIDATE]
+
+    def take_session(self, driver: "Driver") -> None:
+        self._session, driver._session = driver._session, None
+
+    async def connect(self) -> None:
+        self.log.append("connect")
+        self._session = object()
+
+    async def __aexit__(self, *_) -> None:
+        if self._session is not None:
+            self.log.append("release")
+            self._session = None
+
+    async def edit_config(self, target: str, config: InterfaceTree) -> None:
+        assert self.connected
+        names = [interface.name for interface in config.interfaces]
+        self.log.append(("edit", *names))
+        await asyncio.sleep(0.01)
+
+        if self.error is not None:
+            raise self.error
+        if "bad" in names:
+            raise exceptions.RPCError("bad interface")
+
+    async def commit(self) -> None:
+        self.log.append("commit")
+
+    async def discard_changes(self) -> None:
+        self.log.append("discard")
+
+
+@pytest.fixture(autouse=True)
+def driver(monkeypatch):
+    monkeypatch.setattr(commit, "NetconfDriver", Driver)
+    monkeypatch.setattr(Driver, "log", [])
+    monkeypatch.setattr(Driver, "error", None)
+
+
+def _edit(name: str) -> InterfaceTree:
+    return InterfaceTree(interfaces=[L2Interface(name=name)])
+
+
+def _run(coalescer: CommitCoalescer, *names: str, drivers: list[Driver] | None = None) -> list:
+    drivers = drivers or [Driver.caller() for _ in names]
+
+    async def main():
+        return await asyncio.gather(
+            *(coalescer.edit_config(driver, _edit(name)) for driver, name in zip(drivers, names)),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(main())
+
+
+def test_one_commit():
+    coalescer = CommitCoalescer(window=0.01)
+    drivers = [Driver.caller() for _ in range(3)]
+
+    assert _run(coalescer, "a", "b", "c", drivers=drivers) == [None, None, None]
+    assert Driver.log == [("edit", "a", "b", "c"), "commit"]
+    # The lent session is back with its caller
+    assert all(driver.connected for driver in drivers)
+    assert coalescer._locks == {}
+
+
+def test_same_interface_goes_to_next_batch():
+    coalescer = CommitCoalescer(window=0.01)
+
+    assert _run(coalescer, "a", "b", "a") == [None, None, None]
+    assert Driver.log == [("edit", "a", "b"), "commit", ("edit", "a"), "commit"]
+
+
+def test_rejected_edit_fails_only_its_caller():
+    coalescer = CommitCoalescer(window=0.01)
+
+    result = _run(coalescer, "a", "bad", "c")
+
+    assert result[0] is None and result[2] is None
+    assert isinstance(result[1], exceptions.RPCError)
+    assert Driver.log == [
+        ("edit", "a", "bad", "c"),
+        "discard",
+        ("edit", "a"),
+        "commit",
+        ("edit", "bad"),
+        "discard",
+        ("edit", "c"),
+        "commit",
+    ]
+    assert coalescer.stats()["isolated"] == 1
+
+
+def test_commit_error_fails_every_caller():
+    coalescer = CommitCoalescer(window=0.01)
+    Driver.error = exceptions.CommitError("busy")
+
+    result = _run(coalescer, "a", "b")
+
+    assert all(isinstance(error, exceptions.CommitError) for error in result)
+    assert Driver.log == [("edit", "a", "b"), "discard"]
+
+
+def test_own_checkout_without_caller_session():
+    coalescer = CommitCoalescer(window=0.01)
+
+    assert _run(coalescer, "a", drivers=[Driver()]) == [None]
+    assert Driver.log == ["connect", ("edit", "a"), "commit", "release"]
+
+
+def test_cancelled_caller():
+    coalescer = CommitCoalescer(window=0.01)
+    drivers = [Driver.caller() for _ in range(2)]
+
+    async def main():
+        tasks = [
+            asyncio.create_task(coalescer.edit_config(driver, _edit(name)))
+            for driver, name in zip(drivers, ["bad", "b"])
+        ]
+        # Cancelled while its session is lent to the batch
+        await asyncio.sleep(0.015)
+        tasks[0].cancel()
+
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    result = asyncio.run(main())
+
+    assert isinstance(result[0], asyncio.CancelledError)
+    assert result[1] is None
+    # The session of the cancelled caller is returned by the coalescer
+    assert Driver.log[-1] == "release"
+    assert not drivers[0].connected
+    assert drivers[1].connected
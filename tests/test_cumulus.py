@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from endpoints.portswitcher.driver.cumulus import CumulusDriver
+from endpoints.portswitcher.driver.exceptions import ConfigurationError
+from napi.driver.abstract import LinkType
+from napi.driver.cli.cumulus import L2Interface
+from napi.inventory import Device, Interface, Vlans
+from napi.lib import VlanSet
+
+PVID = ["PVID", "Egress Untagged"]
+
+
+def _current(*vlans: dict) -> dict:
+    return {"ifname": "swp1", "vlans": list(vlans)}
+
+
+def _access(pvid: int) -> L2Interface:
+    return L2Interface(name="swp1", mode=LinkType.ACCESS, pvid=pvid)
+
+
+def _trunk(pvid: int, vlans: str) -> L2Interface:
+    return L2Interface(
+        name="swp1", mode=LinkType.TRUNK, pvid=pvid, trunk_allowed_vlans=VlanSet.parse(vlans)
+    )
+
+
+@pytest.mark.parametrize(
+    "interface, current",
+    [
+        (_access(999), _current({"vlan": 999, "flags": PVID})),
+        (
+            _trunk(100, "200-210,300"),
+            _current(
+                {"vlan": 100, "flags": PVID},
+                {"vlan": 200, "vlanEnd": 210},
+                {"vlan": 300},
+            ),
+        ),
+    ],
+)
+def test_plan_no_changes(interface, current):
+    assert interface.plan(current) == []
+
+
+def test_plan_access_to_trunk():
+    current = _current({"vlan": 999, "flags": PVID})
+
+    assert _trunk(100, "200-210,300").plan(current) == [
+        "vlan add dev swp1 vid 100 pvid untagged",
+        "vlan add dev swp1 vid 200-210",
+        "vlan add dev swp1 vid 300",
+        "vlan delete dev swp1 vid 999",
+    ]
+
+
+def test_plan_trunk_to_access():
+    current = _current(
+        {"vlan": 100, "flags": PVID},
+        {"vlan": 200, "vlanEnd": 210},
+        {"vlan": 300},
+    )
+
+    assert _access(999).plan(current) == [
+        "vlan add dev swp1 vid 999 pvid untagged",
+        "vlan delete dev swp1 vid 100",
+        "vlan delete dev swp1 vid 200-210",
+        "vlan delete dev swp1 vid 300",
+    ]
+
+
+def test_plan_move_pvid_to_new_vlan():
+    current = _current({"vlan": 100, "flags": PVID}, {"vlan": 200, "vlanEnd": 210})
+
+    assert _trunk(50, "200-210").plan(current) == [
+        "vlan add dev swp1 vid 50 pvid untagged",
+        "vlan delete dev swp1 vid 100",
+    ]
+
+
+def test_plan_move_pvid_to_tagged_vlan():
+    current = _current({"vlan": 100, "flags": PVID}, {"vlan": 200, "vlanEnd": 210})
+
+    # The old PVID stays allowed, so it is re-added as tagged
+    assert _trunk(200, "100,201-210").plan(current) == [
+        "vlan add dev swp1 vid 200 pvid untagged",
+        "vlan add dev swp1 vid 100",
+    ]
+
+
+def test_plan_untagged_flag_only():
+    current = _current({"vlan": 100, "flags": ["PVID"]}, {"vlan": 200})
+
+    assert _trunk(100, "200").plan(current) == ["vlan add dev swp1 vid 100 pvid untagged"]
+
+
+def test_plan_vlan_end_ranges():
+    current = _current(
+        {"vlan": 100, "flags": PVID},
+        {"vlan": 200, "vlanEnd": 210},
+        {"vlan": 4000, "vlanEnd": 4094},
+    )
+
+    assert _trunk(100, "195-205,4000-4094").plan(current) == [
+        "vlan add dev swp1 vid 195-199",
+        "vlan delete dev swp1 vid 206-210",
+    ]
+
+
+def test_from_data_vlan_end():
+    current = _current({"vlan": 100, "flags": PVID}, {"vlan": 200, "vlanEnd": 210})
+
+    interface = L2Interface.from_data("swp1", current)
+
+    assert interface.mode is LinkType.TRUNK
+    assert interface.pvid == 100
+    assert str(interface.trunk_allowed_vlans) == "100,200-210"
+
+
+@pytest.mark.parametrize("state", ["prod", "setup"])
+def test_set_state_no_pvid(state):
+    device = Device(
+        fqdn="leaf1.example.net", vendor="Cumulus", model="", tenant=None, location="", ip=None
+    )
+    interface = Interface(name="swp1", vlans=Vlans(setup=None, untagged=None))
+    driver = CumulusDriver(device, interface)
+
+    with pytest.raises(ConfigurationError, match="no .* VLAN for swp1"):
+        asyncio.run(driver.set_state(state))
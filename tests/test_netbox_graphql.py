@@ -0,0 +1,179 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from napi.inventory import InventoryException
+from napi.inventory.netbox_graphql import NetboxGraphQL
+
+API_URL = "http://netbox/api"
+
+
+def _device(name: str, site: str, role: str = "tor") -> dict[str, Any]:
+    return {
+        "name": name,
+        "role": role,
+        "device_type": {"slug": "ce6870", "manufacturer": {"slug": "huawei"}},
+        "tenant": {"slug": "production"},
+        "site": {"slug": site},
+        "primary_ip4": {"address": f"10.0.0.{len(name)}/32"},
+        "primary_ip6": None,
+    }
+
+
+DEVICES = [
+    # Listed before the device of the preferred domain on purpose
+    _device("sw1.backup", "dc2"),
+    _device("sw1.main", "dc1"),
+    _device("spine1.main", "dc1", role="spine"),
+]
+
+INTERFACES = [
+    {
+        "name": "10GE1/0/1",
+        "device": {"name": "sw1.main"},
+        "description": "server1",
+        "untagged_vlan": {"vid": 100},
+        "tagged_vlans": [{"vid": 200}, {"vid": 201}, {"vid": 300}],
+    },
+    {
+        "name": "10GE1/0/1",
+        "device": {"name": "sw1.backup"},
+        "description": "server2",
+        "untagged_vlan": None,
+        "tagged_vlans": [],
+    },
+]
+
+VLANS = [
+    {"vid": 999, "site": {"slug": "dc1"}},
+]
+
+
+async def graphql(request: Request) -> JSONResponse:
+    payload = await request.json()
+    query, variables = payload["query"], payload["variables"]
+
+    if "device_list" in query:
+        roles = variables.get("roles")
+        devices = [
+            {key: value for key, value in device.items() if key != "role"}
+            for device in DEVICES
+            if device["name"] in variables["names"] and (roles is None or device["role"] in roles)
+        ]
+        return JSONResponse({"data": {"device_list": devices}})
+
+    if "interface_list" in query:
+        interfaces = [
+            interface
+            for interface in INTERFACES
+            if interface["name"] in variables["name"]
+            and interface["device"]["name"] in variables["device"]
+        ]
+        vlans = [vlan for vlan in VLANS if vlan["site"]["slug"] in variables["site"]]
+        return JSONResponse({"data": {"interface_list": interfaces, "vlan_list": vlans}})
+
+    return JSONResponse({"errors": [{"message": "unknown query"}], "data": None})
+
+
+app = Starlette(routes=[Route("/api/graphql/", graphql, methods=["POST"])])
+
+
+def run(coroutine):
+    async def main():
+        inventory = NetboxGraphQL(api_url=API_URL)
+        inventory.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+
+        async with inventory.client:
+            return await coroutine(inventory)
+
+    return asyncio.run(main())
+
+
+def test_get_device_domain_priority():
+    async def main(inventory):
+        return (
+            await inventory.get_device("sw1", domains=["main", "backup"], roles=["tor"]),
+            await inventory.get_device("sw1.whatever", domains=["backup", "main"], roles=None),
+        )
+
+    main_device, backup_device = run(main)
+
+    assert main_device.fqdn == "sw1.main"
+    assert main_device.name == "sw1"
+    assert main_device.vendor == "huawei"
+    assert main_device.model == "ce6870"
+    assert main_device.location == "dc1"
+    assert main_device.ip == "10.0.0.8"
+    assert backup_device.fqdn == "sw1.backup"
+
+
+def test_get_device_missing():
+    async def main(inventory):
+        with pytest.raises(InventoryException) as missing:
+            await inventory.get_device("sw2", domains=["main"], roles=None)
+        with pytest.raises(InventoryException) as wrong_role:
+            await inventory.get_device("spine1", domains=["main"], roles=["tor"])
+
+        return missing.value, wrong_role.value
+
+    missing, wrong_role = run(main)
+
+    assert missing.element == "switch"
+    assert wrong_role.element == "switch"
+
+
+def test_get_interface():
+    async def main(inventory):
+        device = await inventory.get_device("sw1", domains=["main"], roles=None)
+        return await inventory.get_interface("10GE1/0/1", device)
+
+    interface = run(main)
+
+    assert interface.name == "10GE1/0/1"
+    assert interface.description == "server1"
+    assert interface.vlans.setup == 999
+    assert interface.vlans.untagged == 100
+    assert interface.vlans.tagged == [200, 201, 300]
+    assert str(interface.vlans.tagged) == "200-201,300"
+
+
+def test_get_interface_missing():
+    async def main(inventory):
+        device = await inventory.get_device("sw1", domains=["main"], roles=None)
+        with pytest.raises(InventoryException) as missing:
+            await inventory.get_interface("10GE1/0/2", device)
+
+        return missing.value
+
+    assert run(main).element == "interface"
+
+
+def test_get_devices_and_interfaces():
+    async def main(inventory):
+        devices = await inventory.get_devices(
+            ["sw1", "sw2"], domains=["backup", "main"], roles=None
+        )
+        main_device = await inventory.get_device("sw1", domains=["main"], roles=None)
+        interfaces = await inventory.get_interfaces(
+            ["10GE1/0/1", "10GE1/0/2"], [devices["sw1"], main_device]
+        )
+
+        return devices, interfaces
+
+    devices, interfaces = run(main)
+
+    assert devices["sw1"].fqdn == "sw1.backup"
+    assert isinstance(devices["sw2"], InventoryException)
+    assert devices["sw2"].element == "switch"
+
+    # Devices with the same short name are told apart by fqdn
+    assert interfaces["sw1.backup"]["10GE1/0/1"].description == "server2"
+    assert interfaces["sw1.backup"]["10GE1/0/1"].vlans.setup is None
+    assert interfaces["sw1.main"]["10GE1/0/1"].description == "server1"
+    assert interfaces["sw1.main"]["10GE1/0/2"].element == "interface"
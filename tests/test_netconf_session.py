@@ -0,0 +1,165 @@
+import asyncio
+import re
+
+import asyncssh
+import pytest
+
+from napi.driver.netconf.driver import NetconfSession
+
+
+class Channel:
+    def is_closing(self) -> bool:
+        return False
+
+
+class Connection:
+    def is_closed(self) -> bool:
+        return False
+
+
+class Reader:
+    """Channel reader returning the fed data one read at a time"""
+
+    def __init__(self, *reads: bytes) -> None:
+        self.reads: asyncio.Queue[bytes] = asyncio.Queue()
+        for data in reads:
+            self.feed(data)
+
+    def feed(self, data: bytes) -> None:
+        self.reads.put_nowait(data)
+
+    async def read(self, size: int) -> bytes:
+        return await self.reads.get()
+
+
+class Writer:
+    def __init__(self) -> None:
+        self.channel = Channel()
+        self.messages: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.messages.append(data)
+
+    def close(self) -> None:
+        pass
+
+
+def _session(reader: Reader, chunked: bool) -> NetconfSession:
+    return NetconfSession(Connection(), Writer(), reader, chunked=chunked)
+
+
+@pytest.mark.parametrize(
+    "reads",
+    [
+        # Whole message in one read
+        [b"\n#11\nhello world\n##\n"],
+        # Header, data and end of chunks split between reads
+        [b"\n#", b"1", b"1\nhel", b"lo world\n", b"#", b"#\n"],
+        # Two chunks
+        [b"\n#6\nhello \n#5\nwo", b"rld\n##\n"],
+    ],
+)
+def test_chunked_read(reads):
+    async def main():
+        session = _session(Reader(*reads, b""), chunked=True)
+        return await session.read()
+
+    assert asyncio.run(main()) == b"hello world"
+
+
+def test_chunked_read_keeps_next_message():
+    async def main():
+        session = _session(Reader(b"\n#5\nfirst\n##\n\n#6\nsec", b"ond\n##\n"), chunked=True)
+        return await session.read(), await session.read()
+
+    assert asyncio.run(main()) == (b"first", b"second")
+
+
+def test_chunked_read_invalid_header():
+    async def main():
+        session = _session(Reader(b"\n#x1\nhello\n##\n"), chunked=True)
+        return await session.read()
+
+    with pytest.raises(asyncssh.ProtocolError):
+        asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "reads",
+    [
+        [b"<hello/>]]>]]>"],
+        # End of message marker split between reads
+        [b"<hel", b"lo/>]]", b">]]>"],
+    ],
+)
+def test_end_of_message_read(reads):
+    async def main():
+        session = _session(Reader(*reads), chunked=False)
+        return await session.read()
+
+    assert asyncio.run(main()) == b"<hello/>"
+
+
+def _reply(message_id: bytes, data: bytes) -> bytes:
+    return b'<rpc-reply message-id="%s"><data>%s</data></rpc-reply>' % (message_id, data)
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_out_of_order_replies(chunked):
+    async def main():
+        reader = Reader()
+        session = _session(reader, chunked=chunked)
+        session.start()
+
+        first = asyncio.create_task(session.request(b"<get>first</get>", timeout=1))
+        second = asyncio.create_task(session.request(b"<get>second</get>", timeout=1))
+        while len(session.writer.messages) < 2:
+            await asyncio.sleep(0)
+
+        message_ids = [
+            re.search(rb'message-id="(\d+)"', message).group(1)
+            for message in session.writer.messages
+        ]
+
+        # The second reply arrives first, both are split into several reads
+        for message_id, data in reversed(list(zip(message_ids, [b"first", b"second"]))):
+            reply = _reply(message_id, data)
+            if chunked:
+                reply = b"\n#%d\n%b\n##\n" % (len(reply), reply)
+            else:
+                reply += b"]]>]]>"
+
+            for offset in range(0, len(reply), 7):
+                reader.feed(reply[offset : offset + 7])
+
+        result = await asyncio.gather(first, second)
+        await session.close()
+
+        return message_ids, result
+
+    message_ids, (first, second) = asyncio.run(main())
+
+    assert message_ids[0] != message_ids[1]
+    assert first == _reply(message_ids[0], b"first")
+    assert second == _reply(message_ids[1], b"second")
+
+
+def test_reply_with_unknown_message_id_is_dropped():
+    async def main():
+        reader = Reader()
+        session = _session(reader, chunked=False)
+        session.start()
+
+        request = asyncio.create_task(session.request(b"<get/>", timeout=1))
+        while not session.writer.messages:
+            await asyncio.sleep(0)
+
+        reader.feed(_reply(b"999", b"stray") + b"]]>]]>")
+        reader.feed(_reply(b"1", b"mine") + b"]]>]]>")
+
+        result = await request
+        await session.close()
+
+        return result
+
+    assert asyncio.run(main()) == _reply(b"1", b"mine")
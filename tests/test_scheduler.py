@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from napi.driver.scheduler import (
+    Operation,
+    Overloaded,
+    Priority,
+    Scheduler,
+    scheduler_http_code_map,
+)
+
+
+def _scheduler(max_operations: int = 10, queue_timeout: float = 1.0) -> Scheduler:
+    return Scheduler(
+        max_operations=max_operations,
+        device_limits={Operation.READ: 1, Operation.WRITE: 1},
+        vendor_limits={Operation.READ: 10, Operation.WRITE: 10},
+        queue_timeout=queue_timeout,
+        retry_after=7,
+    )
+
+
+def test_priority_order():
+    scheduler = _scheduler()
+    order = []
+
+    async def operation(name: str, priority: Priority, host: str = "sw1") -> None:
+        async with scheduler.slot(host, "huawei", Operation.READ, priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        busy = asyncio.create_task(operation("busy", Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        # Queued in arrival order, the interactive lane is served first anyway
+        tasks = [
+            asyncio.create_task(operation("bulk1", Priority.BULK)),
+            asyncio.create_task(operation("bulk2", Priority.BULK)),
+            asyncio.create_task(operation("interactive1", Priority.INTERACTIVE)),
+            asyncio.create_task(operation("interactive2", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 4
+
+        await asyncio.gather(busy, *tasks)
+
+    asyncio.run(main())
+
+    assert order == ["busy", "interactive1", "interactive2", "bulk1", "bulk2"]
+    assert scheduler.stats()["lanes"]["bulk"]["operations"] == 2
+
+
+def test_blocked_device_does_not_block_others():
+    scheduler = _scheduler()
+    order = []
+
+    async def operation(name: str, host: str) -> None:
+        async with scheduler.slot(host, "huawei", Operation.READ):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(
+            operation("sw1-1", "sw1"), operation("sw1-2", "sw1"), operation("sw2", "sw2")
+        )
+
+    asyncio.run(main())
+
+    assert order == ["sw1-1", "sw2", "sw1-2"]
+
+
+def test_overloaded():
+    scheduler = _scheduler(max_operations=1)
+
+    async def main():
+        async with scheduler.slot("sw1", "huawei", Operation.READ):
+            async with scheduler.slot("sw2", "huawei", Operation.READ):
+                pass
+
+    with pytest.raises(Overloaded) as e:
+        asyncio.run(main())
+
+    assert e.value.retry_after == 7
+    assert scheduler_http_code_map[type(e.value).__name__] == 503
+    assert scheduler.stats()["rejected"] == 1
+    assert scheduler.stats()["running"] == 0
+
+
+def test_queue_timeout():
+    scheduler = _scheduler(queue_timeout=0.01)
+
+    async def main():
+        async with scheduler.slot("sw1", "huawei", Operation.WRITE):
+            async with scheduler.slot("sw1", "huawei", Operation.WRITE):
+                pass
+
+    with pytest.raises(Overloaded, match="sw1 is busy"):
+        asyncio.run(main())
+
+    assert scheduler.stats()["timeouts"] == 1
+    assert scheduler.stats()["queued"] == 0
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from napi.inventory import events, snapshot
+from napi.inventory.snapshot import SnapshotIndex
+from napi.settings import settings
+
+
+def _device(id_: int, name: str, site: str = "dc1") -> dict:
+    return {
+        "id": id_,
+        "name": name,
+        "status": {"value": "active"},
+        "role": {"slug": "tor"},
+        "device_type": {"slug": "ce6870", "manufacturer": {"slug": "huawei"}},
+        "tenant": None,
+        "site": {"slug": site},
+        "primary_ip": None,
+    }
+
+
+@pytest.fixture(autouse=True)
+def journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "inventory_events_file", str(tmp_path / "events.jsonl"))
+    monkeypatch.setattr(events, "_position", (None, 0))
+    monkeypatch.setattr(events, "_oldest", None)
+
+    index = SnapshotIndex()
+    index.synced = time.time() - 1
+    monkeypatch.setattr(snapshot, "_index", index)
+
+    return tmp_path / "events.jsonl"
+
+
+def _other_worker(journal, model, event, data, received=None):
+    record = {
+        "pid": -1,
+        "received": received or time.time(),
+        "model": model,
+        "event": event,
+        "data": data,
+    }
+    with journal.open("a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def test_events_of_other_workers_are_applied():
+    async def main(journal):
+        await events.publish_event("device", "created", _device(1, "sw1.main"))
+        _other_worker(journal, "device", "created", _device(2, "sw2.main"))
+        await events.poll_events()
+
+    journal = events._path()
+    asyncio.run(main(journal))
+
+    assert snapshot._index.device("sw1.main") is not None
+    assert snapshot._index.device("sw2.main") is not None
+    assert events.events_stats()["offset"] == journal.stat().st_size
+
+
+def test_events_older_than_snapshot_are_skipped(journal):
+    _other_worker(journal, "device", "created", _device(1, "sw1.main"), received=1)
+    asyncio.run(events.poll_events())
+
+    assert snapshot._index.device("sw1.main") is None
+
+
+def test_journal_is_compacted(journal, monkeypatch):
+    monkeypatch.setattr(settings, "inventory_events_keep", 60)
+
+    _other_worker(journal, "device", "created", _device(1, "sw1.main"), received=time.time() - 120)
+    _other_worker(journal, "device", "created", _device(2, "sw2.main"))
+    asyncio.run(events.poll_events())
+
+    assert [json.loads(line)["data"]["id"] for line in journal.read_text().splitlines()] == [2]
+
+    # The compacted journal is read again from the start and its events are applied once more
+    asyncio.run(events.poll_events())
+    assert snapshot._index.device("sw2.main") is not None
+
+
+def test_events_during_sync_are_replayed(monkeypatch):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def get_all(self, suffix, params):
+        started.set()
+        await release.wait()
+        return [_device(1, "sw1.main")] if "devices" in suffix else []
+
+    monkeypatch.setattr(snapshot.Netbox, "_get_all", get_all)
+
+    async def main():
+        sync = asyncio.create_task(snapshot.sync_snapshot())
+        await started.wait()
+        snapshot.apply_event("device", "created", _device(2, "sw2.main"))
+        snapshot.apply_event("device", "deleted", {"id": 1})
+        release.set()
+        await sync
+
+    asyncio.run(main())
+
+    assert snapshot._index.device("sw1.main") is None
+    assert snapshot._index.device("sw2.main") is not None
+    assert snapshot._replay is None
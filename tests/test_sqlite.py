@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+import yaml
+
+from napi.inventory import sqlite
+from napi.inventory.exceptions import InventoryException
+from napi.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def connection():
+    sqlite.close_connection()
+    yield
+    sqlite.close_connection()
+
+
+def test_missing_database_fails_on_query(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "inventory_db", str(tmp_path / "missing.db"))
+
+    inventory = sqlite.SQLite()
+
+    with pytest.raises(InventoryException) as e:
+        asyncio.run(inventory.get_device("leaf1", domains=["example.net"], roles=None))
+    assert e.value.element == "connect"
+
+
+def test_get_device_interface(tmp_path, monkeypatch):
+    source = tmp_path / "inventory.yml"
+    source.write_text(
+        yaml.safe_dump(
+            {
+                "devices": [
+                    {
+                        "fqdn": "leaf1.example.net",
+                        "vendor": "huawei",
+                        "model": "ce6870",
+                        "site": "dc1",
+                    }
+                ],
+                "interfaces": [
+                    {
+                        "device": "leaf1.example.net",
+                        "name": "10GE1/0/1",
+                        "untagged": 100,
+                        "tagged": [200, 201],
+                    }
+                ],
+                "vlans": [{"site": "dc1", "vid": 999, "role": "setup"}],
+            }
+        )
+    )
+    sqlite.build_database(str(source), str(tmp_path / "inventory.db"))
+    monkeypatch.setattr(settings, "inventory_db", str(tmp_path / "inventory.db"))
+
+    async def main():
+        inventory = sqlite.SQLite()
+        device = await inventory.get_device("leaf1", domains=["example.net"], roles=None)
+        return device, await inventory.get_interface("10GE1/0/1", device)
+
+    device, interface = asyncio.run(main())
+
+    assert device.fqdn == "leaf1.example.net"
+    assert (interface.vlans.setup, interface.vlans.untagged) == (999, 100)
+    assert list(interface.vlans.tagged) == [200, 201]
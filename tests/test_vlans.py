@@ -0,0 +1,103 @@
+import pickle
+
+import pytest
+
+from napi.lib import VlanSet
+
+
+@pytest.mark.parametrize(
+    "text, ranges",
+    [
+        ("", []),
+        ("1", [(1, 1)]),
+        ("10-20,30", [(10, 20), (30, 30)]),
+        ("0", [(0, 0)]),
+        ("4095", [(4095, 4095)]),
+        ("0,4095", [(0, 0), (4095, 4095)]),
+        ("0-4095", [(0, 4095)]),
+        ("1,3,5-7,4094-4095", [(1, 1), (3, 3), (5, 7), (4094, 4095)]),
+    ],
+)
+def test_parse_str_ranges_round_trip(text, ranges):
+    vlans = VlanSet.parse(text)
+
+    assert vlans.ranges() == ranges
+    assert str(vlans) == text
+    assert VlanSet.parse(str(vlans)) == vlans
+    assert VlanSet.from_ranges(vlans.ranges()) == vlans
+    assert list(vlans) == [vlan for start, end in ranges for vlan in range(start, end + 1)]
+
+
+def test_parse_normalizes_text():
+    assert str(VlanSet.parse(" 30, 10-20,15,21 ")) == "10-21,30"
+    assert str(VlanSet.parse("5-5")) == "5"
+    assert VlanSet.parse(None) == VlanSet()
+
+
+@pytest.mark.parametrize("text", ["4096", "-1", "20-10", "abc", "1-2-3"])
+def test_parse_invalid(text):
+    with pytest.raises(ValueError):
+        VlanSet.parse(text)
+
+
+@pytest.mark.parametrize("vlans", [[-1], [4096], range(4090, 4097)])
+def test_out_of_range(vlans):
+    with pytest.raises(ValueError):
+        VlanSet(vlans)
+
+
+def test_boundaries():
+    vlans = VlanSet([0, 4095])
+
+    assert 0 in vlans
+    assert 4095 in vlans
+    assert 4096 not in vlans
+    assert -1 not in vlans
+    assert "0" not in vlans
+    assert len(vlans) == 2
+
+    everything = VlanSet(range(4096))
+    assert len(everything) == 4096
+    assert everything.ranges() == [(0, 4095)]
+    assert str(everything - vlans) == "1-4094"
+
+
+def test_alternating_vlans():
+    vlans = VlanSet(range(0, 4096, 2))
+
+    assert len(vlans.ranges()) == 2048
+    assert vlans.ranges()[-1] == (4094, 4094)
+    assert list(vlans) == list(range(0, 4096, 2))
+
+
+def test_equality_does_not_depend_on_order():
+    vlans = VlanSet([30, 10, 20, 10])
+
+    assert vlans == VlanSet([10, 20, 30])
+    assert vlans == [20, 30, 10]
+    assert vlans == (10, 20, 30)
+    assert vlans == {10, 20, 30}
+    assert vlans == VlanSet.parse("30,20,10")
+    assert hash(vlans) == hash(VlanSet.parse("10,20,30"))
+    assert vlans != [10, 20]
+    assert vlans != "10,20,30"
+
+
+def test_set_operations():
+    left = VlanSet.parse("10-20")
+    right = VlanSet.parse("15-25")
+
+    assert str(left | right) == "10-25"
+    assert str(left & right) == "15-20"
+    assert str(left - right) == "10-14"
+    assert str(left ^ right) == "10-14,21-25"
+    assert str(left | [4095]) == "10-20,4095"
+    assert not VlanSet()
+    assert left
+
+
+def test_pickle():
+    vlans = VlanSet.parse("1,100-200,4095")
+
+    assert pickle.loads(pickle.dumps(vlans)) == vlans
+    assert repr(vlans) == "VlanSet('1,100-200,4095')"